@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+import argparse
+import json
+import random
+import re
+import threading
+import time
+
+
+_INVOKE_PATH = re.compile(r"^/model/(?P<model>[^/]+)/invoke$")
+
+
+@dataclass
+class FakeBedrockProfile:
+    """
+    Behaviour of the fake model: lognormal latency around ``latency_ms``
+    (``latency_sigma=0`` for a fixed latency), a share of requests throttled
+    up front, a share failing after the latency, and an optional concurrency
+    limit beyond which requests are throttled like a real account quota.
+    """
+
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.5
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    max_concurrency: Optional[int] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.latency_ms < 0 or self.latency_sigma < 0:
+            raise ValueError("latency_ms and latency_sigma must be non-negative")
+        if not (0.0 <= self.throttle_rate <= 1.0 and 0.0 <= self.error_rate <= 1.0):
+            raise ValueError("throttle_rate and error_rate must be in [0, 1]")
+
+
+class FakeBedrock:
+    """
+    Decides the outcome and latency of each ``invoke_model`` call and counts
+    what it did. Thread-safe; shared by all request handler threads.
+    """
+
+    def __init__(self, profile: FakeBedrockProfile) -> None:
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.counts: Dict[str, int] = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0}
+        self.peak_concurrency = 0
+
+    def _latency_s(self) -> float:
+        p = self.profile
+        if p.latency_sigma == 0:
+            return p.latency_ms / 1000.0
+        return p.latency_ms * self._rng.lognormvariate(0.0, p.latency_sigma) / 1000.0
+
+    def begin(self) -> Optional[float]:
+        """
+        Admit a request: its latency in seconds, or None if it is throttled.
+        """
+        p = self.profile
+        with self._lock:
+            self.counts["requests"] += 1
+            over_limit = p.max_concurrency is not None and self._active >= p.max_concurrency
+            if over_limit or self._rng.random() < p.throttle_rate:
+                self.counts["throttled"] += 1
+                return None
+            self._active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._active)
+            return self._latency_s()
+
+    def end(self) -> bool:
+        """
+        Finish an admitted request; False if it fails with a model error.
+        """
+        with self._lock:
+            self._active -= 1
+            failed = self._rng.random() < self.profile.error_rate
+            self.counts["errors" if failed else "ok"] += 1
+            return not failed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counts, "peak_concurrency": self.peak_concurrency, "profile": asdict(self.profile)}
+
+
+def _handler(model: FakeBedrock) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # quiet by default
+            return None
+
+        def _send(self, status: int, payload: Dict[str, Any], error_type: Optional[str] = None) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if error_type:
+                # bedrock-runtime is a REST-JSON service: botocore reads the error code from this header.
+                self.send_header("x-amzn-ErrorType", error_type)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            match = _INVOKE_PATH.match(self.path.split("?", 1)[0])
+            if match is None:
+                self._send(404, {"message": f"unknown path {self.path}"}, "ResourceNotFoundException")
+                return
+            latency = model.begin()
+            if latency is None:
+                self._send(429, {"message": "Too many requests, please wait before trying again."}, "ThrottlingException")
+                return
+            time.sleep(latency)
+            if not model.end():
+                self._send(500, {"message": "The model failed to respond."}, "ModelErrorException")
+                return
+            self._send(
+                200,
+                {
+                    "id": f"fake-{model.counts['requests']}",
+                    "model": unquote(match["model"]),
+                    "content": [
+                        {"type": "text", "text": f"Fake narrative drafted from {len(body)} bytes of evidence."}
+                    ],
+                    "latency_ms": round(latency * 1000.0, 3),
+                },
+            )
+
+        def do_GET(self) -> None:
+            if self.path == "/stats":
+                self._send(200, model.stats())
+            else:
+                self._send(404, {"message": f"unknown path {self.path}"})
+
+    return Handler
+
+
+class FakeBedrockServer:
+    """
+    Local HTTP stand-in for the ``bedrock-runtime`` ``InvokeModel`` API.
+    Point a boto3 client at ``endpoint_url`` (any credentials work; requests
+    are not verified). ``GET /stats`` returns the request counts.
+    """
+
+    def __init__(self, profile: Optional[FakeBedrockProfile] = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.model = FakeBedrock(profile or FakeBedrockProfile())
+        self._server = ThreadingHTTPServer((host, port), _handler(self.model))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeBedrockServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-bedrock", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeBedrockServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="median model latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal shape; 0 for a fixed latency")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests throttled")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with a model error")
+    parser.add_argument("--max-concurrency", type=int, help="throttle requests beyond this many in flight")
+    parser.add_argument("--seed", type=int)
+
+
+def profile_from_args(args: argparse.Namespace) -> FakeBedrockProfile:
+    return FakeBedrockProfile(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local fake bedrock-runtime InvokeModel endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeBedrockServer(profile_from_args(args), args.host, args.port)
+    print(f"fake bedrock-runtime at {server.endpoint_url}; set SECURESAR_BEDROCK_ENDPOINT_URL to use it")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+    return 0
+
+
+__all__ = ["FakeBedrockProfile", "FakeBedrock", "FakeBedrockServer"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+
+import numpy as np
+
+from benchmarks.fake_bedrock import FakeBedrockServer, add_profile_arguments, profile_from_args
+
+
+# (status, body) of one HTTP request against the API.
+Send = Callable[[str, str], Awaitable[Tuple[int, bytes]]]
+
+_NARRATIVE_COUNT = re.compile(r"^securesar_narrative_duration_seconds_count\{(?P<labels>[^}]*)\} (?P<value>\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def narrative_counts(metrics_text: str) -> Dict[str, int]:
+    """
+    Narrative generations by ``provider/outcome`` from the /metrics text.
+    """
+    counts: Dict[str, int] = {}
+    for line in metrics_text.splitlines():
+        match = _NARRATIVE_COUNT.match(line)
+        if match:
+            labels = dict(_LABEL.findall(match["labels"]))
+            counts[f"{labels.get('provider')}/{labels.get('outcome')}"] = int(float(match["value"]))
+    return counts
+
+
+def asgi_transport(app: Any) -> Send:
+    """
+    Call an ASGI app in-process (no server, no HTTP client dependency).
+    """
+
+    async def send(method: str, path: str) -> Tuple[int, bytes]:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"loadtest")],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        out: Dict[str, Any] = {"status": 500, "body": b""}
+        received = False
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # the client never disconnects
+            return {"type": "http.disconnect"}
+
+        async def reply(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                out["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                out["body"] += message.get("body", b"")
+
+        await app(scope, receive, reply)
+        return out["status"], out["body"]
+
+    return send
+
+
+def http_transport(base_url: str, timeout: float = 60.0) -> Send:
+    """
+    Plain HTTP/1.1 against a running API, one connection per request, run in
+    the default thread pool.
+    """
+    parsed = urllib.parse.urlsplit(base_url)
+    conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+    prefix = parsed.path.rstrip("/")
+
+    def blocking(method: str, path: str) -> Tuple[int, bytes]:
+        conn = conn_cls(parsed.netloc, timeout=timeout)
+        try:
+            conn.request(method, prefix + path)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    async def send(method: str, path: str) -> Tuple[int, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(None, blocking, method, path)
+
+    return send
+
+
+def summarize(
+    latencies_s: List[float],
+    statuses: List[int],
+    elapsed_s: float,
+    before: Dict[str, int],
+    after: Dict[str, int],
+) -> Dict[str, Any]:
+    """
+    Throughput, latency percentiles and the narrative outcome mix of a run.
+    ``before``/``after`` are ``narrative_counts`` around it; the fallback
+    rate is the share of Bedrock calls answered by the template instead.
+    """
+    lat_ms = np.asarray(latencies_s, dtype=np.float64) * 1000.0
+    ok = sum(200 <= s < 300 for s in statuses)
+    outcomes = {k: after.get(k, 0) - before.get(k, 0) for k in sorted(set(after) | set(before))}
+    outcomes = {k: v for k, v in outcomes.items() if v}
+    bedrock = sum(v for k, v in outcomes.items() if k.startswith("bedrock/"))
+    fallback = outcomes.get("bedrock/fallback", 0)
+    return {
+        "requests": len(statuses),
+        "ok": ok,
+        "errors": len(statuses) - ok,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(ok / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+        "latency_ms": {
+            name: round(float(np.percentile(lat_ms, q)), 3) if len(lat_ms) else None
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "narratives": outcomes,
+        "fallback_rate": round(fallback / bedrock, 4) if bedrock else 0.0,
+    }
+
+
+async def run_load(send: Send, case_ids: List[str], rate: float, duration: float) -> Dict[str, Any]:
+    """
+    Open-loop load: request ``i`` is sent at ``i / rate`` seconds whether or
+    not earlier ones have finished, cycling through ``case_ids``. Latency is
+    measured from the scheduled send time, so queueing delay is included.
+    """
+    if rate <= 0 or duration <= 0 or not case_ids:
+        raise ValueError("rate and duration must be positive and there must be cases to request")
+    _, metrics = await send("GET", "/metrics")
+    before = narrative_counts(metrics.decode("utf-8"))
+
+    latencies: List[float] = []
+    statuses: List[int] = []
+
+    async def one(case_id: str, scheduled: float) -> None:
+        try:
+            status, _ = await send("POST", f"/api/cases/{urllib.parse.quote(case_id, safe='')}/generate-sar")
+        except Exception:
+            status = 599
+        latencies.append(time.perf_counter() - scheduled)
+        statuses.append(status)
+
+    total = int(rate * duration)
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = started + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(case_ids[i % len(case_ids)], scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    _, metrics = await send("GET", "/metrics")
+    result = summarize(latencies, statuses, elapsed, before, narrative_counts(metrics.decode("utf-8")))
+    result["target_rps"] = rate
+    return result
+
+
+async def _case_ids(send: Send, limit: Optional[int]) -> List[str]:
+    status, body = await send("GET", "/api/cases/high-risk")
+    if status != 200:
+        raise RuntimeError(f"GET /api/cases/high-risk returned {status}: {body[:200]!r}")
+    ids = [case["id"] for case in json.loads(body)]
+    return ids[:limit] if limit else ids
+
+
+def _in_process_app(args: argparse.Namespace, endpoint_url: str) -> Any:
+    # The API service reads the LLM settings when it is created, so the
+    # environment must be in place before src.api.main is imported.
+    os.environ["SECURESAR_USE_REAL_LLM"] = "true"
+    os.environ["SECURESAR_BEDROCK_ENDPOINT_URL"] = endpoint_url
+    os.environ["SECURESAR_PREGENERATE_NARRATIVES"] = "true" if args.drafts else "false"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+
+    from src.utils.config import DataConfig, LLMConfig, PipelineConfig, reload_config
+
+    overrides: Dict[str, Any] = {
+        "pipeline": PipelineConfig(save_artifacts=False),
+        "llm": LLMConfig(bedrock_max_attempts=args.sdk_attempts),
+    }
+    if args.raw_dir is not None:
+        overrides["data"] = DataConfig(raw_dir=args.raw_dir)
+    reload_config(overrides)
+    from src.api.main import app
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Drive POST /api/cases/{id}/generate-sar at a target rate and report "
+        "throughput, tail latency and the Bedrock fallback rate."
+    )
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--cases", type=int, help="cycle through this many high-risk cases (default: all)")
+    parser.add_argument("--url", help="base URL of a running API; default runs the app in-process")
+    parser.add_argument("--bedrock-url", help="in-process only: existing endpoint instead of a fake server")
+    parser.add_argument("--raw-dir", type=Path, help="in-process only: raw data for the pipeline run")
+    parser.add_argument(
+        "--sdk-attempts", type=int, help="in-process only: botocore attempts per call (default: botocore's policy)"
+    )
+    parser.add_argument("--drafts", action="store_true", help="in-process only: keep background narrative drafts on")
+    parser.add_argument("--output", type=Path, help="write the result as JSON")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    fake: Optional[FakeBedrockServer] = None
+    if args.url:
+        send = http_transport(args.url)
+    else:
+        if args.bedrock_url is None:
+            fake = FakeBedrockServer(profile_from_args(args)).start()
+        send = asgi_transport(_in_process_app(args, args.bedrock_url or fake.endpoint_url))
+
+    async def run() -> Dict[str, Any]:
+        # The first request also runs the pipeline when the API has not yet.
+        case_ids = await _case_ids(send, args.cases)
+        return await run_load(send, case_ids, args.rate, args.duration)
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        if fake is not None:
+            result_stats = fake.model.stats()
+            fake.stop()
+    if fake is not None:
+        result["fake_bedrock"] = result_stats
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return 0 if result["ok"] else 1
+
+
+__all__ = ["asgi_transport", "http_transport", "narrative_counts", "run_load", "summarize"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from data.synthetic_generator import generate_dataset
+from src.data_engineering.feature_engineering import engineer_features
+from src.data_engineering.graph_features import compute_graph_features
+from src.data_engineering.ingestion import load_raw_data
+from src.data_engineering.interning import CustomerDictionary, intern_transactions
+from src.data_engineering.peer_baselines import fit_peer_baselines
+from src.data_engineering.validation import validate_alerts, validate_customers, validate_transactions
+from src.detection.anomaly_detection import fit_isolation_forest
+from src.detection.clustering import embed_and_cluster
+from src.detection.rule_engine import apply_rules, deviation_threshold, rules_to_frame
+from src.detection.typology_mapping import map_to_typologies
+from src.risk_scoring.risk_calculator import compute_risk_scores, fit_score_calibration
+from src.services.pipeline_stages import build_customer_features
+from src.services.securesar_service import SecureSarService
+
+
+# (customers, transactions) per named scale.
+SCALES: Dict[str, Tuple[int, int]] = {
+    "small": (1_000, 20_000),
+    "medium": (5_000, 100_000),
+    "large": (20_000, 1_000_000),
+    "xlarge": (50_000, 5_000_000),
+}
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+# Timings below this many seconds are too noisy to call a regression.
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 5.0
+
+
+@dataclass
+class StageResult:
+    wall_s: float = 0.0
+    peak_mb: Optional[float] = None
+    rows: Optional[int] = None
+
+
+@dataclass
+class _Recorder:
+    """
+    Runs stages in order, recording wall time, or the tracemalloc peak above
+    the memory held before the stage when ``memory`` is set (tracing slows
+    Python-heavy stages, so time and memory come from separate passes).
+    """
+
+    memory: bool = False
+    results: Dict[str, StageResult] = field(default_factory=dict)
+
+    def run(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        out = fn(*args)
+        elapsed = time.perf_counter() - started
+        entry = self.results.setdefault(name, StageResult())
+        if self.memory:
+            entry.peak_mb = (tracemalloc.get_traced_memory()[1] - before) / 2**20
+        else:
+            entry.wall_s = elapsed
+        first = out[0] if isinstance(out, tuple) else out
+        if isinstance(first, (pd.DataFrame, pd.Series, list)):
+            entry.rows = len(first)
+        return out
+
+
+def _validate(customers: pd.DataFrame, transactions: pd.DataFrame, alerts: pd.DataFrame):
+    customers = validate_customers(customers)
+    transactions = validate_transactions(transactions)
+    dictionary = CustomerDictionary.build(customers["customer_id"], transactions["customer_id"])
+    return customers, intern_transactions(transactions, dictionary), validate_alerts(alerts), dictionary
+
+
+def _risk(features: pd.DataFrame, rules_df: pd.DataFrame, anomaly_scores: pd.Series):
+    typologies = map_to_typologies(rules_df, anomaly_scores)
+    calibration = fit_score_calibration(rules_df, anomaly_scores, features)
+    return compute_risk_scores(features, rules_df, anomaly_scores, features, typologies, calibration)
+
+
+def _pipeline(raw_dir: Path, rec: _Recorder) -> None:
+    customers, transactions, alerts = rec.run(
+        "load_raw_data",
+        load_raw_data,
+        raw_dir / "customers.csv",
+        raw_dir / "transactions.csv",
+        raw_dir / "alerts.csv",
+    )
+    customers, transactions, alerts, dictionary = rec.run("validate", _validate, customers, transactions, alerts)
+    graph = rec.run("compute_graph_features", compute_graph_features, customers, transactions, alerts["customer_id"])
+    rec.run("engineer_features", engineer_features, customers, transactions)
+    features, evidence = rec.run("build_customer_features", build_customer_features, customers, transactions, graph)
+    peers = rec.run("fit_peer_baselines", fit_peer_baselines, features)
+    features = rec.run("apply_peer_baselines", peers.apply, features)
+    clustered, _ = rec.run("embed_and_cluster", embed_and_cluster, features)
+    _, anomaly_scores = rec.run("fit_isolation_forest", fit_isolation_forest, features)
+    anomaly_scores = anomaly_scores.set_axis(features["customer_id"])
+    rule_results = rec.run("apply_rules", apply_rules, features, deviation_threshold(features))
+    rules_df = rules_to_frame(rule_results, dictionary)
+    risk_df, typology_df = rec.run("compute_risk_scores", _risk, clustered, rules_df, anomaly_scores)
+    rec.run(
+        "assemble_cases",
+        SecureSarService._assemble_cases,
+        risk_df,
+        rules_df,
+        typology_df,
+        evidence,
+        range(len(risk_df)),
+    )
+
+
+def run_scale(n_customers: int, n_transactions: int, seed: int = 42, memory: bool = True) -> Dict[str, Any]:
+    """
+    Generate a dataset of the given size and run every stage on it once for
+    timing and, with ``memory``, once more under tracemalloc.
+    """
+    with tempfile.TemporaryDirectory(prefix="securesar-bench-") as tmp:
+        raw_dir = generate_dataset(n_customers, n_transactions, seed).write(Path(tmp))
+        timing = _Recorder()
+        _pipeline(raw_dir, timing)
+        if memory:
+            traced = _Recorder(memory=True, results=timing.results)
+            tracemalloc.start()
+            try:
+                _pipeline(raw_dir, traced)
+            finally:
+                tracemalloc.stop()
+    return {
+        "n_customers": n_customers,
+        "n_transactions": n_transactions,
+        "stages": {name: vars(result) for name, result in timing.results.items()},
+    }
+
+
+def run_benchmarks(
+    scales: Sequence[str],
+    seed: int = 42,
+    memory: bool = True,
+    sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+) -> Dict[str, Any]:
+    sizes = sizes or SCALES
+    unknown = [s for s in scales if s not in sizes]
+    if unknown:
+        raise ValueError(f"unknown benchmark scales: {unknown}; choose from {sorted(sizes)}")
+    return {
+        "generated_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scales": {s: run_scale(*sizes[s], seed=seed, memory=memory) for s in scales},
+    }
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``: stages slower than
+    ``(1 + tolerance)`` times their baseline wall time, or with a peak more
+    than ``(1 + memory_tolerance)`` times the baseline peak. Differences under
+    MIN_SECONDS / MIN_PEAK_MB are ignored as noise, as are stages or scales
+    missing from the baseline.
+    """
+    problems: List[str] = []
+    for scale, result in current.get("scales", {}).items():
+        base_stages = baseline.get("scales", {}).get(scale, {}).get("stages", {})
+        for stage, now in result["stages"].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            limit = base["wall_s"] * (1 + tolerance)
+            if now["wall_s"] > limit and now["wall_s"] - base["wall_s"] > MIN_SECONDS:
+                problems.append(
+                    f"{scale}/{stage}: {now['wall_s']:.3f}s vs baseline {base['wall_s']:.3f}s (limit {limit:.3f}s)"
+                )
+            if now.get("peak_mb") is None or base.get("peak_mb") is None:
+                continue
+            limit = base["peak_mb"] * (1 + memory_tolerance)
+            if now["peak_mb"] > limit and now["peak_mb"] - base["peak_mb"] > MIN_PEAK_MB:
+                problems.append(
+                    f"{scale}/{stage}: peak {now['peak_mb']:.1f} MB vs baseline {base['peak_mb']:.1f} MB "
+                    f"(limit {limit:.1f} MB)"
+                )
+    return problems
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    for scale, result in results["scales"].items():
+        print(f"\n{scale}: {result['n_customers']} customers, {result['n_transactions']} transactions")
+        for stage, r in result["stages"].items():
+            peak = "" if r["peak_mb"] is None else f"{r['peak_mb']:10.1f} MB"
+            print(f"  {stage:<26}{r['wall_s']:9.3f} s{peak}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-stage SecureSAR pipeline benchmarks.")
+    parser.add_argument("--scales", default="small", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed wall-time increase (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak-memory increase")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks([s for s in args.scales.split(",") if s], args.seed, memory=not args.no_memory)
+    _print_table(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; nothing to compare.")
+        return 0
+    problems = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance, args.memory_tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    print(f"\n{len(problems)} regression(s) against {args.baseline}")
+    return 1 if problems else 0
+
+
+__all__ = ["SCALES", "StageResult", "compare", "run_benchmarks", "run_scale"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
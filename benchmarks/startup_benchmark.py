@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "startup_baseline.json"
+# Libraries that must only load when a pipeline stage, the LLM or search needs them.
+HEAVY_MODULES = ("sklearn", "scipy", "boto3", "botocore", "shap", "opensearchpy")
+# Startup differences below this many seconds are noise.
+MIN_SECONDS = 0.05
+
+
+def probe() -> Dict[str, Any]:
+    """
+    Import the API and answer one /health request, in this (fresh) process.
+    """
+    started = time.perf_counter()
+    from src.api.main import app
+
+    imported = time.perf_counter()
+    import asyncio
+
+    from benchmarks.narrative_load import asgi_transport
+
+    status, _ = asyncio.run(asgi_transport(app)("GET", "/health"))
+    return {
+        "import_s": imported - started,
+        "first_health_s": time.perf_counter() - started,
+        "health_status": status,
+        "heavy_modules": sorted(m for m in HEAVY_MODULES if m in sys.modules),
+    }
+
+
+def run_probe() -> Dict[str, Any]:
+    """
+    ``probe`` in a new interpreter, so nothing is already imported.
+    """
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup_benchmark", "--probe"],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(repeats: int = 5) -> Dict[str, Any]:
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
+    runs = [run_probe() for _ in range(repeats)]
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeats": repeats,
+        "import_s": statistics.median(r["import_s"] for r in runs),
+        "first_health_s": statistics.median(r["first_health_s"] for r in runs),
+        "health_status": runs[-1]["health_status"],
+        "heavy_modules": sorted({m for r in runs for m in r["heavy_modules"]}),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``: a median import or
+    first-/health time more than ``(1 + tolerance)`` times the baseline (and
+    MIN_SECONDS slower), a failed health check, or any heavy library loaded
+    at startup.
+    """
+    problems: List[str] = []
+    for key in ("import_s", "first_health_s"):
+        base = baseline.get(key)
+        if base is None:
+            continue
+        limit = base * (1 + tolerance)
+        if current[key] > limit and current[key] - base > MIN_SECONDS:
+            problems.append(f"{key}: {current[key]:.3f}s vs baseline {base:.3f}s (limit {limit:.3f}s)")
+    if current["health_status"] != 200:
+        problems.append(f"/health returned {current['health_status']}")
+    if current["heavy_modules"]:
+        problems.append(f"loaded at startup: {', '.join(current['heavy_modules'])}")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SecureSAR API cold-start benchmark.")
+    parser.add_argument("--repeats", type=int, default=5, help="fresh interpreters to time (median is reported)")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed time increase (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(probe()))
+        return 0
+
+    results = run_benchmark(args.repeats)
+    print(f"import src.api.main   {results['import_s']:8.3f} s")
+    print(f"first /health         {results['first_health_s']:8.3f} s")
+    print(f"heavy modules loaded  {', '.join(results['heavy_modules']) or 'none'}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {}
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    print(f"\n{len(problems)} regression(s) against {args.baseline}")
+    return 1 if problems else 0
+
+
+__all__ = ["HEAVY_MODULES", "compare", "probe", "run_benchmark", "run_probe"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from src.utils.config import get_config
+from src.utils.helpers import ensure_dir
+
+
+SEGMENTS = ["retail", "sme", "private", "corporate"]
+SEGMENT_WEIGHTS = [0.70, 0.18, 0.07, 0.05]
+# Median transaction amount per segment (lognormal background amounts).
+SEGMENT_MEDIAN_AMOUNT = [120.0, 900.0, 2_500.0, 8_000.0]
+COUNTRIES = ["GB", "DE", "FR", "NL", "US", "ES", "IT", "IE"]
+HIGH_RISK_COUNTRIES = ["IR", "KP", "MM", "SY", "YE"]
+CHANNELS = ["card", "transfer", "cash", "online"]
+PATTERNS = ["structuring", "rapid_movement", "dormant_reactivation", "high_risk_corridor"]
+# Share of customers given each pattern.
+PATTERN_RATES = {
+    "structuring": 0.01,
+    "rapid_movement": 0.01,
+    "dormant_reactivation": 0.005,
+    "high_risk_corridor": 0.005,
+}
+PERIOD = pd.Timedelta(days=90)
+START = pd.Timestamp("2024-01-01")
+
+
+@dataclass
+class SyntheticDataset:
+    customers: pd.DataFrame
+    transactions: pd.DataFrame
+    alerts: pd.DataFrame
+    patterns: pd.DataFrame  # ground truth: customer_id, pattern
+
+    def write(self, out_dir: Path) -> Path:
+        ensure_dir(out_dir)
+        self.customers.to_csv(out_dir / "customers.csv", index=False)
+        _write_csv(self.transactions, out_dir / "transactions.csv")
+        self.alerts.to_csv(out_dir / "alerts.csv", index=False)
+        self.patterns.to_csv(out_dir / "patterns.csv", index=False)
+        return out_dir
+
+
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    # Arrow's CSV writer is an order of magnitude faster than DataFrame.to_csv
+    # for millions of rows; timestamps are written to the second.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ts = table.schema.get_field_index("timestamp")
+    table = table.set_column(ts, "timestamp", table["timestamp"].cast(pa.timestamp("s")))
+    pacsv.write_csv(table, path, pacsv.WriteOptions(quoting_style="needed"))
+
+
+def _ids(prefix: str, n: int) -> pd.arrays.ArrowStringArray:
+    # Built in Arrow: millions of ids without one Python string each.
+    return pd.arrays.ArrowStringArray(pc.binary_join_element_wise(prefix, pc.cast(pa.array(np.arange(n)), pa.string()), ""))
+
+
+def _seconds(rng: np.random.Generator, n: int, low: float = 0.0, high: Optional[float] = None) -> np.ndarray:
+    high = PERIOD.total_seconds() if high is None else high
+    return rng.uniform(low, high, n).astype(np.int64)
+
+
+def generate_customers(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    segment = rng.choice(len(SEGMENTS), n, p=SEGMENT_WEIGHTS)
+    return pd.DataFrame(
+        {
+            "customer_id": _ids("C", n).to_numpy(dtype=object),
+            "segment": np.asarray(SEGMENTS, dtype=object)[segment],
+            "country": rng.choice(COUNTRIES, n),
+            "age": rng.integers(18, 90, n),
+            "tenure_years": rng.integers(0, 30, n),
+        }
+    )
+
+
+def _background(customers: pd.DataFrame, n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Ordinary activity: skewed activity per customer, lognormal amounts by
+    segment, and a handful of regular counterparties per customer.
+    """
+    n_customers = len(customers)
+    activity = rng.pareto(1.5, n_customers) + 1.0
+    cust = rng.choice(n_customers, n, p=activity / activity.sum())
+    segment = pd.Categorical(customers["segment"], categories=SEGMENTS).codes
+    median = np.asarray(SEGMENT_MEDIAN_AMOUNT)[segment[cust]]
+    amount = np.round(median * rng.lognormal(0.0, 1.0, n), 2)
+    # Counterparties: mostly a customer's own regulars, sometimes anyone.
+    pool = max(2 * n_customers, 10)
+    regular = (cust * 7 + rng.zipf(2.0, n) % 8) % pool
+    counterparty = np.where(rng.random(n) < 0.8, regular, rng.integers(0, pool, n))
+    return {
+        "customer": cust,
+        "counterparty": counterparty,
+        "amount": amount,
+        "seconds": _seconds(rng, n),
+        "inflow": rng.random(n) < 0.45,
+        "channel": rng.integers(0, len(CHANNELS), n),
+        "country": rng.integers(0, len(COUNTRIES), n),
+        "pattern": np.full(n, -1, dtype=np.int8),
+    }
+
+
+def _pattern_block(
+    cust: np.ndarray,
+    amount: np.ndarray,
+    seconds: np.ndarray,
+    inflow: np.ndarray,
+    counterparty: np.ndarray,
+    country: np.ndarray,
+    channel: int,
+    pattern: str,
+) -> Dict[str, np.ndarray]:
+    n = len(cust)
+    return {
+        "customer": cust,
+        "counterparty": counterparty,
+        "amount": np.round(amount, 2),
+        "seconds": seconds,
+        "inflow": inflow,
+        "channel": np.full(n, channel),
+        "country": country,
+        "pattern": np.full(n, PATTERNS.index(pattern), dtype=np.int8),
+    }
+
+
+def _structuring(targets: np.ndarray, pool: int, rng: np.random.Generator, threshold: float = 10_000) -> Dict[str, np.ndarray]:
+    # 3-6 cash deposits of 80-99% of the threshold inside 72 hours.
+    per = rng.integers(3, 7, len(targets))
+    cust = np.repeat(targets, per)
+    start = np.repeat(_seconds(rng, len(targets), high=PERIOD.total_seconds() - 72 * 3600), per)
+    return _pattern_block(
+        cust,
+        threshold * rng.uniform(0.8, 0.99, len(cust)),
+        start + _seconds(rng, len(cust), high=72 * 3600),
+        np.ones(len(cust), dtype=bool),
+        rng.integers(0, pool, len(cust)),
+        np.zeros(len(cust), dtype=np.int64),
+        CHANNELS.index("cash"),
+        "structuring",
+    )
+
+
+def _rapid_movement(targets: np.ndarray, pool: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    # A large inflow, 90-99% of it sent on to another counterparty within a day.
+    n = len(targets)
+    amount_in = rng.uniform(20_000, 200_000, n)
+    t_in = _seconds(rng, n, high=PERIOD.total_seconds() - 86_400)
+    return _pattern_block(
+        np.concatenate([targets, targets]),
+        np.concatenate([amount_in, amount_in * rng.uniform(0.9, 0.99, n)]),
+        np.concatenate([t_in, t_in + _seconds(rng, n, low=600, high=86_400)]),
+        np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)]),
+        rng.integers(0, pool, 2 * n),
+        np.zeros(2 * n, dtype=np.int64),
+        CHANNELS.index("transfer"),
+        "rapid_movement",
+    )
+
+
+def _dormant_reactivation(targets: np.ndarray, pool: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    # A burst of 5-15 sizeable transfers in the last week after a silent period.
+    per = rng.integers(5, 16, len(targets))
+    cust = np.repeat(targets, per)
+    last_week = PERIOD.total_seconds() - 7 * 86_400
+    return _pattern_block(
+        cust,
+        rng.uniform(2_000, 30_000, len(cust)),
+        _seconds(rng, len(cust), low=last_week),
+        rng.random(len(cust)) < 0.5,
+        rng.integers(0, pool, len(cust)),
+        np.zeros(len(cust), dtype=np.int64),
+        CHANNELS.index("online"),
+        "dormant_reactivation",
+    )
+
+
+def _high_risk_corridor(targets: np.ndarray, pool: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    # 2-5 outbound wires to high-risk jurisdictions.
+    per = rng.integers(2, 6, len(targets))
+    cust = np.repeat(targets, per)
+    return _pattern_block(
+        cust,
+        rng.uniform(5_000, 80_000, len(cust)),
+        _seconds(rng, len(cust)),
+        np.zeros(len(cust), dtype=bool),
+        rng.integers(0, pool, len(cust)),
+        len(COUNTRIES) + rng.integers(0, len(HIGH_RISK_COUNTRIES), len(cust)),
+        CHANNELS.index("transfer"),
+        "high_risk_corridor",
+    )
+
+
+_INJECTORS = {
+    "structuring": _structuring,
+    "rapid_movement": _rapid_movement,
+    "dormant_reactivation": _dormant_reactivation,
+    "high_risk_corridor": _high_risk_corridor,
+}
+
+
+def generate_dataset(
+    n_customers: Optional[int] = None,
+    n_transactions: Optional[int] = None,
+    seed: Optional[int] = None,
+    alert_rate: float = 0.6,
+    false_alert_rate: float = 0.002,
+) -> SyntheticDataset:
+    """
+    Build a synthetic dataset of roughly ``n_transactions`` transactions (the
+    injected patterns are part of the total) for ``n_customers`` customers.
+
+    Each pattern is given to a disjoint random set of customers. Alerts fire
+    on ``alert_rate`` of the pattern transactions plus ``false_alert_rate`` of
+    the background ones; ``patterns`` holds the ground truth per customer.
+    """
+    cfg = get_config().data
+    n_customers = cfg.n_customers if n_customers is None else n_customers
+    n_transactions = cfg.n_transactions if n_transactions is None else n_transactions
+    rng = np.random.default_rng(cfg.synthetic_seed if seed is None else seed)
+    if n_customers < 1 or n_transactions < 1:
+        raise ValueError("n_customers and n_transactions must be positive")
+
+    customers = generate_customers(n_customers, rng)
+    pool = max(2 * n_customers, 10)
+
+    shuffled = rng.permutation(n_customers)
+    counts = [int(round(PATTERN_RATES[p] * n_customers)) for p in PATTERNS]
+    bounds = np.cumsum([0, *counts])
+    blocks: List[Dict[str, np.ndarray]] = []
+    truth: List[pd.DataFrame] = []
+    for pattern, lo, hi in zip(PATTERNS, bounds[:-1], bounds[1:]):
+        targets = np.sort(shuffled[lo:hi])
+        if len(targets):
+            blocks.append(_INJECTORS[pattern](targets, pool, rng))
+            truth.append(pd.DataFrame({"customer_id": customers["customer_id"].to_numpy()[targets], "pattern": pattern}))
+
+    n_injected = sum(len(b["customer"]) for b in blocks)
+    background = _background(customers, max(n_transactions - n_injected, 0), rng)
+    # Dormant customers have no ordinary activity before their burst.
+    d = PATTERNS.index("dormant_reactivation")
+    dormant = shuffled[bounds[d] : bounds[d + 1]]
+    keep = ~np.isin(background["customer"], dormant)
+    background = {k: v[keep] for k, v in background.items()}
+    parts = [background, *blocks]
+    columns = {k: np.concatenate([p[k] for p in parts]) for k in background}
+
+    order = np.argsort(columns["seconds"], kind="stable")
+    columns = {k: v[order] for k, v in columns.items()}
+    n = len(order)
+    # Repeated labels are categoricals over small category sets.
+    transactions = pd.DataFrame(
+        {
+            "transaction_id": _ids("T", n),
+            "customer_id": pd.Categorical.from_codes(columns["customer"], categories=customers["customer_id"]),
+            "counterparty_id": pd.Categorical.from_codes(columns["counterparty"], categories=_ids("P", pool)),
+            "amount": columns["amount"],
+            "timestamp": START + pd.to_timedelta(columns["seconds"], unit="s"),
+            "direction": pd.Categorical.from_codes(columns["inflow"].astype(np.int8), categories=["out", "in"]),
+            "channel": pd.Categorical.from_codes(columns["channel"], categories=CHANNELS),
+            "counterparty_country": pd.Categorical.from_codes(
+                columns["country"], categories=COUNTRIES + HIGH_RISK_COUNTRIES
+            ),
+        }
+    )
+
+    injected = columns["pattern"] >= 0
+    alerted = np.where(injected, rng.random(n) < alert_rate, rng.random(n) < false_alert_rate)
+    rows = np.flatnonzero(alerted)
+    alerts = pd.DataFrame(
+        {
+            "alert_id": _ids("A", len(rows)),
+            "transaction_id": transactions["transaction_id"].take(rows).to_numpy(dtype=object),
+            "customer_id": transactions["customer_id"].take(rows).to_numpy(dtype=object),
+            "sar_filed": injected[rows],
+        }
+    )
+    patterns = pd.concat(truth, ignore_index=True) if truth else pd.DataFrame(columns=["customer_id", "pattern"])
+    return SyntheticDataset(customers=customers, transactions=transactions, alerts=alerts, patterns=patterns)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    cfg = get_config().data
+    parser = argparse.ArgumentParser(description="Generate synthetic SecureSAR input data.")
+    parser.add_argument("--customers", type=int, default=cfg.n_customers)
+    parser.add_argument("--transactions", type=int, default=cfg.n_transactions)
+    parser.add_argument("--seed", type=int, default=cfg.synthetic_seed)
+    parser.add_argument("--out", type=Path, default=cfg.raw_dir)
+    args = parser.parse_args(argv)
+    dataset = generate_dataset(args.customers, args.transactions, args.seed)
+    out = dataset.write(args.out)
+    print(
+        f"Wrote {len(dataset.customers)} customers, {len(dataset.transactions)} transactions "
+        f"and {len(dataset.alerts)} alerts to {out}"
+    )
+
+
+__all__ = ["PATTERNS", "SyntheticDataset", "generate_customers", "generate_dataset"]
+
+
+if __name__ == "__main__":
+    main()
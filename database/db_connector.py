@@ -5,10 +5,10 @@ from typing import Generator
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
-from src.utils.config import load_config
+from src.utils.config import get_config
 
 
-cfg = load_config()
+cfg = get_config()
 engine = create_engine(cfg.db.postgres_dsn, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import gzip
+import threading
+
+from fastapi import Request, Response
+
+try:  # optional: brotli is only used when installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+# Bodies smaller than this are sent uncompressed; compression would not pay off.
+MIN_COMPRESS_BYTES = 1_024
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": lambda raw: gzip.compress(raw, compresslevel=6)}
+if brotli is not None:
+    _COMPRESSORS["br"] = lambda raw: brotli.compress(raw, quality=5)
+# Server preference when the client accepts several encodings.
+_PREFERENCE = ("br", "gzip")
+_ETAG_SUFFIX = {"br": "-br", "gzip": "-gz"}
+
+
+@dataclass
+class CachedBody:
+    """
+    One serialized response plus its compressed variants, built on first use.
+    """
+
+    raw: bytes
+    _encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = _COMPRESSORS[encoding](self.raw)
+        return body
+
+
+def negotiate_encoding(accept_encoding: str, size: int) -> Optional[str]:
+    """
+    Content-coding to use for a body of ``size`` bytes, or None for identity.
+    """
+    if size < MIN_COMPRESS_BYTES or not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in {"0", "0.0", "0.00", "0.000"}:
+            continue
+        accepted.add(name.strip().lower())
+    for encoding in _PREFERENCE:
+        if encoding in _COMPRESSORS and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def etag_for(version: str, encoding: Optional[str] = None) -> str:
+    # Strong ETag per representation: encoded bodies get their own suffix.
+    return f'"{version}{_ETAG_SUFFIX.get(encoding or "", "")}"'
+
+
+def etag_matches(if_none_match: Optional[str], version: str) -> bool:
+    """
+    Whether ``If-None-Match`` names the current snapshot, in any encoding.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    accepted = {etag_for(version, enc) for enc in (None, *_ETAG_SUFFIX)}
+    return any(tag.strip() in accepted for tag in if_none_match.split(","))
+
+
+class SnapshotResponseCache:
+    """
+    Serialized response bodies keyed by request, each valid for the version it
+    was built under. Versions are per entry, so a resource whose version moves
+    on its own (a case's narrative draft) does not invalidate the others; an
+    entry from an older version is replaced on its next request. At most
+    ``max_entries`` bodies are kept (least recently used evicted first).
+    """
+
+    def __init__(self, max_entries: int = 4_096) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[str, CachedBody]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: str, key: Hashable) -> Optional[CachedBody]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def put(self, version: str, key: Hashable, entry: CachedBody) -> None:
+        with self._lock:
+            self._entries[key] = (version, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def snapshot_response(
+    request: Request,
+    cache: SnapshotResponseCache,
+    version: Callable[[], Optional[str]],
+    key: Hashable,
+    build: Callable[[], Optional[bytes]],
+) -> Optional[Response]:
+    """
+    JSON response for ``key`` under the current snapshot ``version``.
+
+    The cached body is reused or built (``build`` returns None for "not found",
+    which is passed back as None and not cached), so a conditional request for
+    a missing resource still gets its 404. A matching ``If-None-Match`` then
+    gets a 304 carrying the ETag of the negotiated encoding; a cached body
+    answers it without calling ``build``. Bodies are compressed when the
+    client accepts it and large enough.
+    """
+    current = version()
+    entry = cache.get(current, key) if current is not None else None
+    if entry is None:
+        raw = build()
+        if raw is None:
+            return None
+        entry = CachedBody(raw)
+        after = version()
+        # Only cache (and tag) a body if no new snapshot was published while building it.
+        if after is not None and after == current:
+            cache.put(after, key, entry)
+        else:
+            current = None
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), len(entry.raw))
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if current is not None:
+        headers["ETag"] = etag_for(current, encoding)
+        if etag_matches(request.headers.get("if-none-match"), current):
+            return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(entry.raw, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(entry.encoded(encoding), media_type="application/json", headers=headers)
+
+
+__all__ = [
+    "CachedBody",
+    "SnapshotResponseCache",
+    "negotiate_encoding",
+    "etag_for",
+    "etag_matches",
+    "snapshot_response",
+]
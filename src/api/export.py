@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+import io
+import json
+
+import pyarrow as pa
+
+from src.risk_scoring.risk_calculator import COMPONENT_COLUMNS
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+_STRING_LIST = pa.list_(pa.string())
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("customer_id", pa.string()),
+        ("risk_score", pa.float64()),
+        ("risk_band", pa.string()),
+        *[(column, pa.float64()) for column in COMPONENT_COLUMNS],
+        ("typologies", _STRING_LIST),
+        ("triggered_rules", _STRING_LIST),
+        ("evidence_transaction_ids", _STRING_LIST),
+    ]
+)
+
+Batch = Dict[str, List[Any]]
+
+
+def ndjson_chunks(batches: Iterable[Batch]) -> Iterator[bytes]:
+    """
+    One chunk of newline-delimited JSON objects per batch.
+    """
+    names = EXPORT_SCHEMA.names
+    for batch in batches:
+        columns = [batch[name] for name in names]
+        lines = [json.dumps(dict(zip(names, row)), separators=(",", ":")) for row in zip(*columns)]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def arrow_ipc_chunks(batches: Iterable[Batch]) -> Iterator[bytes]:
+    """
+    An Arrow IPC stream (schema, one record batch per batch, end-of-stream
+    marker) emitted in pieces as each batch is written, so only one batch is
+    buffered at a time. An export with no matching cases is a valid empty
+    stream.
+    """
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, EXPORT_SCHEMA) as writer:
+        yield drain()
+        for batch in batches:
+            writer.write_batch(pa.RecordBatch.from_pydict(batch, schema=EXPORT_SCHEMA))
+            yield drain()
+    yield drain()
+
+
+EXPORT_FORMATS: Dict[str, tuple[str, Callable[[Iterable[Batch]], Iterator[bytes]]]] = {
+    "ndjson": (NDJSON_MEDIA_TYPE, ndjson_chunks),
+    "arrow": (ARROW_STREAM_MEDIA_TYPE, arrow_ipc_chunks),
+}
+
+
+__all__ = [
+    "NDJSON_MEDIA_TYPE",
+    "ARROW_STREAM_MEDIA_TYPE",
+    "EXPORT_SCHEMA",
+    "EXPORT_FORMATS",
+    "ndjson_chunks",
+    "arrow_ipc_chunks",
+]
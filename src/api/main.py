@@ -1,14 +1,52 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from typing import Literal, Optional
+import time
 
-from src.api.models import CaseSummary, CaseDetail, NarrativeResponse, AuditEventModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+
+from src.api.caching import SnapshotResponseCache, snapshot_response
+from src.api.export import EXPORT_FORMATS
+from src.api.models import (
+    CaseSummary,
+    CaseDetail,
+    NarrativeResponse,
+    AuditEventModel,
+    DriftReport,
+    RescoreRequest,
+    RescoreResponse,
+    TransactionScoreRequest,
+    TransactionScoreResponse,
+)
+from src.governance.data_masking import mask_batch_for_role
+from src.governance.role_based_access import has_permission
+from src.services.case_snapshot import SnapshotUnavailableError
 from src.services.securesar_service import service
+from src.utils.metrics import HTTP_REQUEST_SECONDS, PROMETHEUS_CONTENT_TYPE, REGISTRY
 
 
 app = FastAPI(title="SecureSAR API", version="0.1.0")
 
+# Serialized case responses for the current pipeline snapshot. Case details
+# also carry background narrative drafts, so they have their own cache keyed
+# by snapshot and the case's own draft version.
+response_cache = SnapshotResponseCache()
+case_detail_cache = SnapshotResponseCache()
+_CASE_SUMMARIES = TypeAdapter(list[CaseSummary])
+
+
+def _snapshot_version() -> str | None:
+    return service.snapshot_version
+
+
+def _case_detail_version(case_id: str) -> str | None:
+    version = service.snapshot_version
+    return None if version is None else f"{version}.n{service.narrative_version(case_id)}"
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
@@ -18,28 +56,102 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template ("/api/cases/{case_id}"), not the raw path,
+        # so label cardinality stays bounded.
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+
+@app.exception_handler(SnapshotUnavailableError)
+async def snapshot_unavailable(request: Request, exc: SnapshotUnavailableError) -> Response:
+    # Attached worker started before the snapshot builder has published.
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health() -> dict:
     return {"status": "ok"}
 
 
 @app.get("/api/cases/high-risk", response_model=list[CaseSummary])
-async def list_high_risk_cases() -> list[CaseSummary]:
-    cases = service.list_high_risk_cases()
-    return [CaseSummary(**c) for c in cases]
+async def list_high_risk_cases(request: Request) -> Response:
+    def build() -> bytes:
+        cases = service.list_high_risk_cases()
+        return _CASE_SUMMARIES.dump_json([CaseSummary(**c) for c in cases])
+
+    return snapshot_response(request, response_cache, _snapshot_version, ("high-risk",), build)
+
+
+@app.get("/api/cases/export")
+def export_cases(
+    format: Literal["ndjson", "arrow"] = "ndjson",
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    band: Optional[list[str]] = Query(default=None),
+    typology: Optional[str] = None,
+    rule: Optional[str] = None,
+    batch_size: int = Query(default=5_000, ge=1, le=100_000),
+    role: str = Header(default="Analyst", alias="X-User-Role"),
+) -> StreamingResponse:
+    """
+    Stream every case matching the filters as NDJSON or an Arrow IPC stream,
+    one batch at a time, with PII masked per batch for roles that may not see it.
+    """
+    if not has_permission(role, "view_cases"):
+        raise HTTPException(status_code=403, detail=f"role {role!r} may not export cases")
+    try:
+        batches = service.export_cases(min_score, max_score, band, typology, rule, batch_size, actor=role)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    media_type, encode = EXPORT_FORMATS[format]
+    masked = (mask_batch_for_role(batch, role) for batch in batches)
+    extension = "arrows" if format == "arrow" else "ndjson"
+    return StreamingResponse(
+        encode(masked),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="cases.{extension}"'},
+    )
 
 
 @app.get("/api/cases/{case_id}", response_model=CaseDetail)
-async def get_case(case_id: str) -> CaseDetail:
-    case = service.get_case(case_id)
-    if not case:
+async def get_case(case_id: str, request: Request) -> Response:
+    def build() -> bytes | None:
+        case = service.get_case(case_id)
+        if not case:
+            return None
+        # narrative is filled in once a background draft is ready
+        return CaseDetail(**case).model_dump_json().encode("utf-8")
+
+    response = snapshot_response(
+        request, case_detail_cache, lambda: _case_detail_version(case_id), ("case", case_id), build
+    )
+    if response is None:
         raise HTTPException(status_code=404, detail="Case not found")
-    # narrative is optional and initially empty
-    return CaseDetail(**case, narrative=None)
+    return response
 
 
 @app.post("/api/cases/{case_id}/generate-sar", response_model=NarrativeResponse)
-async def generate_sar(case_id: str) -> NarrativeResponse:
+def generate_sar(case_id: str) -> NarrativeResponse:
+    # Plain def: the LLM call blocks, so it runs in the threadpool instead of the event loop.
     narrative = service.generate_narrative(case_id, actor="Analyst_1")
     if narrative is None:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -52,3 +164,44 @@ async def case_audit_log(case_id: str) -> list[AuditEventModel]:
     return [AuditEventModel(**e) for e in events]
 
 
+@app.post("/api/risk/rescore", response_model=RescoreResponse)
+async def rescore(
+    request: RescoreRequest,
+    role: str = Header(default="Analyst", alias="X-User-Role"),
+) -> RescoreResponse:
+    if not has_permission(role, "configure_models"):
+        raise HTTPException(status_code=403, detail=f"role {role!r} may not change risk weights")
+    try:
+        summary = service.rescore(request.model_dump(exclude_none=True), actor=role)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return RescoreResponse(**summary)
+
+
+@app.get("/api/drift", response_model=DriftReport)
+async def drift_report(run_id: Optional[str] = None) -> DriftReport:
+    """
+    Feature, anomaly-score and cluster drift of a pipeline run (the latest by
+    default) against the previous run and the baseline.
+    """
+    report = service.drift_report(run_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="No drift report for this run")
+    return DriftReport(**report)
+
+
+@app.post("/api/transactions/score", response_model=TransactionScoreResponse)
+async def score_transaction(request: TransactionScoreRequest) -> TransactionScoreResponse:
+    """
+    Real-time decision for one transaction: updates the customer's live state
+    and returns the new risk score, band and triggered rules.
+    """
+    try:
+        result = service.score_transaction(
+            request.transaction_id, request.customer_id, request.amount, request.timestamp, request.direction
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return TransactionScoreResponse(transaction_id=request.transaction_id, **result.to_dict())
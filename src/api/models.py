@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class CaseSummary(BaseModel):
@@ -22,6 +22,7 @@ class CaseDetail(BaseModel):
   typologies: List[str]
   triggered_rules: List[str]
   shap_values: Dict[str, float]
+  evidence_transaction_ids: List[str] = []
   narrative: Optional[str] = None
   created_at: Optional[datetime] = None
 
@@ -37,3 +38,57 @@ class AuditEventModel(BaseModel):
   details: Dict[str, Any]
 
 
+class RescoreRequest(BaseModel):
+  rule_weight: Optional[float] = Field(default=None, ge=0)
+  anomaly_weight: Optional[float] = Field(default=None, ge=0)
+  cluster_weight: Optional[float] = Field(default=None, ge=0)
+  low_band_max: Optional[float] = None
+  medium_band_max: Optional[float] = None
+
+
+class RescoreResponse(BaseModel):
+  cases: int
+  weights: Dict[str, float]
+  band_counts: Dict[str, int]
+  elapsed_ms: float
+
+
+class DriftHistogram(BaseModel):
+  name: str
+  psi_previous: Optional[float] = None
+  ks_previous: Optional[float] = None
+  psi_baseline: Optional[float] = None
+  ks_baseline: Optional[float] = None
+  drifted: bool
+
+
+class DriftReport(BaseModel):
+  run_id: str
+  previous_run_id: Optional[str] = None
+  baseline_run_id: Optional[str] = None
+  psi_threshold: float
+  ks_threshold: float
+  drifted: List[str]
+  histograms: List[DriftHistogram]
+
+
+class TransactionScoreRequest(BaseModel):
+  transaction_id: str
+  customer_id: str
+  amount: float = Field(gt=0, allow_inf_nan=False)
+  timestamp: Optional[datetime] = None
+  direction: Optional[str] = None
+
+
+class TransactionScoreResponse(BaseModel):
+  transaction_id: str
+  customer_id: str
+  risk_score: float
+  risk_band: str
+  triggered_rules: List[str]
+  components: Dict[str, float]
+  tx_count: int
+  total_amount: float
+  velocity_count: int
+  velocity_amount: float
+  duplicate: bool = False
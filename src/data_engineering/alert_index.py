@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class AlertDelta:
+    alert_ids: Set[str] = field(default_factory=set)
+    customer_ids: Set[str] = field(default_factory=set)
+    transaction_ids: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.alert_ids)
+
+
+class AlertIndex:
+    """
+    Alerts indexed by customer_id and transaction_id, with a per-alert content
+    fingerprint so that two snapshots can be diffed to find new or changed alerts.
+    """
+
+    def __init__(self, alerts: pd.DataFrame) -> None:
+        alerts = alerts.astype({"alert_id": str, "customer_id": str, "transaction_id": str})
+        self.alerts = alerts.set_index("alert_id", drop=False)
+        self.fingerprints = pd.Series(
+            pd.util.hash_pandas_object(self.alerts, index=False).to_numpy(),
+            index=self.alerts.index,
+        )
+        self.by_customer: Dict[str, np.ndarray] = alerts.groupby("customer_id").indices
+        self.by_transaction: Dict[str, np.ndarray] = alerts.groupby("transaction_id").indices
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    def for_customer(self, customer_id: str) -> pd.DataFrame:
+        return self.alerts.iloc[self.by_customer.get(customer_id, [])]
+
+    def for_transaction(self, transaction_id: str) -> pd.DataFrame:
+        return self.alerts.iloc[self.by_transaction.get(transaction_id, [])]
+
+    def diff(self, previous: Optional["AlertIndex"]) -> AlertDelta:
+        """
+        Alerts that are new, changed or removed relative to ``previous``, with the
+        customers and transactions they touch (on either side of the change).
+        """
+        if previous is None:
+            changed = self.alerts
+            removed = self.alerts.iloc[0:0]
+        else:
+            common = self.fingerprints.index.intersection(previous.fingerprints.index)
+            modified = common[
+                self.fingerprints.loc[common].to_numpy() != previous.fingerprints.loc[common].to_numpy()
+            ]
+            added = self.fingerprints.index.difference(previous.fingerprints.index)
+            gone = previous.fingerprints.index.difference(self.fingerprints.index)
+            changed = self.alerts.loc[added.append(modified)]
+            removed = previous.alerts.loc[gone.append(modified)]
+
+        touched = pd.concat([changed, removed])
+        return AlertDelta(
+            alert_ids=set(touched["alert_id"]),
+            customer_ids=set(touched["customer_id"]),
+            transaction_ids=set(touched["transaction_id"]),
+        )
+
+
+__all__ = ["AlertDelta", "AlertIndex"]
@@ -4,23 +4,33 @@ from pathlib import Path
 
 import pandas as pd
 
-from src.utils.config import load_config
+from src.utils.artifacts import new_run_id, write_artifact
+from src.utils.config import get_config
 from src.utils.helpers import ensure_dir
 
 
-def engineer_features(
-    customers: pd.DataFrame,
-    transactions: pd.DataFrame,
-) -> pd.DataFrame:
-    """
-    Create customer-level behavioural features from raw transactions.
+# Transaction columns the behavioural aggregates read.
+AGGREGATE_INPUT_COLUMNS = ["customer_id", "transaction_id", "amount", "timestamp"]
+AGGREGATE_COLUMNS = ["total_amount", "tx_count", "avg_amount"]
+
+
+def aggregate_transactions(transactions: pd.DataFrame) -> pd.DataFrame:
     """
-    # Total amount and count over 7 days
-    tx_sorted = transactions.sort_values("timestamp")
-    tx_sorted["date"] = tx_sorted["timestamp"].dt.date
+    Per-customer total amount, transaction count and average amount.
 
-    agg = (
-        tx_sorted.groupby("customer_id")
+    A stable sort by timestamp fixes the order in which each customer's
+    amounts are summed, so the result is the same for the full table, a
+    shard of it or a spilled partition (see ``out_of_core``), as long as each
+    customer's rows keep their relative order. Only the aggregated columns
+    are sorted, not the whole frame; amounts are summed as float64.
+    """
+    tx_sorted = (
+        transactions[AGGREGATE_INPUT_COLUMNS]
+        .astype({"amount": "float64"})
+        .sort_values("timestamp", kind="stable")
+    )
+    return (
+        tx_sorted.groupby("customer_id", observed=True)
         .agg(
             total_amount=("amount", "sum"),
             tx_count=("transaction_id", "count"),
@@ -29,28 +39,50 @@ def engineer_features(
         .reset_index()
     )
 
-    # Join static customer attributes
+
+def join_customer_aggregates(customers: pd.DataFrame, agg: pd.DataFrame) -> pd.DataFrame:
+    """
+    Static customer attributes joined with the aggregates (zero for customers
+    without transactions).
+    """
     features = customers.merge(agg, on="customer_id", how="left")
-    features[["total_amount", "tx_count", "avg_amount"]] = features[
-        ["total_amount", "tx_count", "avg_amount"]
-    ].fillna(0)
+    features[AGGREGATE_COLUMNS] = features[AGGREGATE_COLUMNS].fillna(0)
+    return features
 
-    # Simple deviation proxy: log(total_amount + 1)
-    features["deviation_score"] = (features["total_amount"] + 1).apply(lambda x: float(pd.np.log(x)))
 
-    return features
+def engineer_features(
+    customers: pd.DataFrame,
+    transactions: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Create customer-level behavioural features from raw transactions.
+    """
+    # deviation_score compares these aggregates with the customer's peers; it
+    # is added by PeerBaselines.apply once the whole population is known.
+    return join_customer_aggregates(customers, aggregate_transactions(transactions))
 
 
-def save_features(df: pd.DataFrame, path: Path | None = None) -> Path:
+def save_features(df: pd.DataFrame, path: Path | None = None, run_id: str | None = None) -> Path:
     """
-    Persist engineered features to data/processed.
+    Persist engineered features to data/processed/features as a Parquet
+    artifact for ``run_id`` (see ``src.utils.artifacts``). A ``path`` ending in
+    ``.csv`` writes a plain CSV file instead.
     """
-    cfg = load_config()
-    out_path = path or (cfg.data.processed_dir / "feature_engineered.csv")
-    ensure_dir(out_path.parent)
-    df.to_csv(out_path, index=False)
-    return out_path
+    cfg = get_config()
+    out_path = path or (cfg.data.processed_dir / "features")
+    if out_path.suffix == ".csv":
+        ensure_dir(out_path.parent)
+        df.to_csv(out_path, index=False)
+        return out_path
+    return write_artifact(df, out_path, run_id or new_run_id())
 
 
-__all__ = ["engineer_features", "save_features"]
+__all__ = [
+    "AGGREGATE_COLUMNS",
+    "AGGREGATE_INPUT_COLUMNS",
+    "aggregate_transactions",
+    "engineer_features",
+    "join_customer_aggregates",
+    "save_features",
+]
 
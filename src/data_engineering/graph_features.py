@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.interning import category_values, index_positions
+
+if TYPE_CHECKING:
+    from scipy import sparse
+
+
+INFLOW_DIRECTIONS = {"in", "inbound", "credit", "cr"}
+
+GRAPH_FEATURE_COLUMNS = [
+    "fan_in",
+    "fan_out",
+    "distinct_counterparties",
+    "pass_through_ratio",
+    "hops_to_flagged",
+    "flagged_shared_counterparties",
+]
+
+
+@dataclass
+class CounterpartyGraph:
+    """
+    Customer-to-counterparty adjacency as CSR matrices (rows = customers in
+    ``customer_ids`` order, values = transaction counts), split by direction.
+    ``self_nodes`` links each customer to its own counterparty node and
+    ``transaction_rows`` maps each input transaction to its customer row (-1 if unknown).
+    """
+
+    customer_ids: np.ndarray
+    counterparty_ids: np.ndarray
+    inflow: sparse.csr_matrix
+    outflow: sparse.csr_matrix
+    self_nodes: sparse.csr_matrix
+    transaction_rows: np.ndarray
+
+    @property
+    def combined(self) -> sparse.csr_matrix:
+        return (self.inflow + self.outflow).tocsr()
+
+
+def inflow_mask(transactions: pd.DataFrame, direction_column: str = "direction") -> np.ndarray:
+    """
+    Boolean mask of inbound transactions (all False without a direction column).
+    """
+    if direction_column not in transactions.columns:
+        return np.zeros(len(transactions), dtype=bool)
+    # Normalize the handful of distinct direction labels, not every row.
+    codes, labels = category_values(transactions[direction_column])
+    inflow_codes = [i for i, label in enumerate(labels) if str(label).lower() in INFLOW_DIRECTIONS]
+    return np.isin(codes, inflow_codes)
+
+
+def build_counterparty_graph(
+    transactions: pd.DataFrame,
+    customer_ids: Iterable[str],
+    counterparty_column: str = "counterparty_id",
+    direction_column: str = "direction",
+    inflow: Optional[np.ndarray] = None,
+) -> CounterpartyGraph:
+    """
+    Build the sparse customer x counterparty graph. Counterparties that are
+    themselves customers share a node with that customer, so direct transfers
+    between customers link them in the graph.
+    """
+    from scipy import sparse
+
+    customer_ids = pd.Index(pd.unique(np.asarray(list(customer_ids), dtype=object)))
+    n_customers = len(customer_ids)
+    rows = index_positions(customer_ids, transactions["customer_id"])
+    # Node ids come from the distinct counterparties, not every row; the first
+    # n_customers codes are each customer's own node.
+    row_codes, counterparties = category_values(transactions[counterparty_column])
+    cp_codes, cp_uniques = pd.factorize(np.concatenate([customer_ids.to_numpy(dtype=object), counterparties]))
+    self_cols = cp_codes[:n_customers]
+    cols = np.append(cp_codes[n_customers:], -1)[row_codes]
+
+    if inflow is None:
+        inflow = inflow_mask(transactions, direction_column)
+    valid = (rows >= 0) & (cols >= 0)
+    shape = (n_customers, len(cp_uniques))
+
+    def _matrix(mask: np.ndarray) -> sparse.csr_matrix:
+        m = sparse.csr_matrix(
+            (np.ones(int(mask.sum()), dtype=np.float32), (rows[mask], cols[mask])), shape=shape
+        )
+        m.sum_duplicates()
+        return m
+
+    self_nodes = sparse.csr_matrix(
+        (np.ones(n_customers, dtype=np.float32), (np.arange(n_customers), self_cols)), shape=shape
+    )
+    return CounterpartyGraph(
+        customer_ids=np.asarray(customer_ids),
+        counterparty_ids=np.asarray(cp_uniques),
+        inflow=_matrix(valid & inflow),
+        outflow=_matrix(valid & ~inflow),
+        self_nodes=self_nodes,
+        transaction_rows=rows,
+    )
+
+
+def _pass_through_ratio(
+    transactions: pd.DataFrame,
+    codes: np.ndarray,
+    inflow: np.ndarray,
+    n: int,
+    window: pd.Timedelta,
+) -> np.ndarray:
+    """
+    Share of each customer's inflow amount that leaves again within ``window``
+    of the most recent inflow (capped at 1). ``codes`` are customer row indices.
+    """
+    keep = codes >= 0
+    codes = codes[keep]
+    ts = transactions["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)[keep]
+    amount = transactions["amount"].to_numpy(dtype=np.float64)[keep]
+    inflow = inflow[keep]
+
+    # One sort by (customer, time); a packed int64 key is much faster than lexsort.
+    ts_s = ts // 1_000_000_000
+    span = int(ts_s.max() - ts_s.min()) + 1 if len(ts_s) else 1
+    if n * span < np.iinfo(np.int64).max:
+        order = np.argsort(codes.astype(np.int64) * span + (ts_s - ts_s.min()))
+    else:
+        order = np.lexsort((ts, codes))
+    codes, ts, amount, inflow = codes[order], ts[order], amount[order], inflow[order]
+    # Position of the latest inflow at or before each row; valid only within the same customer.
+    last_in = np.maximum.accumulate(np.where(inflow, np.arange(len(codes)), -1))
+    has_prior = (last_in >= 0) & (codes[np.maximum(last_in, 0)] == codes)
+    gap = ts - ts[np.maximum(last_in, 0)]
+    rapid_out = ~inflow & has_prior & (gap <= window.value)
+
+    in_amount = np.bincount(codes, weights=np.where(inflow, amount, 0.0), minlength=n)
+    rapid_amount = np.bincount(codes, weights=np.where(rapid_out, amount, 0.0), minlength=n)
+    ratio = np.divide(rapid_amount, in_amount, out=np.zeros(n), where=in_amount > 0)
+    return np.minimum(ratio, 1.0)
+
+
+def _flagged_exposure(
+    graph: CounterpartyGraph,
+    flagged: np.ndarray,
+    k: int,
+    max_counterparty_degree: Optional[int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hops to the nearest flagged customer (k + 1 when none is within k hops) and
+    the number of counterparties shared with flagged customers, computed by
+    sparse mat-vec products without materializing the customer x customer graph.
+    """
+    b = (graph.combined + graph.self_nodes).tocsc()
+    b.data[:] = 1.0
+    if max_counterparty_degree is not None:
+        # Very common counterparties (payroll, large merchants) link everyone.
+        degree = np.diff(b.indptr)
+        b = b[:, np.flatnonzero(degree <= max_counterparty_degree)]
+    b = b.tocsr()
+    bt = b.T.tocsr()
+
+    f = flagged.astype(np.float64)
+    shared = b @ (bt @ f)
+    own = np.asarray(b.sum(axis=1)).ravel()
+    shared = shared - own * f  # drop the customer's overlap with itself
+
+    hops = np.full(len(f), k + 1, dtype=np.int16)
+    hops[flagged] = 0
+    reached = flagged.copy()
+    frontier = f
+    for h in range(1, k + 1):
+        nxt = (b @ (bt @ frontier)) > 0
+        new = nxt & ~reached
+        if not new.any():
+            break
+        hops[new] = h
+        reached |= new
+        frontier = new.astype(np.float64)
+    return hops, shared
+
+
+def compute_graph_features(
+    customers: pd.DataFrame,
+    transactions: pd.DataFrame,
+    flagged_customers: Iterable[str] = (),
+    k: int = 2,
+    window: pd.Timedelta = pd.Timedelta(hours=48),
+    max_counterparty_degree: Optional[int] = 1_000,
+    counterparty_column: str = "counterparty_id",
+    direction_column: str = "direction",
+) -> pd.DataFrame:
+    """
+    Customer-level counterparty network features: fan-in/fan-out, distinct
+    counterparties, pass-through ratio and k-hop exposure to flagged customers.
+
+    Returns a frame keyed by ``customer_id``; when transactions carry no
+    counterparty column all graph features are zero.
+    """
+    ids = pd.Index(customers["customer_id"].drop_duplicates())
+    out = pd.DataFrame({"customer_id": ids})
+    if counterparty_column not in transactions.columns or transactions.empty:
+        for col in GRAPH_FEATURE_COLUMNS:
+            out[col] = 0
+        return out
+
+    inflow = inflow_mask(transactions, direction_column)
+    graph = build_counterparty_graph(transactions, ids, counterparty_column, direction_column, inflow)
+    out["fan_in"] = np.diff(graph.inflow.indptr)
+    out["fan_out"] = np.diff(graph.outflow.indptr)
+    out["distinct_counterparties"] = np.diff(graph.combined.indptr)
+    out["pass_through_ratio"] = _pass_through_ratio(
+        transactions, graph.transaction_rows, inflow, len(ids), window
+    )
+
+    flagged = ids.isin(list(flagged_customers))
+    hops, shared = _flagged_exposure(graph, np.asarray(flagged), k, max_counterparty_degree)
+    out["hops_to_flagged"] = hops
+    out["flagged_shared_counterparties"] = shared
+    return out
+
+
+__all__ = [
+    "GRAPH_FEATURE_COLUMNS",
+    "CounterpartyGraph",
+    "inflow_mask",
+    "build_counterparty_graph",
+    "compute_graph_features",
+]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
 
-from src.utils.config import load_config
+from src.data_engineering.interning import CATEGORICAL_TRANSACTION_COLUMNS
+from src.utils.config import get_config
 
 
 def load_raw_data(
@@ -16,7 +18,7 @@ def load_raw_data(
     """
     Load raw CSVs into DataFrames.
     """
-    cfg = load_config()
+    cfg = get_config()
     base = cfg.data.raw_dir
 
     customers_csv = customers_path or (base / "customers.csv")
@@ -24,11 +26,54 @@ def load_raw_data(
     alerts_csv = alerts_path or (base / "alerts.csv")
 
     customers = pd.read_csv(customers_csv)
-    transactions = pd.read_csv(tx_csv, parse_dates=["timestamp"])
+    transactions = read_transactions(tx_csv)
     alerts = pd.read_csv(alerts_csv)
 
     return customers, transactions, alerts
 
 
-__all__ = ["load_raw_data"]
+def read_transactions(path: Path, chunksize: int = 250_000) -> pd.DataFrame:
+    """
+    Read the transactions CSV with compact dtypes.
+
+    Repeated id/label columns are parsed straight into categoricals and
+    ``transaction_id`` into Arrow-backed strings, so no Python string is kept
+    per row. The file is parsed in chunks whose columns are appended as they
+    arrive (categorical codes remapped onto one growing set of categories), so
+    peak memory is the final frame plus roughly one chunk of parser overhead.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes: Dict[str, str] = {col: "category" for col in CATEGORICAL_TRANSACTION_COLUMNS if col in header}
+    if "transaction_id" in header:
+        dtypes["transaction_id"] = "string[pyarrow]"
+    parse_dates = ["timestamp"] if "timestamp" in header else False
+
+    parts: Dict[str, List[object]] = {}
+    categories: Dict[str, pd.Index] = {}
+    for chunk in pd.read_csv(path, parse_dates=parse_dates, dtype=dtypes, chunksize=chunksize):
+        for col in chunk.columns:
+            values = chunk[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                known = categories.get(col, pd.Index([], dtype=object))
+                known = known.append(values.cat.categories.difference(known, sort=False))
+                categories[col] = known
+                remap = np.append(known.get_indexer(values.cat.categories), -1).astype(np.int32)
+                parts.setdefault(col, []).append(remap[values.cat.codes.to_numpy()])
+            else:
+                parts.setdefault(col, []).append(values)
+    if not parts:
+        return pd.read_csv(path, parse_dates=parse_dates, dtype=dtypes)
+
+    columns: Dict[str, object] = {}
+    for col in list(parts):
+        pieces = parts.pop(col)
+        if col in categories:
+            codes = np.concatenate(pieces)  # type: ignore[arg-type]
+            columns[col] = pd.Categorical.from_codes(codes, categories=categories[col])
+        else:
+            columns[col] = pd.concat(pieces, ignore_index=True)  # type: ignore[arg-type]
+    return pd.DataFrame(columns, copy=False)
+
+
+__all__ = ["load_raw_data", "read_transactions"]
 
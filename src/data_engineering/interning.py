@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+# Low-cardinality transaction columns stored as categoricals.
+CATEGORICAL_TRANSACTION_COLUMNS = ["customer_id", "counterparty_id", "direction"]
+
+
+def category_values(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (codes, uniques) for a column without materializing one Python object per
+    row when it is already categorical. Codes are -1 for missing values.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories.to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def index_positions(index: pd.Index, values: pd.Series) -> np.ndarray:
+    """
+    ``index.get_indexer(values)`` that only looks up each distinct value once.
+    """
+    codes, uniques = category_values(values)
+    positions = np.append(index.get_indexer(uniques), -1)
+    return positions[codes].astype(np.int64)
+
+
+@dataclass(frozen=True)
+class CustomerDictionary:
+    """
+    Pipeline-wide customer id dictionary: every customer id maps to a stable
+    int32 code, and frames that repeat customer ids (transactions, rule hits)
+    store them as categoricals sharing this one dtype instead of one Python
+    string per row. Known customers come first, in input order.
+    """
+
+    dtype: pd.CategoricalDtype
+
+    @classmethod
+    def build(cls, customer_ids: pd.Series, *others: pd.Series) -> "CustomerDictionary":
+        ids: List[np.ndarray] = [category_values(customer_ids)[1]]
+        ids.extend(category_values(other)[1] for other in others)
+        categories = pd.unique(np.concatenate(ids)) if ids else np.empty(0, dtype=object)
+        return cls(pd.CategoricalDtype(categories=pd.Index(categories, dtype=object)))
+
+    def __len__(self) -> int:
+        return len(self.dtype.categories)
+
+    @property
+    def ids(self) -> pd.Index:
+        return self.dtype.categories
+
+    def encode(self, ids: pd.Series | Iterable[str]) -> np.ndarray:
+        """
+        int32 code per id (-1 for ids not in the dictionary).
+        """
+        series = ids if isinstance(ids, pd.Series) else pd.Series(list(ids), dtype=object)
+        return index_positions(self.ids, series).astype(np.int32)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return self.ids.to_numpy(dtype=object)[np.asarray(codes)]
+
+    def intern(self, ids: pd.Series) -> pd.Series:
+        """
+        ``ids`` as a categorical with the dictionary dtype.
+        """
+        codes = self.encode(ids)
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=self.dtype), index=ids.index, name=ids.name)
+
+
+def intern_transactions(transactions: pd.DataFrame, dictionary: CustomerDictionary) -> pd.DataFrame:
+    """
+    Store customer ids with the shared dictionary and the other repeated string
+    columns (counterparty, direction) as categoricals. Values are unchanged.
+    """
+    out = transactions.copy(deep=False)
+    out["customer_id"] = dictionary.intern(transactions["customer_id"])
+    for col in CATEGORICAL_TRANSACTION_COLUMNS[1:]:
+        if col in out.columns and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = out[col].astype("category")
+    return out
+
+
+__all__ = [
+    "CATEGORICAL_TRANSACTION_COLUMNS",
+    "CustomerDictionary",
+    "category_values",
+    "index_positions",
+    "intern_transactions",
+]
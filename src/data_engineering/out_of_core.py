@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import argparse
+import json
+import math
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.data_engineering.feature_engineering import (
+    AGGREGATE_INPUT_COLUMNS,
+    aggregate_transactions,
+    join_customer_aggregates,
+    save_features,
+)
+from src.data_engineering.interning import category_values
+from src.data_engineering.validation import RejectionReport, iter_validated_transactions, validate_customers
+from src.utils.config import get_config
+from src.utils.helpers import logger
+from src.utils.memory import frame_nbytes
+
+
+# Hash partitions created at the first spill when the caller gives no estimate.
+DEFAULT_PARTITIONS = 16
+MAX_PARTITIONS = 256
+# A partition still over budget is split again with a different hash, this many times at most.
+MAX_DEPTH = 4
+# Rough in-memory size of one transaction row (ids as Python strings), for sizing chunks and partitions.
+ROW_BYTES = 300
+_SCHEMA = pa.schema(
+    [
+        ("customer_id", pa.string()),
+        ("transaction_id", pa.string()),
+        ("amount", pa.float64()),
+        ("timestamp", pa.timestamp("ns")),
+    ]
+)
+
+
+@dataclass
+class SpillStats:
+    rows: int = 0
+    spilled_rows: int = 0
+    partitions: int = 0  # partitions aggregated (0 when nothing was spilled)
+    max_depth: int = 0
+    peak_buffer_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _aggregate_input(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    The aggregated columns of a validated chunk, with the types they are spilled as.
+    """
+    frame = chunk.reindex(columns=AGGREGATE_INPUT_COLUMNS)
+    return pd.DataFrame(
+        {
+            "customer_id": frame["customer_id"].astype(str),
+            "transaction_id": frame["transaction_id"].astype(object).where(frame["transaction_id"].notna(), None),
+            "amount": frame["amount"].astype(np.float64),
+            "timestamp": pd.to_datetime(frame["timestamp"]),
+        }
+    )
+
+
+def _partition_of(customer_ids: pd.Series, n_partitions: int, depth: int) -> np.ndarray:
+    """
+    Partition per row from a 64-bit hash of customer_id. Each depth uses a
+    different hash key, so re-splitting a partition spreads its customers.
+    """
+    codes, uniques = category_values(customer_ids)
+    hashes = pd.util.hash_array(np.asarray([str(u) for u in uniques], dtype=object), hash_key=f"securesar{depth:07d}")
+    parts = (hashes % np.uint64(n_partitions)).astype(np.int32)
+    return np.append(parts, 0)[codes]
+
+
+class _Partitions:
+    """
+    Hash-partitioned spill files (Arrow IPC) at one depth. Rows are appended
+    in arrival order, so every customer's rows keep their relative order.
+    """
+
+    def __init__(self, directory: Path, n_partitions: int, depth: int) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.n_partitions = n_partitions
+        self.depth = depth
+        self.nbytes = np.zeros(n_partitions, dtype=np.int64)
+        self._writers: Dict[int, pa.ipc.RecordBatchFileWriter] = {}
+
+    def path(self, partition: int) -> Path:
+        return self.directory / f"part-{partition:04d}.arrow"
+
+    def write(self, frame: pd.DataFrame) -> None:
+        parts = _partition_of(frame["customer_id"], self.n_partitions, self.depth)
+        order = np.argsort(parts, kind="stable")
+        bounds = np.searchsorted(parts[order], np.arange(self.n_partitions + 1))
+        for partition in np.flatnonzero(np.diff(bounds)):
+            piece = frame.iloc[order[bounds[partition] : bounds[partition + 1]]]
+            writer = self._writers.get(partition)
+            if writer is None:
+                writer = pa.ipc.new_file(str(self.path(partition)), _SCHEMA)
+                self._writers[partition] = writer
+            writer.write_table(pa.Table.from_pandas(piece, schema=_SCHEMA, preserve_index=False))
+            self.nbytes[partition] += frame_nbytes(piece)
+
+    def close(self) -> List[int]:
+        """
+        Finish the files; returns the non-empty partitions.
+        """
+        for writer in self._writers.values():
+            writer.close()
+        written = sorted(self._writers)
+        self._writers = {}
+        return written
+
+
+def _read_batches(path: Path) -> Iterator[pd.DataFrame]:
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).to_pandas()
+
+
+def _read_partition(path: Path) -> pd.DataFrame:
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _aggregate_partitions(spill: _Partitions, budget: int, stats: SpillStats) -> Iterator[pd.DataFrame]:
+    stats.max_depth = max(stats.max_depth, spill.depth)
+    for partition in spill.close():
+        path = spill.path(partition)
+        if spill.nbytes[partition] > budget and spill.depth < MAX_DEPTH:
+            sub = _Partitions(spill.directory / f"split-{partition:04d}", spill.n_partitions, spill.depth + 1)
+            for batch in _read_batches(path):
+                sub.write(batch)
+            path.unlink()
+            if np.count_nonzero(sub.nbytes) > 1:
+                yield from _aggregate_partitions(sub, budget, stats)
+                continue
+            # All rows belong to one customer, which cannot be split further.
+            (single,) = sub.close()
+            path = sub.path(single)
+            logger.warning(
+                "Out-of-core aggregation: one customer's transactions (%d bytes) exceed the memory budget",
+                int(sub.nbytes[single]),
+            )
+        yield aggregate_transactions(_read_partition(path))
+        stats.partitions += 1
+        path.unlink()
+
+
+def aggregate_out_of_core(
+    chunks: Iterable[pd.DataFrame],
+    memory_limit_bytes: int,
+    spill_dir: Optional[Path] = None,
+    n_partitions: int = DEFAULT_PARTITIONS,
+    stats: Optional[SpillStats] = None,
+) -> pd.DataFrame:
+    """
+    ``aggregate_transactions`` over transactions arriving in ``chunks`` (in
+    file order) while holding at most about ``memory_limit_bytes`` of them.
+
+    Chunks are buffered until half the limit is reached (the aggregation's
+    sort needs a copy of its input); if the input fits, it is aggregated in
+    memory. Otherwise the buffer and every later chunk are hash-partitioned
+    by customer to Arrow files under ``spill_dir`` and each partition is
+    aggregated on its own, split again first if it is still over budget.
+    A customer's rows all land in one partition in their original order, so
+    the aggregates are identical to those of the in-memory path.
+    """
+    if memory_limit_bytes <= 0:
+        raise ValueError("memory_limit_bytes must be positive")
+    stats = stats if stats is not None else SpillStats()
+    budget = memory_limit_bytes // 2
+    buffer: List[pd.DataFrame] = []
+    buffered = 0
+    with tempfile.TemporaryDirectory(prefix="securesar-spill-", dir=spill_dir) as tmp:
+        spill: Optional[_Partitions] = None
+        for chunk in chunks:
+            frame = _aggregate_input(chunk)
+            stats.rows += len(frame)
+            if spill is not None:
+                spill.write(frame)
+                stats.spilled_rows += len(frame)
+                continue
+            buffer.append(frame)
+            buffered += frame_nbytes(frame)
+            stats.peak_buffer_bytes = max(stats.peak_buffer_bytes, buffered)
+            if buffered > budget:
+                spill = _Partitions(Path(tmp), min(max(n_partitions, 2), MAX_PARTITIONS), depth=0)
+                for frame in buffer:
+                    spill.write(frame)
+                    stats.spilled_rows += len(frame)
+                buffer, buffered = [], 0
+
+        if spill is None:
+            frame = pd.concat(buffer, ignore_index=True) if buffer else _aggregate_input(pd.DataFrame())
+            return aggregate_transactions(frame)
+        parts = list(_aggregate_partitions(spill, budget, stats))
+    return pd.concat(parts, ignore_index=True)
+
+
+def engineer_features_out_of_core(
+    customers: pd.DataFrame,
+    transactions_path: Path,
+    memory_limit_bytes: Optional[int] = None,
+    spill_dir: Optional[Path] = None,
+    n_workers: Optional[int] = None,
+    report: Optional[RejectionReport] = None,
+    stats: Optional[SpillStats] = None,
+) -> pd.DataFrame:
+    """
+    ``engineer_features`` for a transactions CSV that may not fit in memory:
+    the file is validated in chunks (``iter_validated_transactions``) and
+    aggregated by ``aggregate_out_of_core``. The ceiling and spill directory
+    default to ``pipeline.feature_memory_limit_mb`` and ``pipeline.spill_dir``.
+    """
+    cfg = get_config().pipeline
+    limit = memory_limit_bytes or cfg.feature_memory_limit_mb * 1024 * 1024
+    workers = n_workers or 1
+    # Up to 2 * workers chunks are in flight during validation; keep them within a quarter of the budget.
+    chunksize = int(min(250_000, max(1_000, limit // 8 // (2 * workers) // ROW_BYTES)))
+    expected = transactions_path.stat().st_size * ROW_BYTES // 100  # ~100 CSV bytes per row
+    n_partitions = min(MAX_PARTITIONS, max(DEFAULT_PARTITIONS, math.ceil(2 * expected / max(limit // 2, 1))))
+    chunks = iter_validated_transactions(transactions_path, chunksize, workers, report)
+    agg = aggregate_out_of_core(chunks, limit, spill_dir or cfg.spill_dir, n_partitions, stats)
+    return join_customer_aggregates(customers, agg)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Customer features from a transactions file larger than memory.")
+    parser.add_argument("--customers", type=Path, help="customers CSV (default: data.raw_dir/customers.csv)")
+    parser.add_argument("--transactions", type=Path, help="transactions CSV (default: data.raw_dir/transactions.csv)")
+    parser.add_argument("--memory-mb", type=int, help="memory ceiling (default: pipeline.feature_memory_limit_mb)")
+    parser.add_argument("--spill-dir", type=Path, help="directory for spilled partitions (default: pipeline.spill_dir)")
+    parser.add_argument("--workers", type=int, default=1, help="validation worker processes")
+    parser.add_argument("--output", type=Path, help="features CSV or artifact directory (default: processed/features)")
+    args = parser.parse_args(argv)
+
+    raw = get_config().data.raw_dir
+    customers = validate_customers(pd.read_csv(args.customers or raw / "customers.csv"))
+    stats = SpillStats()
+    report = RejectionReport()
+    features = engineer_features_out_of_core(
+        customers,
+        args.transactions or raw / "transactions.csv",
+        args.memory_mb * 1024 * 1024 if args.memory_mb else None,
+        args.spill_dir,
+        args.workers,
+        report,
+        stats,
+    )
+    out = save_features(features, args.output)
+    print(json.dumps({"output": str(out), "customers": len(features), **stats.to_dict(), "rejected": report.counts}))
+    return 0
+
+
+__all__ = ["SpillStats", "aggregate_out_of_core", "engineer_features_out_of_core"]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
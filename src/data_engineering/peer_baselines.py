@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.interning import category_values
+from src.utils.config import get_config
+
+
+# Behavioural features compared against peers, on a log1p scale (amounts and
+# counts are heavy-tailed and non-negative).
+PEER_FEATURES = ["total_amount", "tx_count", "avg_amount"]
+PEER_Z_COLUMNS = [f"peer_z_{name}" for name in PEER_FEATURES]
+PEER_PERCENTILES = (0.10, 0.90)
+# Baseline row computed over every customer; used for small or unseen segments.
+POPULATION = "*"
+# MAD * 1.4826 and (p90 - p10) / 2.5631 both estimate the standard deviation of a normal.
+MAD_TO_SD = 1.4826
+P10_P90_TO_SD = 2.5631
+# Floor for the robust scale, in log1p units, so a segment of identical values
+# does not turn any difference into an unbounded z-score.
+MIN_SCALE = 0.01
+AGE_COLUMN = "age"
+
+
+def _age_band(edges: Sequence[float], band: int) -> str:
+    lower = "" if band == 0 else f"{edges[band - 1]:g}"
+    upper = "" if band == len(edges) else f"{edges[band]:g}"
+    return f"{lower}-{upper}"
+
+
+def peer_segments(
+    features: pd.DataFrame,
+    segment_columns: Sequence[str],
+    age_band_edges: Sequence[float],
+) -> np.ndarray:
+    """
+    Peer segment label of each row, e.g. ``"segment=sme|age=30-45"``, from the
+    static customer attributes. Attributes missing from ``features`` are
+    ignored; rows with a missing attribute value get the POPULATION label.
+    Labels are built once per distinct combination, not per row.
+    """
+    n = len(features)
+    key = np.zeros(n, dtype=np.int64)
+    missing = np.zeros(n, dtype=bool)
+    parts: List[Tuple[str, np.ndarray]] = []
+    for column in segment_columns:
+        if column not in features.columns:
+            continue
+        codes, uniques = category_values(features[column])
+        parts.append((column, np.asarray([str(u) for u in uniques], dtype=object)))
+        missing |= codes < 0
+        key = key * (len(uniques) + 1) + np.maximum(codes, 0)
+    if age_band_edges and AGE_COLUMN in features.columns:
+        age = features[AGE_COLUMN].to_numpy(dtype=np.float64)
+        bands = np.searchsorted(np.asarray(age_band_edges, dtype=np.float64), age, side="right")
+        parts.append((AGE_COLUMN, np.asarray([_age_band(age_band_edges, b) for b in range(len(age_band_edges) + 1)])))
+        missing |= np.isnan(age)
+        key = key * (len(age_band_edges) + 2) + bands
+    if not parts:
+        return np.full(n, POPULATION, dtype=object)
+
+    out = np.full(n, POPULATION, dtype=object)
+    uniq, inverse = np.unique(key[~missing], return_inverse=True)
+    labels = np.empty(len(uniq), dtype=object)
+    for i, k in enumerate(uniq):
+        values: List[str] = []
+        for column, names in reversed(parts):
+            radix = len(names) + 1
+            values.append(f"{column}={names[int(k % radix)]}")
+            k //= radix
+        labels[i] = "|".join(reversed(values))
+    out[~missing] = labels[inverse]
+    return out
+
+
+def _robust_stats(values: np.ndarray, groups: np.ndarray) -> pd.DataFrame:
+    """
+    Per-group count, median, MAD and percentiles of each PEER_FEATURES column
+    of ``values`` (already log1p-transformed), with grouped vectorized ops.
+    """
+    frame = pd.DataFrame(values, columns=PEER_FEATURES)
+    grouped = frame.groupby(groups, sort=True)
+    median = grouped.median()
+    deviations = pd.DataFrame(
+        np.abs(values - median.reindex(groups).to_numpy()), columns=PEER_FEATURES
+    )
+    mad = deviations.groupby(groups, sort=True).median()
+    quantiles = grouped.quantile(list(PEER_PERCENTILES)).unstack()
+    out = pd.DataFrame({"count": grouped.size()}, index=median.index)
+    for name in PEER_FEATURES:
+        out[f"{name}_median"] = median[name]
+        out[f"{name}_mad"] = mad[name]
+        for q in PEER_PERCENTILES:
+            out[f"{name}_p{int(q * 100)}"] = quantiles[(name, q)]
+    return out
+
+
+def _log_values(features: pd.DataFrame) -> np.ndarray:
+    values = features[PEER_FEATURES].to_numpy(dtype=np.float64)
+    return np.log1p(np.clip(np.nan_to_num(values, nan=0.0), 0.0, None))
+
+
+@dataclass(frozen=True)
+class PeerBaselines:
+    """
+    Robust per-segment statistics of the behavioural features, fitted on one
+    full run and reused to score any subset of customers (incremental runs,
+    live scoring) without another pass over the population.
+
+    ``stats`` has one row per segment label plus the POPULATION row; the
+    segmenting settings are kept with it so later subsets are segmented the
+    way the baselines were fitted.
+    """
+
+    stats: pd.DataFrame
+    segment_columns: Tuple[str, ...]
+    age_band_edges: Tuple[float, ...]
+    min_segment_size: int
+
+    def segments(self, features: pd.DataFrame) -> np.ndarray:
+        return peer_segments(features, self.segment_columns, self.age_band_edges)
+
+    def parameters(self, features: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (center, scale) per row and PEER_FEATURES column: the segment's median
+        and robust standard deviation, or the population's where the segment
+        is unknown or had fewer than ``min_segment_size`` customers.
+        """
+        labels = self.segments(features)
+        uniq, inverse = np.unique(labels.astype(str), return_inverse=True)
+        stats = self.stats
+        usable = stats.index[(stats["count"] >= self.min_segment_size) | (stats.index == POPULATION)]
+        rows = stats.reindex(pd.Index(uniq).where(pd.Index(uniq).isin(usable), POPULATION))
+
+        center = rows[[f"{name}_median" for name in PEER_FEATURES]].to_numpy(dtype=np.float64)
+        scale = MAD_TO_SD * rows[[f"{name}_mad" for name in PEER_FEATURES]].to_numpy(dtype=np.float64)
+        spread = (
+            rows[[f"{name}_p90" for name in PEER_FEATURES]].to_numpy(dtype=np.float64)
+            - rows[[f"{name}_p10" for name in PEER_FEATURES]].to_numpy(dtype=np.float64)
+        ) / P10_P90_TO_SD
+        # MAD is 0 when over half a segment shares one value; fall back to the
+        # percentile spread, then to the population scale.
+        scale = np.where(scale > 0, scale, spread)
+        population = stats.loc[POPULATION]
+        population_scale = np.array(
+            [
+                MAD_TO_SD * population[f"{name}_mad"]
+                or (population[f"{name}_p90"] - population[f"{name}_p10"]) / P10_P90_TO_SD
+                for name in PEER_FEATURES
+            ],
+            dtype=np.float64,
+        )
+        scale = np.where(scale > 0, scale, population_scale)
+        return center[inverse], np.maximum(scale, MIN_SCALE)[inverse]
+
+    def apply(self, features: pd.DataFrame) -> pd.DataFrame:
+        """
+        ``features`` with a robust z-score per PEER_FEATURES column against
+        the customer's peers and ``deviation_score`` set to the largest of
+        them (how far above its peers the customer is on any of them).
+        """
+        center, scale = self.parameters(features)
+        z = (_log_values(features) - center) / scale
+        out = features.copy()
+        for pos, column in enumerate(PEER_Z_COLUMNS):
+            out[column] = z[:, pos]
+        out["deviation_score"] = z.max(axis=1) if len(out) else np.empty(0, dtype=np.float64)
+        return out
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        The statistics with a ``segment`` column, for storage as an artifact.
+        """
+        return self.stats.rename_axis("segment").reset_index()
+
+
+def fit_peer_baselines(
+    features: pd.DataFrame,
+    segment_columns: Optional[Sequence[str]] = None,
+    age_band_edges: Optional[Sequence[float]] = None,
+    min_segment_size: Optional[int] = None,
+) -> PeerBaselines:
+    """
+    Fit segment and population baselines on the full customer population;
+    settings default to the ``peers`` section of the config.
+    """
+    cfg = get_config().peers
+    segment_columns = tuple(cfg.segment_columns if segment_columns is None else segment_columns)
+    age_band_edges = tuple(float(e) for e in (cfg.age_band_edges if age_band_edges is None else age_band_edges))
+    min_segment_size = cfg.min_segment_size if min_segment_size is None else min_segment_size
+    if len(features) == 0:
+        raise ValueError("Peer baselines need at least one customer.")
+
+    values = _log_values(features)
+    labels = peer_segments(features, segment_columns, age_band_edges).astype(str)
+    by_segment = _robust_stats(values, labels)
+    population = _robust_stats(values, np.full(len(features), POPULATION))
+    stats = pd.concat([population, by_segment.drop(index=POPULATION, errors="ignore")])
+    return PeerBaselines(
+        stats=stats,
+        segment_columns=segment_columns,
+        age_band_edges=age_band_edges,
+        min_segment_size=int(min_segment_size),
+    )
+
+
+__all__ = [
+    "PEER_FEATURES",
+    "PEER_Z_COLUMNS",
+    "POPULATION",
+    "PeerBaselines",
+    "fit_peer_baselines",
+    "peer_segments",
+]
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+
+if TYPE_CHECKING:
+    from sklearn.preprocessing import StandardScaler
 
 
 def split_train_test(
@@ -16,6 +17,8 @@ def split_train_test(
     """
     Split features (and optional labels) into train and test sets.
     """
+    from sklearn.model_selection import train_test_split
+
     if label_column and label_column in features.columns:
         X = features.drop(columns=[label_column])
         y = features[label_column]
@@ -34,6 +37,8 @@ def scale_features(X_train: pd.DataFrame, X_test: pd.DataFrame) -> Tuple[pd.Data
     """
     Standardize numeric features using sklearn's StandardScaler.
     """
+    from sklearn.preprocessing import StandardScaler
+
     scaler = StandardScaler()
     numeric_cols = X_train.select_dtypes(include=["number"]).columns
     X_train_scaled = X_train.copy()
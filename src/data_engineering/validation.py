@@ -1,25 +1,248 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+import os
+
+import numpy as np
 import pandas as pd
 
+from src.utils.helpers import ensure_dir, write_json
+
+
+TRANSACTION_REQUIRED = ["transaction_id", "customer_id", "amount"]
+
+
+@dataclass
+class RejectionReport:
+    """
+    Per-rule rejection counts plus a few sample rows for each rule.
+    """
+
+    rows_read: int = 0
+    rows_accepted: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    samples: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    max_samples: int = 5
+
+    def add(self, rule: str, rows: pd.DataFrame) -> None:
+        if rows.empty:
+            return
+        self.counts[rule] = self.counts.get(rule, 0) + len(rows)
+        kept = self.samples.setdefault(rule, [])
+        room = self.max_samples - len(kept)
+        for rec in rows.head(max(room, 0)).to_dict("records"):
+            kept.append({k: None if pd.isna(v) else str(v) for k, v in rec.items()})
+
+    def merge(self, other: "RejectionReport") -> None:
+        self.rows_read += other.rows_read
+        self.rows_accepted += other.rows_accepted
+        for rule, n in other.counts.items():
+            self.counts[rule] = self.counts.get(rule, 0) + n
+            kept = self.samples.setdefault(rule, [])
+            kept.extend(other.samples.get(rule, [])[: max(self.max_samples - len(kept), 0)])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows_read": self.rows_read,
+            "rows_accepted": self.rows_accepted,
+            "rows_rejected": sum(self.counts.values()),
+            "counts": dict(self.counts),
+            "samples": self.samples,
+        }
+
+    def write(self, path: Path) -> Path:
+        write_json(path, self.to_dict())
+        return path
 
-def validate_customers(df: pd.DataFrame) -> pd.DataFrame:
+
+def validate_customers(df: pd.DataFrame, report: Optional[RejectionReport] = None) -> pd.DataFrame:
     """
     Basic quality checks on customers.
     """
-    df = df.drop_duplicates(subset=["customer_id"])
-    df = df.dropna(subset=["customer_id"])
-    return df
+    missing = df["customer_id"].isna()
+    duplicate = df["customer_id"].duplicated() & ~missing
+    if report is not None:
+        report.rows_read += len(df)
+        report.add("missing_customer_id", df[missing])
+        report.add("duplicate_customer_id", df[duplicate])
+        report.rows_accepted += int((~(missing | duplicate)).sum())
+    return df[~(missing | duplicate)]
+
+
+def _coerce_transactions(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Tuple[str, np.ndarray]]]:
+    """
+    Coerce amount/timestamp once and return the frame with rule masks in
+    priority order (a row is attributed to the first rule it fails).
+    """
+    missing = np.logical_or.reduce([df[col].isna().to_numpy() for col in TRANSACTION_REQUIRED])
+    if df["amount"].dtype.kind not in "if":
+        df = df.assign(amount=pd.to_numeric(df["amount"], errors="coerce"))
+    checks: List[Tuple[str, np.ndarray]] = [("missing_required", missing)]
+    checks.append(("invalid_amount", df["amount"].isna().to_numpy() & ~missing))
+    checks.append(("non_positive_amount", (df["amount"] <= 0).to_numpy()))
+    if "timestamp" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        parsed = pd.to_datetime(df["timestamp"], errors="coerce")
+        checks.append(("invalid_timestamp", (parsed.isna() & df["timestamp"].notna()).to_numpy()))
+        df = df.assign(timestamp=parsed)
+    return df, checks
+
+
+def _reject(df: pd.DataFrame, checks: List[Tuple[str, np.ndarray]], report: Optional[RejectionReport]) -> np.ndarray:
+    rejected = np.zeros(len(df), dtype=bool)
+    for rule, mask in checks:
+        hit = mask & ~rejected
+        if report is not None:
+            report.add(rule, df[hit])
+        rejected |= hit
+    return rejected
+
+
+def _duplicate_mask(ids: pd.Series) -> np.ndarray:
+    """
+    Rows whose id already appeared earlier in ``ids``. A stable sort puts equal
+    ids next to each other in original order; unlike hashing, this does not
+    build one Python object per row for Arrow-backed string columns.
+    """
+    order = ids.argsort(kind="stable").to_numpy()
+    values = ids.array.take(order)
+    same = pd.array(values[1:] == values[:-1], dtype="boolean").to_numpy(dtype=bool, na_value=False)
+    duplicate = np.zeros(len(ids), dtype=bool)
+    duplicate[order[1:][same]] = True
+    return duplicate
 
 
-def validate_transactions(df: pd.DataFrame) -> pd.DataFrame:
+def validate_transactions(df: pd.DataFrame, report: Optional[RejectionReport] = None) -> pd.DataFrame:
     """
     Basic quality checks on transactions.
+
+    All rules are combined into one mask so only the accepted rows are copied.
+    Pass a RejectionReport to record what was dropped and why.
     """
-    df = df.dropna(subset=["transaction_id", "customer_id", "amount"])
-    df = df[df["amount"] > 0]
-    df = df.drop_duplicates(subset=["transaction_id"])
-    return df
+    df, checks = _coerce_transactions(df)
+    rejected = _reject(df, checks, report)
+    # First occurrence of each id among otherwise-valid rows wins.
+    if rejected.any():
+        duplicate = np.zeros(len(df), dtype=bool)
+        duplicate[~rejected] = _duplicate_mask(df["transaction_id"][~rejected])
+    else:
+        duplicate = _duplicate_mask(df["transaction_id"])
+    if report is not None:
+        report.add("duplicate_transaction_id", df[duplicate])
+    rejected |= duplicate
+    if report is not None:
+        report.rows_read += len(df)
+        report.rows_accepted += int((~rejected).sum())
+    return df[~rejected] if rejected.any() else df
+
+
+def _check_transaction_chunk(chunk: pd.DataFrame) -> Tuple[pd.DataFrame, RejectionReport, np.ndarray]:
+    """
+    Worker-side checks for one chunk: everything except the global duplicate check.
+    Returns accepted rows, the chunk's report and 64-bit hashes of accepted ids.
+    """
+    report = RejectionReport(rows_read=len(chunk))
+    chunk, checks = _coerce_transactions(chunk)
+    rejected = _reject(chunk, checks, report)
+    accepted = chunk[~rejected]
+    hashes = pd.util.hash_array(accepted["transaction_id"].astype(str).to_numpy())
+    return accepted, report, hashes
+
+
+class _SeenIds:
+    """
+    Exact set of 64-bit transaction-id hashes kept as a sorted uint64 array
+    (8 bytes per id, versus ~70+ for a Python set of strings).
+    """
+
+    def __init__(self) -> None:
+        self._sorted = np.empty(0, dtype=np.uint64)
+
+    def mark(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Return a duplicate mask for ``hashes`` (against earlier chunks and within
+        this one) and add the new ones to the set.
+        """
+        pos = np.searchsorted(self._sorted, hashes)
+        pos[pos == len(self._sorted)] = 0
+        seen_before = (self._sorted[pos] == hashes) if len(self._sorted) else np.zeros(len(hashes), dtype=bool)
+        within = pd.Series(hashes).duplicated().to_numpy()
+        duplicate = seen_before | within
+        fresh = np.unique(hashes[~duplicate])
+        self._sorted = np.union1d(self._sorted, fresh)
+        return duplicate
+
+
+def iter_validated_transactions(
+    path: Path,
+    chunksize: int = 250_000,
+    n_workers: Optional[int] = None,
+    report: Optional[RejectionReport] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream-validate a transactions CSV, yielding accepted chunks in file order.
+
+    Per-row checks and type coercion run in worker processes; the duplicate
+    transaction_id check runs in this process across chunks (first occurrence
+    wins, matching ``validate_transactions``). At most ``2 * n_workers`` chunks
+    are in flight, so memory stays bounded by the chunk size rather than the
+    file size (plus 8 bytes per accepted id for the duplicate check; ids are
+    compared by 64-bit hash, so a collision between two different ids is
+    possible but vanishingly unlikely at realistic volumes).
+    """
+    report = report if report is not None else RejectionReport()
+    workers = n_workers or os.cpu_count() or 1
+    own_executor = executor is None
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    seen = _SeenIds()
+    pending: Deque[Future] = deque()
+
+    def _drain_one() -> pd.DataFrame:
+        accepted, chunk_report, hashes = pending.popleft().result()
+        report.merge(chunk_report)
+        duplicate = seen.mark(hashes)
+        report.add("duplicate_transaction_id", accepted[duplicate])
+        accepted = accepted[~duplicate]
+        report.rows_accepted += len(accepted)
+        return accepted
+
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            pending.append(pool.submit(_check_transaction_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield _drain_one()
+        while pending:
+            yield _drain_one()
+    finally:
+        if own_executor:
+            pool.shutdown(cancel_futures=True)
+
+
+def validate_transactions_file(
+    path: Path,
+    out_path: Path,
+    report_path: Optional[Path] = None,
+    chunksize: int = 250_000,
+    n_workers: Optional[int] = None,
+) -> RejectionReport:
+    """
+    Validate a transactions CSV chunk by chunk, writing accepted rows to
+    ``out_path`` and (optionally) the rejection report as JSON.
+    """
+    report = RejectionReport()
+    ensure_dir(out_path.parent)
+    header = True
+    with out_path.open("w", encoding="utf-8", newline="") as f:
+        for accepted in iter_validated_transactions(path, chunksize, n_workers, report):
+            accepted.to_csv(f, index=False, header=header)
+            header = False
+    if report_path is not None:
+        report.write(report_path)
+    return report
 
 
 def validate_alerts(df: pd.DataFrame) -> pd.DataFrame:
@@ -31,5 +254,11 @@ def validate_alerts(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-__all__ = ["validate_customers", "validate_transactions", "validate_alerts"]
-
+__all__ = [
+    "RejectionReport",
+    "validate_customers",
+    "validate_transactions",
+    "iter_validated_transactions",
+    "validate_transactions_file",
+    "validate_alerts",
+]
@@ -1,27 +1,54 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import IsolationForest
 
-from src.utils.config import load_config
+from src.detection.forest_inference import flat_forest
+from src.utils.config import get_config
 
+if TYPE_CHECKING:
+    from sklearn.ensemble import IsolationForest
 
-def fit_isolation_forest(features: pd.DataFrame) -> Tuple[IsolationForest, pd.Series]:
+
+def fit_anomaly_model(features: pd.DataFrame) -> IsolationForest:
     """
-    Fit an IsolationForest on numeric features and return model and anomaly scores.
+    Fit an IsolationForest on the numeric columns of ``features``.
     """
-    cfg = load_config()
+    # sklearn is imported on first fit, not when the API starts.
+    from sklearn.ensemble import IsolationForest
+
+    cfg = get_config()
     numeric = features.select_dtypes(include=["number"])
     model = IsolationForest(
         contamination=cfg.model.isolation_forest_contamination,
         random_state=cfg.data.synthetic_seed,
     )
     model.fit(numeric)
-    scores = -model.decision_function(numeric)  # higher = more anomalous
-    return model, pd.Series(scores, index=features.index, name="anomaly_score")
+    return model
+
+
+def score_anomalies(model: IsolationForest, features: pd.DataFrame) -> pd.Series:
+    """
+    Anomaly scores (higher = more anomalous) for ``features``, using the columns
+    the model was fitted on. Scores are per row, so any subset of customers gets
+    the same values it would get as part of the full population. Scoring goes
+    through the model's FlatForest, which matches ``decision_function`` exactly
+    without its per-call overhead.
+    """
+    X = features[list(model.feature_names_in_)].to_numpy(dtype=np.float32)
+    scores = -flat_forest(model).decision_function(X)
+    return pd.Series(scores, index=features.index, name="anomaly_score")
+
+
+def fit_isolation_forest(features: pd.DataFrame) -> Tuple[IsolationForest, pd.Series]:
+    """
+    Fit an IsolationForest on numeric features and return model and anomaly scores.
+    """
+    model = fit_anomaly_model(features)
+    return model, score_anomalies(model, features)
 
 
-__all__ = ["fit_isolation_forest"]
+__all__ = ["fit_anomaly_model", "score_anomalies", "fit_isolation_forest"]
 
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
 
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.manifold import TSNE
+
+if TYPE_CHECKING:
+    from sklearn.cluster import KMeans
 
 
 def embed_and_cluster(features: pd.DataFrame, n_clusters: int = 5) -> Tuple[pd.DataFrame, KMeans]:
@@ -15,6 +16,9 @@ def embed_and_cluster(features: pd.DataFrame, n_clusters: int = 5) -> Tuple[pd.D
     if numeric.empty:
         raise ValueError("No numeric features available for clustering.")
 
+    from sklearn.cluster import KMeans
+    from sklearn.manifold import TSNE
+
     tsne = TSNE(n_components=2, random_state=42, init="random", learning_rate="auto")
     embedding = tsne.fit_transform(numeric)
 
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+ANOMALY_HISTOGRAM = "anomaly_score"
+CLUSTER_HISTOGRAM = "cluster_rank"
+# Columns added by clustering; cluster membership is tracked as its own histogram.
+_SKIPPED_COLUMNS = {"cluster", "tsne_x", "tsne_y"}
+# Floor for empty bins in PSI so that log(p / q) stays finite.
+PSI_EPSILON = 1e-4
+
+
+@dataclass(frozen=True)
+class Histogram:
+    """
+    Counts over fixed bins ``[edges[i], edges[i + 1])``; the outer edges are
+    infinite so every value falls in some bin.
+    """
+
+    edges: np.ndarray  # float64, len(counts) + 1
+    counts: np.ndarray  # int64
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def proportions(self) -> np.ndarray:
+        return self.counts / max(self.total, 1)
+
+    def same_bins(self, other: "Histogram") -> bool:
+        return np.array_equal(self.edges, other.edges)
+
+
+def quantile_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    """
+    Bin edges at the quantiles of ``values`` (duplicates merged), open-ended
+    on both sides. Constant or empty inputs get a single bin.
+    """
+    values = values[np.isfinite(values)]
+    inner = np.unique(np.quantile(values, np.linspace(0.0, 1.0, bins + 1)[1:-1])) if len(values) else []
+    return np.concatenate([[-np.inf], inner, [np.inf]]).astype(np.float64)
+
+
+def histogram(values: np.ndarray, edges: np.ndarray) -> Histogram:
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    # side="right": a value equal to an edge belongs to the bin that starts there.
+    bins = np.searchsorted(edges, values, side="right") - 1
+    counts = np.bincount(np.clip(bins, 0, len(edges) - 2), minlength=len(edges) - 1).astype(np.int64)
+    return Histogram(edges=edges, counts=counts)
+
+
+def cluster_ranks(features_clustered: pd.DataFrame) -> np.ndarray:
+    """
+    Cluster label of each customer replaced by the cluster's rank by mean
+    ``total_amount``. KMeans labels are arbitrary from one run to the next;
+    ranks line up clusters that play the same role.
+    """
+    means = features_clustered.groupby("cluster")["total_amount"].mean().sort_values(kind="stable")
+    rank = pd.Series(np.arange(len(means)), index=means.index)
+    return features_clustered["cluster"].map(rank).to_numpy(dtype=np.float64)
+
+
+def run_histograms(
+    features: pd.DataFrame,
+    anomaly_scores: pd.Series,
+    features_clustered: Optional[pd.DataFrame],
+    bins: int,
+    reference: Optional[Dict[str, Histogram]] = None,
+) -> Dict[str, Histogram]:
+    """
+    Histograms of every numeric feature, the anomaly scores and the cluster
+    membership (by rank) of one run. Bins are taken from ``reference`` (the
+    baseline run) where it has them, so runs stay comparable; otherwise they
+    are the quantiles of this run's values.
+    """
+    reference = reference or {}
+    columns: Dict[str, np.ndarray] = {
+        str(col): features[col].to_numpy(dtype=np.float64)
+        for col in features.select_dtypes(include=["number"]).columns
+        if col not in _SKIPPED_COLUMNS
+    }
+    columns[ANOMALY_HISTOGRAM] = anomaly_scores.to_numpy(dtype=np.float64)
+
+    out: Dict[str, Histogram] = {}
+    for name, values in columns.items():
+        edges = reference[name].edges if name in reference else quantile_edges(values, bins)
+        out[name] = histogram(values, edges)
+    if features_clustered is not None and "cluster" in features_clustered.columns:
+        ranks = cluster_ranks(features_clustered)
+        n = int(features_clustered["cluster"].nunique())
+        edges = reference[CLUSTER_HISTOGRAM].edges if CLUSTER_HISTOGRAM in reference else None
+        if edges is None:
+            edges = np.concatenate([[-np.inf], np.arange(n - 1) + 0.5, [np.inf]]).astype(np.float64)
+        out[CLUSTER_HISTOGRAM] = histogram(ranks, edges)
+    return out
+
+
+def psi(expected: Histogram, actual: Histogram) -> float:
+    """
+    Population stability index of ``actual`` against ``expected``.
+    """
+    p = np.maximum(expected.proportions(), PSI_EPSILON)
+    q = np.maximum(actual.proportions(), PSI_EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_statistic(expected: Histogram, actual: Histogram) -> float:
+    """
+    Largest gap between the two cumulative distributions at the bin edges
+    (the Kolmogorov-Smirnov statistic restricted to the stored bins).
+    """
+    return float(np.max(np.abs(np.cumsum(expected.proportions()) - np.cumsum(actual.proportions()))))
+
+
+def compare(
+    current: Dict[str, Histogram],
+    previous: Optional[Dict[str, Histogram]],
+    baseline: Optional[Dict[str, Histogram]],
+    psi_threshold: float,
+    ks_threshold: float,
+) -> List[Dict[str, Any]]:
+    """
+    PSI and KS of every histogram against the previous run and the baseline.
+    Statistics are None where the other run has no histogram with the same
+    bins. A histogram drifts when any statistic reaches its threshold.
+    """
+    rows: List[Dict[str, Any]] = []
+    for name, hist in current.items():
+        row: Dict[str, Any] = {"name": name}
+        for label, other in (("previous", previous), ("baseline", baseline)):
+            ref = (other or {}).get(name)
+            usable = ref is not None and ref.same_bins(hist) and ref.total > 0 and hist.total > 0
+            row[f"psi_{label}"] = psi(ref, hist) if usable else None
+            row[f"ks_{label}"] = ks_statistic(ref, hist) if usable else None
+        row["drifted"] = any(
+            value is not None and value >= threshold
+            for key, threshold in (("psi", psi_threshold), ("ks", ks_threshold))
+            for value in (row[f"{key}_previous"], row[f"{key}_baseline"])
+        )
+        rows.append(row)
+    return rows
+
+
+def histograms_to_frame(histograms: Dict[str, Histogram]) -> pd.DataFrame:
+    """
+    Long form (name, bin, lower, upper, count) for storage as an artifact.
+    """
+    names: List[str] = []
+    bins: List[np.ndarray] = []
+    for name, hist in histograms.items():
+        names.extend([name] * len(hist.counts))
+        bins.append(np.arange(len(hist.counts)))
+    return pd.DataFrame(
+        {
+            "name": pd.Categorical(names),
+            "bin": np.concatenate(bins) if bins else np.array([], dtype=np.int64),
+            "lower": np.concatenate([h.edges[:-1] for h in histograms.values()]) if bins else [],
+            "upper": np.concatenate([h.edges[1:] for h in histograms.values()]) if bins else [],
+            "count": np.concatenate([h.counts for h in histograms.values()]) if bins else [],
+        }
+    )
+
+
+def histograms_from_frame(df: pd.DataFrame) -> Dict[str, Histogram]:
+    out: Dict[str, Histogram] = {}
+    for name, group in df.sort_values(["name", "bin"], kind="stable").groupby("name", observed=True, sort=False):
+        edges = np.append(group["lower"].to_numpy(dtype=np.float64), group["upper"].to_numpy(dtype=np.float64)[-1])
+        out[str(name)] = Histogram(edges=edges, counts=group["count"].to_numpy(dtype=np.int64))
+    return out
+
+
+__all__ = [
+    "ANOMALY_HISTOGRAM",
+    "CLUSTER_HISTOGRAM",
+    "Histogram",
+    "quantile_edges",
+    "histogram",
+    "cluster_ranks",
+    "run_histograms",
+    "psi",
+    "ks_statistic",
+    "compare",
+    "histograms_to_frame",
+    "histograms_from_frame",
+]
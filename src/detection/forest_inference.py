@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+import weakref
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import IsolationForest
+
+
+# Up to this many rows the flat walker beats one tree.apply call per tree;
+# above it the per-row cost of NumPy gathers exceeds the compiled tree walk.
+SMALL_BATCH_ROWS = 128
+# Rows per tree.apply pass; bounds the float32 copy of the input per tree.
+CHUNK_ROWS = 65_536
+
+
+def _float32_at_most(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 not above each float64 threshold, so that for float32
+    inputs ``x <= t32`` decides exactly like sklearn's ``x <= t``.
+    """
+    t32 = threshold.astype(np.float32)
+    over = t32.astype(np.float64) > threshold
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+@dataclass(frozen=True)
+class FlatForest:
+    """
+    A fitted IsolationForest packed into contiguous node arrays shared by all
+    trees, for scoring without sklearn's per-call overhead.
+
+    Nodes of each tree are renumbered breadth-first so the two children of a
+    node are adjacent: one step is ``child[node] + (x > threshold[node])``.
+    Leaves point to themselves with an infinite threshold, so a batch of rows
+    walks all trees at once for ``max_depth`` levels. ``leaf_value`` is
+    sklearn's path length at the leaf (node depth plus the average path length
+    of the training samples that ended there).
+
+    Small batches use that walker; large ones call each fitted tree's compiled
+    ``apply`` directly. Trees are summed in order either way, so scores are
+    identical to ``IsolationForest.score_samples``.
+    """
+
+    feature: np.ndarray  # int32, input column tested at the node; 0 at leaves
+    threshold: np.ndarray  # float32, see _float32_at_most; +inf at leaves
+    child: np.ndarray  # int32, global id of the left child (right = left + 1); self at leaves
+    nan_right: np.ndarray  # bool, where a NaN input goes
+    leaf_value: np.ndarray  # float64, path length at leaves
+    roots: np.ndarray  # int32, root node of each tree
+    max_depth: int
+    denominator: float  # n_trees * average path length of max_samples_
+    offset: float
+    # For the large-batch path: fitted trees, their input columns (None when
+    # all columns in order) and path lengths by the tree's own node ids.
+    trees: Tuple[Any, ...]
+    tree_columns: Tuple[Optional[np.ndarray], ...]
+    tree_leaf_values: Tuple[np.ndarray, ...]
+
+    @classmethod
+    def from_isolation_forest(cls, model: IsolationForest) -> "FlatForest":
+        from sklearn.ensemble._iforest import _average_path_length
+
+        features: List[np.ndarray] = []
+        thresholds: List[np.ndarray] = []
+        children: List[np.ndarray] = []
+        nan_right: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+        roots: List[int] = []
+        tree_columns: List[Optional[np.ndarray]] = []
+        tree_values: List[np.ndarray] = []
+        base = 0
+        for tree_idx, (estimator, columns) in enumerate(zip(model.estimators_, model.estimators_features_)):
+            tree = estimator.tree_
+            left, right = tree.children_left, tree.children_right
+            # Breadth-first order with siblings adjacent; new_id maps old ids to new.
+            order = [0]
+            for node in order:
+                if left[node] != -1:
+                    order.extend((left[node], right[node]))
+            order_arr = np.asarray(order, dtype=np.int64)
+            new_id = np.empty(tree.node_count, dtype=np.int64)
+            new_id[order_arr] = np.arange(len(order_arr))
+            leaf = left[order_arr] == -1
+            own = np.arange(len(order_arr)) + base
+
+            columns = np.asarray(columns)
+            features.append(np.where(leaf, 0, columns[np.maximum(tree.feature[order_arr], 0)]).astype(np.int32))
+            thresholds.append(np.where(leaf, np.float32(np.inf), _float32_at_most(tree.threshold[order_arr])))
+            children.append(np.where(leaf, own, new_id[np.maximum(left[order_arr], 0)] + base).astype(np.int32))
+            missing_left = np.asarray(getattr(tree, "missing_go_to_left", np.ones(tree.node_count)), dtype=bool)
+            nan_right.append(~leaf & ~missing_left[order_arr])
+            path = model._decision_path_lengths[tree_idx] + model._average_path_length_per_tree[tree_idx] - 1.0
+            values.append(path[order_arr])
+            roots.append(base)
+            base += len(order_arr)
+
+            tree_columns.append(None if np.array_equal(columns, np.arange(model.n_features_in_)) else columns)
+            tree_values.append(np.asarray(path, dtype=np.float64))
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float32),
+            child=np.concatenate(children),
+            nan_right=np.concatenate(nan_right),
+            leaf_value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max(e.tree_.max_depth for e in model.estimators_),
+            denominator=float(len(model.estimators_) * _average_path_length([model._max_samples])[0]),
+            offset=float(model.offset_),
+            trees=tuple(e.tree_ for e in model.estimators_),
+            tree_columns=tuple(tree_columns),
+            tree_leaf_values=tuple(tree_values),
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def path_lengths(self, X: np.ndarray) -> np.ndarray:
+        """
+        Sum over trees of the isolation path length of each row of ``X``.
+        """
+        # sklearn validates inputs to float32 before walking the trees.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"expected a 2-d array, got shape {X.shape}")
+        if len(X) <= SMALL_BATCH_ROWS:
+            return self._walk(X)
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), CHUNK_ROWS):
+            out[start : start + CHUNK_ROWS] = self._apply(X[start : start + CHUNK_ROWS])
+        return out
+
+    def _walk(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_cols = X.shape
+        shape = (self.n_trees, n_rows)
+        flat = X.ravel()
+        row_base = np.broadcast_to((np.arange(n_rows, dtype=np.int32) * n_cols)[None, :], shape)
+        has_nan = bool(np.isnan(flat).any())
+        # One walker per (tree, row), all advanced together; buffers are reused per level.
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        index = np.empty(shape, dtype=np.int32)
+        values = np.empty(shape, dtype=np.float32)
+        thresholds = np.empty(shape, dtype=np.float32)
+        go_right = np.empty(shape, dtype=bool)
+        for _ in range(self.max_depth):
+            np.take(self.feature, nodes, out=index)
+            np.add(index, row_base, out=index)
+            np.take(flat, index, out=values)
+            np.take(self.threshold, nodes, out=thresholds)
+            np.greater(values, thresholds, out=go_right)
+            if has_nan:
+                nan = np.isnan(values)
+                go_right[nan] = self.nan_right[nodes[nan]]
+            np.take(self.child, nodes, out=nodes)
+            np.add(nodes, go_right, out=nodes, casting="unsafe")
+        # Add trees one after another, as sklearn does (a plain sum may pair them up).
+        return np.cumsum(np.take(self.leaf_value, nodes), axis=0)[-1]
+
+    def _apply(self, X: np.ndarray) -> np.ndarray:
+        depths = np.zeros(len(X), dtype=np.float64)
+        for tree, columns, values in zip(self.trees, self.tree_columns, self.tree_leaf_values):
+            subset = X if columns is None else np.ascontiguousarray(X[:, columns])
+            depths += values[tree.apply(subset)]
+        return depths
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """
+        Same as ``IsolationForest.score_samples`` (lower = more abnormal).
+        """
+        depths = self.path_lengths(X)
+        if self.denominator == 0:
+            return -np.ones_like(depths)
+        return -(2 ** (-depths / self.denominator))
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """
+        Same as ``IsolationForest.decision_function`` (negative = outlier).
+        """
+        return self.score_samples(X) - self.offset
+
+
+_COMPILED: "weakref.WeakKeyDictionary[IsolationForest, FlatForest]" = weakref.WeakKeyDictionary()
+
+
+def flat_forest(model: IsolationForest) -> FlatForest:
+    """
+    The FlatForest for a fitted ``model``, built once per model and process.
+    Refitting the same estimator object is not detected; fit a new one.
+    """
+    compiled = _COMPILED.get(model)
+    if compiled is None:
+        compiled = _COMPILED[model] = FlatForest.from_isolation_forest(model)
+    return compiled
+
+
+__all__ = ["SMALL_BATCH_ROWS", "CHUNK_ROWS", "FlatForest", "flat_forest"]
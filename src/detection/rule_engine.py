@@ -1,9 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from pathlib import Path
+from typing import Dict, List
 
+import numpy as np
 import pandas as pd
+import yaml
+
+from src.data_engineering.interning import CustomerDictionary
+from src.utils.config import get_config
+from src.utils.file_watch import watch_file
+from src.utils.sketches import QuantileSketch
 
 
 @dataclass
@@ -13,15 +21,64 @@ class RuleResult:
     triggered_customers: List[str]
 
 
-def apply_rules(features: pd.DataFrame) -> List[RuleResult]:
+def _parse_rule_thresholds(path: Path) -> Dict[str, float]:
+    data = {}
+    if path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    thresholds = {
+        "high_total_threshold": float(data.get("high_total_threshold", 100_000)),
+        "deviation_quantile": float(data.get("deviation_quantile", 0.98)),
+        "rapid_movement_ratio": float(data.get("rapid_movement_ratio", 0.8)),
+        "structuring_threshold": float(data.get("structuring_threshold", 10_000)),
+        "structuring_near_ratio": float(data.get("structuring_near_ratio", 0.8)),
+        "structuring_window_hours": float(data.get("structuring_window_hours", 72)),
+        "structuring_min_transactions": float(data.get("structuring_min_transactions", 2)),
+    }
+    if not 0.0 < thresholds["deviation_quantile"] < 1.0:
+        raise ValueError("deviation_quantile must be in (0, 1)")
+    return thresholds
+
+
+def load_rule_thresholds(path: Path | None = None) -> Dict[str, float]:
+    """
+    Load rule thresholds from YAML; the parsed file is cached and hot-reloaded.
+    """
+    thresholds_path = path or get_config().detection.rule_thresholds_path
+    return dict(watch_file(thresholds_path, _parse_rule_thresholds).get())
+
+
+def deviation_threshold(features: pd.DataFrame | QuantileSketch) -> float:
+    """
+    Population threshold for the behaviour-deviation rule (configured quantile).
+
+    Accepts the features frame or a QuantileSketch of deviation scores merged
+    from chunks/shards, so the full column never has to be materialized.
+    """
+    sketch = features if isinstance(features, QuantileSketch) else deviation_sketch(features)
+    return sketch.quantile(load_rule_thresholds()["deviation_quantile"])
+
+
+def deviation_sketch(features: pd.DataFrame) -> QuantileSketch:
+    """
+    Mergeable quantile sketch of ``deviation_score`` for one chunk of customers.
+    """
+    return QuantileSketch.from_values(features["deviation_score"].to_numpy(dtype=float))
+
+
+def apply_rules(features: pd.DataFrame, high_deviation_threshold: float | None = None) -> List[RuleResult]:
     """
     Apply a small set of deterministic AML-style rules at customer level.
+
+    ``high_deviation_threshold`` overrides the quantile computed from ``features``;
+    pass the full-population value when scoring a subset of customers.
     """
     results: List[RuleResult] = []
 
-    # Example thresholds – in real systems, these come from config or DB
-    high_total_threshold = 100_000
-    high_deviation_threshold = features["deviation_score"].quantile(0.98)
+    thresholds = load_rule_thresholds()
+    high_total_threshold = thresholds["high_total_threshold"]
+    if high_deviation_threshold is None:
+        high_deviation_threshold = deviation_threshold(features)
 
     # Rule 1: unusually high total volume
     r1_mask = features["total_amount"] > high_total_threshold
@@ -43,25 +100,57 @@ def apply_rules(features: pd.DataFrame) -> List[RuleResult]:
         )
     )
 
+    # Rule 3: funds passed through quickly (needs counterparty graph features)
+    if "pass_through_ratio" in features.columns:
+        r3_mask = features["pass_through_ratio"] >= thresholds["rapid_movement_ratio"]
+        results.append(
+            RuleResult(
+                rule_id="R3_RAPID_MOVEMENT",
+                description="Most inbound funds leave again shortly after arrival.",
+                triggered_customers=features.loc[r3_mask, "customer_id"].tolist(),
+            )
+        )
+
+    # Rule 4: sub-threshold deposits summing past the reporting threshold
+    if "structuring_hits" in features.columns:
+        r4_mask = features["structuring_hits"] > 0
+        results.append(
+            RuleResult(
+                rule_id="R4_STRUCTURING",
+                description="Repeated deposits just under the reporting threshold within a short window.",
+                triggered_customers=features.loc[r4_mask, "customer_id"].tolist(),
+            )
+        )
+
     return results
 
 
-def rules_to_frame(results: List[RuleResult]) -> pd.DataFrame:
+def rules_to_frame(results: List[RuleResult], customers: CustomerDictionary | None = None) -> pd.DataFrame:
     """
     Convert rule results to a long-form DataFrame.
+
+    All columns are categorical, so rule ids and descriptions are stored once
+    per rule; customer ids use the shared ``customers`` dictionary when given.
     """
-    records = []
-    for r in results:
-        for cust_id in r.triggered_customers:
-            records.append(
-                {
-                    "customer_id": cust_id,
-                    "rule_id": r.rule_id,
-                    "description": r.description,
-                }
-            )
-    return pd.DataFrame(records)
+    sizes = [len(r.triggered_customers) for r in results]
+    hits = pd.Series([c for r in results for c in r.triggered_customers], dtype=object)
+    rule_ids = np.array([r.rule_id for r in results], dtype=object)
+    descriptions = np.array([r.description for r in results], dtype=object)
+    return pd.DataFrame(
+        {
+            "customer_id": customers.intern(hits).array if customers is not None else pd.Categorical(hits),
+            "rule_id": pd.Categorical(np.repeat(rule_ids, sizes), categories=pd.unique(rule_ids)),
+            "description": pd.Categorical(np.repeat(descriptions, sizes), categories=pd.unique(descriptions)),
+        }
+    )
 
 
-__all__ = ["RuleResult", "apply_rules", "rules_to_frame"]
+__all__ = [
+    "RuleResult",
+    "load_rule_thresholds",
+    "deviation_threshold",
+    "deviation_sketch",
+    "apply_rules",
+    "rules_to_frame",
+]
 
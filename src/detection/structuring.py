@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.graph_features import inflow_mask
+from src.data_engineering.interning import category_values
+from src.detection.rule_engine import load_rule_thresholds
+
+
+STRUCTURING_COLUMNS = ["structuring_hits", "structuring_amount"]
+
+
+def detect_structuring(
+    transactions: pd.DataFrame,
+    threshold: float = 10_000,
+    near_ratio: float = 0.8,
+    window: pd.Timedelta = pd.Timedelta(hours=72),
+    min_transactions: int = 2,
+    direction_column: str = "direction",
+) -> pd.DataFrame:
+    """
+    Find runs of sub-threshold deposits whose sum crosses the reporting threshold
+    within ``window``.
+
+    Candidates are inbound transactions with ``near_ratio * threshold <= amount
+    < threshold`` (all transactions count as inbound when there is no direction
+    column). After one sort by customer and time, every candidate is treated as
+    the end of a window whose start is found by binary search; window sums come
+    from a cumulative sum, so the whole pass is O(n log n).
+
+    Returns one row per customer with at least one hit: ``structuring_hits``
+    (number of windows crossing the threshold), ``structuring_amount`` (total of
+    the evidence transactions) and ``evidence_transaction_ids``.
+    """
+    empty = pd.DataFrame(columns=["customer_id", *STRUCTURING_COLUMNS, "evidence_transaction_ids"])
+    if transactions.empty:
+        return empty
+
+    amount = transactions["amount"].to_numpy(dtype=np.float64)
+    candidate = (amount < threshold) & (amount >= near_ratio * threshold)
+    if direction_column in transactions.columns:
+        candidate &= inflow_mask(transactions, direction_column)
+    tx = transactions.loc[candidate, ["transaction_id", "customer_id", "amount", "timestamp"]]
+    if tx.empty:
+        return empty
+
+    codes, customer_ids = category_values(tx["customer_id"])
+    ts = tx["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    order = np.lexsort((ts, codes))
+    codes, ts = codes[order], ts[order]
+    amounts = tx["amount"].to_numpy(dtype=np.float64)[order]
+    tx_ids = tx["transaction_id"].to_numpy()[order]
+
+    # Window start for each end position = first row of the same customer at or
+    # after (ts - window). Timestamps are replaced by dense ranks so that
+    # (customer, rank) packs into one sorted int64 key without overflow, and all
+    # starts come from a single searchsorted.
+    n = len(codes)
+    uniq_ts, ts_rank = np.unique(ts, return_inverse=True)
+    stride = len(uniq_ts) + 1
+    key = codes.astype(np.int64) * stride + ts_rank
+    lower_rank = np.searchsorted(uniq_ts, ts - window.value, side="left")
+    start = np.searchsorted(key, codes.astype(np.int64) * stride + lower_rank, side="left")
+
+    # Running sums restart per customer so a customer's window sums do not depend
+    # on which other customers are in the input (shards give identical results).
+    csum = pd.Series(amounts).groupby(codes, sort=False).cumsum().to_numpy()
+    first = np.searchsorted(codes, codes, side="left")
+    end = np.arange(n)
+    window_sum = csum - np.where(start > first, csum[np.maximum(start - 1, 0)], 0.0)
+    hit = (window_sum >= threshold) & (end - start + 1 >= min_transactions)
+    if not hit.any():
+        return empty
+
+    # Mark every row covered by any hit window (difference array over [start, end]).
+    cover = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(cover, start[hit], 1)
+    np.add.at(cover, end[hit] + 1, -1)
+    in_evidence = np.cumsum(cover[:-1]) > 0
+
+    hits_per_customer = np.bincount(codes[hit], minlength=len(customer_ids))
+    amount_per_customer = np.bincount(codes[in_evidence], weights=amounts[in_evidence], minlength=len(customer_ids))
+    evidence = pd.Series(tx_ids[in_evidence]).groupby(codes[in_evidence]).agg(list)
+
+    flagged = np.flatnonzero(hits_per_customer)
+    return pd.DataFrame(
+        {
+            "customer_id": customer_ids[flagged],
+            "structuring_hits": hits_per_customer[flagged],
+            "structuring_amount": amount_per_customer[flagged],
+            "evidence_transaction_ids": evidence.reindex(flagged).tolist(),
+        }
+    )
+
+
+def detect_structuring_from_config(transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Run ``detect_structuring`` with the parameters from rule_thresholds.yaml.
+    """
+    thresholds = load_rule_thresholds()
+    return detect_structuring(
+        transactions,
+        threshold=thresholds["structuring_threshold"],
+        near_ratio=thresholds["structuring_near_ratio"],
+        window=pd.Timedelta(hours=thresholds["structuring_window_hours"]),
+        min_transactions=int(thresholds["structuring_min_transactions"]),
+    )
+
+
+def structuring_evidence(result: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    Map customer_id -> evidence transaction ids from ``detect_structuring`` output.
+    """
+    return {
+        str(cust): [str(t) for t in ids]
+        for cust, ids in zip(result["customer_id"], result["evidence_transaction_ids"])
+    }
+
+
+__all__ = [
+    "STRUCTURING_COLUMNS",
+    "detect_structuring",
+    "detect_structuring_from_config",
+    "structuring_evidence",
+]
@@ -4,18 +4,47 @@ from typing import List, Dict
 
 import pandas as pd
 
+from src.utils.sketches import QuantileSketch
 
-def map_to_typologies(rules_df: pd.DataFrame, anomaly_scores: pd.Series) -> List[Dict[str, str]]:
+
+ANOMALY_QUANTILE = 0.98
+
+
+def high_anomaly_threshold(anomaly_scores: pd.Series | QuantileSketch, q: float = ANOMALY_QUANTILE) -> float:
+    """
+    Score above which a customer counts as highly anomalous (default: 98th
+    percentile). Accepts the scores or a QuantileSketch merged from chunks/shards.
+    """
+    if not isinstance(anomaly_scores, QuantileSketch):
+        anomaly_scores = QuantileSketch.from_values(anomaly_scores.to_numpy(dtype=float))
+    return anomaly_scores.quantile(q)
+
+
+def map_to_typologies(
+    rules_df: pd.DataFrame,
+    anomaly_scores: pd.Series,
+    anomaly_threshold: float | None = None,
+) -> List[Dict[str, str]]:
     """
     Map rule triggers and anomaly scores to human-readable AML typologies.
+
+    ``anomaly_scores`` is indexed by customer_id. ``anomaly_threshold`` defaults
+    to the 98th percentile of the given scores.
     """
     typologies: List[Dict[str, str]] = []
-    high_anomaly_customers = anomaly_scores[anomaly_scores > anomaly_scores.quantile(0.98)].index
+    if anomaly_threshold is None:
+        anomaly_threshold = high_anomaly_threshold(anomaly_scores)
+    high_anomaly_customers = anomaly_scores[anomaly_scores > anomaly_threshold].index
+    rules_by_customer = rules_df.groupby("customer_id", observed=True)["rule_id"].agg(set)
 
     for cust_id in high_anomaly_customers:
-        cust_rules = rules_df[rules_df["customer_id"] == cust_id]["rule_id"].unique().tolist()
-        if "R1_HIGH_VOLUME" in cust_rules:
-            typology = "Structuring / high volume anomaly"
+        cust_rules = rules_by_customer.get(cust_id, set())
+        if "R4_STRUCTURING" in cust_rules:
+            typology = "Structuring (sub-threshold deposits)"
+        elif "R1_HIGH_VOLUME" in cust_rules:
+            typology = "High volume anomaly"
+        elif "R3_RAPID_MOVEMENT" in cust_rules:
+            typology = "Rapid movement of funds / pass-through"
         elif "R2_BEHAVIOR_DEVIATION" in cust_rules:
             typology = "Behavioural deviation from peer group"
         else:
@@ -30,5 +59,5 @@ def map_to_typologies(rules_df: pd.DataFrame, anomaly_scores: pd.Series) -> List
     return typologies
 
 
-__all__ = ["map_to_typologies"]
+__all__ = ["ANOMALY_QUANTILE", "high_anomaly_threshold", "map_to_typologies"]
 
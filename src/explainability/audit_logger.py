@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 import json
 
-from src.utils.config import load_config
+from src.utils.config import get_config
 from src.utils.helpers import ensure_dir
 
 
@@ -26,7 +26,7 @@ class AuditLogger:
     """
 
     def __init__(self, path: Optional[Path] = None) -> None:
-        cfg = load_config()
+        cfg = get_config()
         self.path = path or (cfg.data.processed_dir / "audit_log.jsonl")
         ensure_dir(self.path.parent)
 
@@ -4,7 +4,6 @@ from typing import Any, Dict, List
 
 import numpy as np
 import pandas as pd
-from sklearn.tree import _tree
 
 
 def extract_decision_path(model: Any, X: pd.DataFrame, sample_index: int) -> List[Dict[str, str]]:
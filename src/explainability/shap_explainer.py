@@ -4,7 +4,6 @@ from typing import Any, Tuple
 
 import numpy as np
 import pandas as pd
-import shap
 
 
 def compute_shap_values(model: Any, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
@@ -15,6 +14,8 @@ def compute_shap_values(model: Any, X: pd.DataFrame) -> Tuple[np.ndarray, np.nda
       - shap_values: array of SHAP values (n_samples, n_features)
       - expected_value: array of expected values (per output)
     """
+    import shap
+
     explainer = shap.TreeExplainer(model)
     shap_values = explainer.shap_values(X)
     expected_value = np.atleast_1d(explainer.expected_value)
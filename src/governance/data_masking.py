@@ -1,8 +1,16 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-from src.security.pii_masking import mask_pii_fields
+from src.security.pii_masking import PII_FIELDS, mask_pii_fields, tokenize_values
+from src.security.rbac import can_view_unmasked_pii
+
+
+# In bulk exports the customer id is the key back to KYC data, so it is
+# tokenized along with the PII fields, as is the case id (a case is keyed by
+# its customer id). Tokens are deterministic, so rows for the same customer
+# still line up downstream.
+EXPORT_PII_FIELDS = PII_FIELDS | {"customer_id", "id"}
 
 
 def mask_record_for_role(record: Dict[str, Any], role: str) -> Dict[str, Any]:
@@ -15,5 +23,14 @@ def mask_record_for_role(record: Dict[str, Any], role: str) -> Dict[str, Any]:
     return mask_pii_fields(record)
 
 
-__all__ = ["mask_record_for_role"]
+def mask_batch_for_role(batch: Dict[str, List[Any]], role: str) -> Dict[str, List[Any]]:
+    """
+    Column-oriented counterpart of ``mask_record_for_role`` for export batches.
+    """
+    if can_view_unmasked_pii(role):
+        return batch
+    return {k: tokenize_values(v) if k in EXPORT_PII_FIELDS else v for k, v in batch.items()}
+
+
+__all__ = ["EXPORT_PII_FIELDS", "mask_record_for_role", "mask_batch_for_role"]
 
@@ -3,10 +3,38 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict
+import threading
+import time
 
-import boto3
+from src.utils.config import get_config
+from src.utils.helpers import logger
+from src.utils.metrics import NARRATIVE_SECONDS
 
-from src.utils.config import load_config
+
+# Bedrock error codes that mean "slow down" rather than "this request is bad".
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+
+
+def error_code(exc: BaseException) -> str:
+    """
+    The service error code of a botocore error, else the exception class name.
+    """
+    error = getattr(exc, "response", None) or {}
+    return error.get("Error", {}).get("Code") or type(exc).__name__
+
+
+def is_throttling_error(exc: BaseException) -> bool:
+    """
+    True for botocore errors that should be retried with backoff.
+    """
+    error = getattr(exc, "response", None) or {}
+    status = error.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return error_code(exc) in THROTTLING_ERROR_CODES or status == 429
 
 
 def _load_prompt_template() -> str:
@@ -14,6 +42,17 @@ def _load_prompt_template() -> str:
     return path.read_text(encoding="utf-8")
 
 
+@dataclass(frozen=True)
+class NarrativeResult:
+    """
+    A generated narrative; ``fallback`` is True when a Bedrock failure was
+    replaced by the template narrative, which must not be kept as a draft.
+    """
+
+    text: str
+    fallback: bool = False
+
+
 @dataclass
 class NarrativeGenerator:
     """
@@ -26,24 +65,42 @@ class NarrativeGenerator:
     use_real_llm: bool = False
 
     def __post_init__(self) -> None:
-        self.cfg = load_config()
+        self.cfg = get_config()
         self.template = _load_prompt_template()
-        self._bedrock = None
-        if self.use_real_llm or self.cfg.llm.use_real_llm:
-            self._bedrock = boto3.client(
-                "bedrock-runtime",
-                region_name=self.cfg.llm.region_name,
-            )
+        self._bedrock: Any = None
+        self._bedrock_lock = threading.Lock()
 
-    def _call_bedrock(self, evidence: Dict[str, Any]) -> str:
+    def _client(self) -> Any:
+        """
+        The bedrock-runtime client, created on the first Bedrock call so that
+        importing and constructing the generator does not load boto3.
+        """
         if self._bedrock is None:
+            with self._bedrock_lock:
+                if self._bedrock is None:
+                    import boto3
+                    from botocore.config import Config as BotoConfig
+
+                    attempts = self.cfg.llm.bedrock_max_attempts
+                    self._bedrock = boto3.client(
+                        "bedrock-runtime",
+                        region_name=self.cfg.llm.region_name,
+                        endpoint_url=self.cfg.llm.bedrock_endpoint_url,
+                        config=BotoConfig(retries={"total_max_attempts": attempts, "mode": "standard"})
+                        if attempts
+                        else None,
+                    )
+        return self._bedrock
+
+    def _call_bedrock(self, evidence: Dict[str, Any]) -> str:
+        if not self.uses_bedrock:
             raise RuntimeError("Bedrock client not configured.")
         prompt = {
             "system": self.template,
             "evidence": evidence,
         }
         # NOTE: This is a minimal placeholder; adapt to actual Bedrock model schema.
-        response = self._bedrock.invoke_model(
+        response = self._client().invoke_model(
             modelId=self.cfg.llm.bedrock_model_id,
             body=str(prompt).encode("utf-8"),
         )
@@ -59,29 +116,59 @@ class NarrativeGenerator:
         risk_score = evidence.get("risk_score", "N/A")
         typologies = ", ".join(evidence.get("typologies", [])) or "Unspecified typology"
         rules = ", ".join(evidence.get("triggered_rules", [])) or "No deterministic rules triggered"
+        evidence_ids = ", ".join(evidence.get("evidence_transaction_ids", [])) or "None referenced"
 
         return (
             f"Summary of suspicious activity:\n"
             f"Customer {customer_id} has been identified as potentially high risk with a risk score of {risk_score}.\n\n"
             f"Description of activity and patterns observed:\n"
             f"The customer exhibits behaviour consistent with the following typologies: {typologies}.\n"
-            f"Deterministic rules triggered: {rules}.\n\n"
+            f"Deterministic rules triggered: {rules}.\n"
+            f"Evidence transactions: {evidence_ids}.\n\n"
             f"Risk rationale:\n"
             f"This narrative has been generated using the SecureSAR decision framework and is intended as a draft for human review.\n"
         )
 
-    def generate(self, evidence: Dict[str, Any]) -> str:
+    @property
+    def uses_bedrock(self) -> bool:
+        return self.use_real_llm or self.cfg.llm.use_real_llm
+
+    def generate(self, evidence: Dict[str, Any], raise_throttling: bool = False) -> str:
         """
         Generate a SAR narrative string from structured evidence.
-        """
-        if self._bedrock is not None:
-            try:
-                return self._call_bedrock(evidence)
-            except Exception:
-                # Fallback for local runs or misconfiguration
-                return self._deterministic_narrative(evidence)
-        return self._deterministic_narrative(evidence)
 
+        Bedrock failures fall back to the template narrative, except throttling
+        errors when ``raise_throttling`` is set, so a caller can back off and retry.
+        """
+        return self.generate_result(evidence, raise_throttling).text
 
-__all__ = ["NarrativeGenerator"]
+    def generate_result(self, evidence: Dict[str, Any], raise_throttling: bool = False) -> NarrativeResult:
+        """
+        ``generate``, also reporting whether the text is a fallback.
+        """
+        started = time.perf_counter()
+        provider, outcome = "template", "ok"
+        try:
+            if self.uses_bedrock:
+                provider = "bedrock"
+                try:
+                    return NarrativeResult(self._call_bedrock(evidence))
+                except Exception as exc:
+                    if raise_throttling and is_throttling_error(exc):
+                        outcome = "throttled"
+                        raise
+                    # Fall back to the template, but keep the failure visible.
+                    outcome = "fallback"
+                    logger.warning(
+                        "Bedrock narrative call failed (%s); using the template narrative",
+                        error_code(exc),
+                        exc_info=True,
+                    )
+                    return NarrativeResult(self._deterministic_narrative(evidence), fallback=True)
+            return NarrativeResult(self._deterministic_narrative(evidence))
+        finally:
+            NARRATIVE_SECONDS.observe(time.perf_counter() - started, provider=provider, outcome=outcome)
+
+
+__all__ = ["THROTTLING_ERROR_CODES", "NarrativeGenerator", "NarrativeResult", "error_code", "is_throttling_error"]
 
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+import itertools
+import json
+import random
+import threading
+import time
+
+from src.llm.narrative_generator import NarrativeGenerator, is_throttling_error
+from src.utils.helpers import logger
+from src.utils.metrics import NARRATIVE_QUEUE_DEPTH
+
+
+# Queue tiers: cases an analyst is waiting for, then the background backlog.
+OPENED, BACKGROUND = 0, 1
+MAX_BACKOFF_S = 30.0
+
+
+class TokenBucket:
+    """
+    Allows ``rate`` acquisitions per second on average with bursts of up to
+    ``capacity``. Thread-safe; ``acquire`` sleeps until a token is free.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _wait_time(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """
+        Take one token, waiting as needed. Returns False if ``stop`` was set
+        while waiting.
+        """
+        while True:
+            with self._lock:
+                wait = self._wait_time()
+            if wait == 0.0:
+                return True
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def evidence_key(evidence: Dict[str, Any]) -> str:
+    """
+    Fingerprint of the evidence a draft was written from; a draft is only
+    served while the case's evidence still matches.
+    """
+    return json.dumps(evidence, sort_keys=True, default=str)
+
+
+@dataclass(frozen=True)
+class Draft:
+    key: str
+    text: str
+    created_at: float
+    seq: int  # increases with every stored draft, for per-case cache keys
+
+
+class NarrativeScheduler:
+    """
+    Background narrative drafts for the current cases, highest risk first.
+
+    ``schedule`` replaces the backlog after each pipeline run; ``draft``
+    returns a ready narrative for a case or moves the case to the front of the
+    queue. Up to ``max_concurrency`` worker threads generate drafts; calls go
+    through a token bucket when the generator uses Bedrock, and throttling
+    errors are retried with exponential backoff and jitter. Other Bedrock
+    errors fall back to the template narrative in the generator; fallbacks
+    are not stored, so the case is drafted again the next time it is opened.
+
+    ``evidence_for`` maps a case id to the evidence dict given to the
+    generator (None when the case no longer exists). It is called again when
+    a queued case is picked up, so drafts always reflect the latest scores.
+    """
+
+    def __init__(
+        self,
+        generator: NarrativeGenerator,
+        evidence_for: Callable[[str], Optional[Dict[str, Any]]],
+        rate_per_s: float = 2.0,
+        burst: int = 4,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff_s: float = 0.5,
+    ) -> None:
+        self.generator = generator
+        self.evidence_for = evidence_for
+        self.bucket = TokenBucket(rate_per_s, burst)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self._drafts: Dict[str, Draft] = {}
+        self._heap: List[Tuple[int, int, str]] = []
+        self._queued: Set[Tuple[int, str]] = set()
+        self._in_flight: Set[str] = set()
+        self._seq = itertools.count()
+        self._draft_seq = itertools.count(1)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    def draft_version(self, case_id: str) -> int:
+        """
+        Changes whenever a draft is stored for ``case_id`` (0 before the first),
+        for per-case cache keys.
+        """
+        stored = self._drafts.get(case_id)
+        return 0 if stored is None else stored.seq
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, case_ids: Iterable[str]) -> None:
+        """
+        Replace the background backlog with ``case_ids`` (in priority order).
+        Cases an analyst opened stay at the front.
+        """
+        with self._cond:
+            self._heap = [item for item in self._heap if item[0] == OPENED]
+            self._queued = {(OPENED, case_id) for _, _, case_id in self._heap}
+            for case_id in case_ids:
+                self._heap.append((BACKGROUND, next(self._seq), case_id))
+                self._queued.add((BACKGROUND, case_id))
+            heapq.heapify(self._heap)
+            self._changed()
+        self._start()
+
+    def draft(self, case_id: str, evidence: Dict[str, Any]) -> Optional[str]:
+        """
+        The stored narrative for ``case_id`` if it was written from
+        ``evidence``; otherwise None, and the case jumps the queue.
+        """
+        stored = self._drafts.get(case_id)
+        if stored is not None and stored.key == evidence_key(evidence):
+            return stored.text
+        with self._cond:
+            if case_id not in self._in_flight and (OPENED, case_id) not in self._queued:
+                heapq.heappush(self._heap, (OPENED, next(self._seq), case_id))
+                self._queued.add((OPENED, case_id))
+                self._changed()
+        self._start()
+        return None
+
+    def narrative(self, case_id: str, evidence: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        The narrative for ``case_id`` now, for an analyst waiting on it, and
+        whether it is a stored draft. A draft a worker is writing is waited
+        for instead of being generated twice; otherwise the case is claimed
+        from the queue and generated in the caller's thread, and kept as the
+        draft unless it is a fallback.
+        """
+        key = evidence_key(evidence)
+        with self._cond:
+            self._cond.wait_for(lambda: case_id not in self._in_flight)
+            stored = self._drafts.get(case_id)
+            if stored is not None and stored.key == key:
+                return stored.text, True
+            # Workers drop queue entries for in-flight cases.
+            self._in_flight.add(case_id)
+        try:
+            result = self.generator.generate_result(evidence)
+            if not result.fallback:
+                self.store(case_id, evidence, result.text)
+            return result.text, False
+        finally:
+            with self._cond:
+                self._in_flight.discard(case_id)
+                self._cond.notify_all()
+
+    def store(self, case_id: str, evidence: Dict[str, Any], text: str) -> None:
+        with self._cond:
+            self._drafts[case_id] = Draft(
+                key=evidence_key(evidence), text=text, created_at=time.time(), seq=next(self._draft_seq)
+            )
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the queue is empty and no draft is being written.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._heap and not self._in_flight, timeout)
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+        self._workers = []
+
+    def _changed(self) -> None:
+        NARRATIVE_QUEUE_DEPTH.set(len(self._heap))
+        self._cond.notify_all()
+
+    def _start(self) -> None:
+        with self._cond:
+            if self._workers or self._stop.is_set():
+                return
+            for n in range(self.max_concurrency):
+                worker = threading.Thread(target=self._run, name=f"securesar-narrative-{n}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _next(self) -> Optional[str]:
+        with self._cond:
+            while not self._stop.is_set():
+                while self._heap:
+                    tier, _, case_id = heapq.heappop(self._heap)
+                    self._queued.discard((tier, case_id))
+                    if case_id not in self._in_flight:
+                        self._in_flight.add(case_id)
+                        self._changed()
+                        return case_id
+                NARRATIVE_QUEUE_DEPTH.set(0)
+                self._cond.wait()
+            return None
+
+    def _run(self) -> None:
+        while True:
+            case_id = self._next()
+            if case_id is None:
+                return
+            try:
+                self._draft_one(case_id)
+            except Exception:
+                logger.exception("Narrative draft for case %s failed", case_id)
+            finally:
+                with self._cond:
+                    self._in_flight.discard(case_id)
+                    self._cond.notify_all()
+
+    def _draft_one(self, case_id: str) -> None:
+        evidence = self.evidence_for(case_id)
+        if evidence is None:
+            return
+        stored = self._drafts.get(case_id)
+        if stored is not None and stored.key == evidence_key(evidence):
+            return
+        for attempt in range(self.max_retries + 1):
+            if self.generator.uses_bedrock and not self.bucket.acquire(self._stop):
+                return
+            try:
+                result = self.generator.generate_result(evidence, raise_throttling=True)
+            except Exception as exc:
+                if not is_throttling_error(exc) or attempt == self.max_retries:
+                    raise
+                # Full jitter keeps throttled workers from retrying in lockstep.
+                delay = random.uniform(0.0, min(MAX_BACKOFF_S, self.backoff_s * 2**attempt))
+                if self._stop.wait(delay):
+                    return
+                continue
+            if result.fallback:
+                logger.warning("Narrative draft for case %s fell back to the template; not stored", case_id)
+            else:
+                self.store(case_id, evidence, result.text)
+            return
+
+
+__all__ = ["TokenBucket", "Draft", "NarrativeScheduler", "evidence_key"]
@@ -3,9 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Dict
 
-from opensearchpy import OpenSearch
-
-from src.utils.config import load_config
+from src.utils.config import get_config
 
 
 @dataclass
@@ -17,9 +15,11 @@ class RAGPipeline:
     """
 
     def __post_init__(self) -> None:
-        cfg = load_config()
+        cfg = get_config()
         self.endpoint = cfg.opensearch.endpoint
         self.index = cfg.opensearch.sar_index
+        from opensearchpy import OpenSearch
+
         # For simplicity, assume anonymous / dev auth; production should use IAM or basic auth.
         self.client = OpenSearch(
             hosts=[self.endpoint],
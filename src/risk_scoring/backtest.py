@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Iterable, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.risk_scoring.risk_calculator import WEIGHT_KEYS, RiskComponents
+
+
+CONFIG_COLUMNS = WEIGHT_KEYS + ["low_band_max", "medium_band_max"]
+
+
+def weight_grid(
+    steps: int = 11,
+    band_edges: Iterable[Tuple[float, float]] = ((0.3, 0.6),),
+) -> pd.DataFrame:
+    """
+    Grid of weight configurations on the simplex (weights sum to 1), crossed
+    with the given (low_band_max, medium_band_max) cut-point pairs.
+    """
+    axis = np.linspace(0.0, 1.0, steps)
+    rows = []
+    for (rule_w, anomaly_w), (low, medium) in product(product(axis, axis), band_edges):
+        cluster_w = 1.0 - rule_w - anomaly_w
+        if cluster_w < -1e-9:
+            continue
+        rows.append((rule_w, anomaly_w, max(cluster_w, 0.0), low, medium))
+    return pd.DataFrame(rows, columns=CONFIG_COLUMNS)
+
+
+def sample_weight_configs(n: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Random sample of ``n`` configurations: Dirichlet weights and sorted uniform cut-points.
+    """
+    rng = np.random.default_rng(seed)
+    weights = rng.dirichlet(np.ones(len(WEIGHT_KEYS)), size=n)
+    edges = np.sort(rng.uniform(0.05, 0.95, size=(n, 2)), axis=1)
+    return pd.DataFrame(np.hstack([weights, edges]), columns=CONFIG_COLUMNS)
+
+
+def outcome_labels(
+    customer_ids: Sequence[str],
+    alerts: pd.DataFrame,
+    outcome_column: Optional[str] = None,
+) -> np.ndarray:
+    """
+    Boolean outcome per customer from the alerts table.
+
+    With ``outcome_column`` (e.g. a SAR-filed flag) a customer is positive when
+    any of their alerts has a truthy value; otherwise any alert counts as positive.
+    """
+    if alerts.empty:
+        return np.zeros(len(customer_ids), dtype=bool)
+    if outcome_column is not None:
+        alerts = alerts[alerts[outcome_column].fillna(False).astype(bool)]
+    positives = set(alerts["customer_id"].astype(str))
+    return np.fromiter((c in positives for c in customer_ids), dtype=bool, count=len(customer_ids))
+
+
+def _evaluate_block(matrix: np.ndarray, labels: np.ndarray, configs: np.ndarray) -> np.ndarray:
+    n_weights = len(WEIGHT_KEYS)
+    scores = matrix @ configs[:, :n_weights].T  # (n_customers, block)
+    high = scores > configs[:, n_weights + 1]
+    medium = (scores > configs[:, n_weights]) & ~high
+
+    n_high = high.sum(axis=0)
+    n_medium = medium.sum(axis=0)
+    hits = labels.astype(np.float64) @ high
+    return np.column_stack([n_high, n_medium, len(matrix) - n_high - n_medium, hits])
+
+
+def pareto_front(alert_volume: np.ndarray, recall: np.ndarray) -> np.ndarray:
+    """
+    Mask of configurations not dominated on (fewer alerts, higher recall).
+    """
+    order = np.lexsort((-recall, alert_volume))
+    mask = np.zeros(len(order), dtype=bool)
+    best = -np.inf
+    for idx in order:
+        if recall[idx] > best:
+            mask[idx] = True
+            best = recall[idx]
+    return mask
+
+
+def run_backtest(
+    components: RiskComponents,
+    configs: pd.DataFrame,
+    labels: np.ndarray,
+    block_size: int = 256,
+    n_jobs: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Score every configuration against the cached component matrix.
+
+    Configurations are evaluated in blocks, each block being one matrix product
+    of (n_customers x 3) by (3 x block_size); blocks run on a thread pool since
+    NumPy releases the GIL for the heavy work. Returns one row per configuration
+    with band counts, alert volume (High band), hit rate, recall and a
+    ``pareto`` flag for the alert-volume / recall front.
+    """
+    cfg = configs[CONFIG_COLUMNS].to_numpy(dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+    if len(labels) != len(components):
+        raise ValueError("labels must align with the component matrix rows")
+
+    blocks = [cfg[i : i + block_size] for i in range(0, len(cfg), block_size)]
+    workers = n_jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts: List[np.ndarray] = list(
+            pool.map(lambda b: _evaluate_block(components.matrix, labels, b), blocks)
+        )
+    stats = np.vstack(parts) if parts else np.empty((0, 4))
+
+    out = configs[CONFIG_COLUMNS].reset_index(drop=True).copy()
+    out["alerts_high"] = stats[:, 0].astype(np.int64)
+    out["band_medium"] = stats[:, 1].astype(np.int64)
+    out["band_low"] = stats[:, 2].astype(np.int64)
+    hits = stats[:, 3]
+    total_positive = int(labels.sum())
+    out["hits"] = hits.astype(np.int64)
+    out["hit_rate"] = np.divide(hits, stats[:, 0], out=np.zeros_like(hits), where=stats[:, 0] > 0)
+    out["recall"] = hits / total_positive if total_positive else 0.0
+    out["pareto"] = pareto_front(out["alerts_high"].to_numpy(), out["recall"].to_numpy())
+    return out
+
+
+__all__ = [
+    "CONFIG_COLUMNS",
+    "weight_grid",
+    "sample_weight_configs",
+    "outcome_labels",
+    "pareto_front",
+    "run_backtest",
+]
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import yaml
 
-from src.utils.config import load_config
+from src.utils.artifacts import new_run_id, write_artifact
+from src.utils.config import get_config
+from src.utils.file_watch import watch_file
 from src.utils.helpers import ensure_dir
+from src.utils.sketches import MinMax
 
 
-def load_score_weights(path: Path | None = None) -> Dict[str, float]:
-    """
-    Load risk score weights and thresholds from YAML.
-    """
-    cfg = load_config()
-    weights_path = path or cfg.risk.score_weights_path
+COMPONENT_COLUMNS = ["rule_score", "anomaly_score", "cluster_score"]
+WEIGHT_KEYS = ["rule_weight", "anomaly_weight", "cluster_weight"]
+RISK_BANDS = ["Low", "Medium", "High"]
+
+
+def _parse_score_weights(weights_path: Path) -> Dict[str, float]:
     if not weights_path.exists():
         # Fall back to sensible defaults
         return {
@@ -23,15 +28,152 @@ def load_score_weights(path: Path | None = None) -> Dict[str, float]:
             "anomaly_weight": 0.3,
             "cluster_weight": 0.2,
             "high_risk_threshold": 0.8,
+            "low_band_max": 0.3,
+            "medium_band_max": 0.6,
         }
     with weights_path.open("r", encoding="utf-8") as f:
         data = yaml.safe_load(f) or {}
-    return {
+    weights = {
         "rule_weight": float(data.get("rule_weight", 0.5)),
         "anomaly_weight": float(data.get("anomaly_weight", 0.3)),
         "cluster_weight": float(data.get("cluster_weight", 0.2)),
         "high_risk_threshold": float(data.get("high_risk_threshold", 0.8)),
+        "low_band_max": float(data.get("low_band_max", 0.3)),
+        "medium_band_max": float(data.get("medium_band_max", 0.6)),
     }
+    validate_score_weights(weights)
+    return weights
+
+
+def validate_score_weights(weights: Dict[str, float]) -> None:
+    """
+    Raise ValueError for negative weights or non-increasing band cut-points.
+    """
+    negative = [k for k, v in weights.items() if v < 0]
+    if negative:
+        raise ValueError(f"Score weights must be non-negative: {', '.join(negative)}")
+    if not weights["low_band_max"] < weights["medium_band_max"]:
+        raise ValueError("low_band_max must be below medium_band_max")
+
+
+def load_score_weights(path: Path | None = None) -> Dict[str, float]:
+    """
+    Load risk score weights and thresholds from YAML.
+
+    The parsed file is cached and reloaded when it changes on disk.
+    """
+    weights_path = path or get_config().risk.score_weights_path
+    return dict(watch_file(weights_path, _parse_score_weights).get())
+
+
+@dataclass(frozen=True)
+class RiskComponents:
+    """
+    Normalized per-customer risk components kept after a pipeline run so that
+    new weights can be applied without rerunning detection.
+    """
+
+    customer_ids: np.ndarray
+    matrix: np.ndarray  # shape (n_customers, len(COMPONENT_COLUMNS)), float64
+
+    @classmethod
+    def from_frame(cls, risk_df: pd.DataFrame) -> "RiskComponents":
+        return cls(
+            customer_ids=risk_df["customer_id"].astype(str).to_numpy(),
+            matrix=np.ascontiguousarray(risk_df[COMPONENT_COLUMNS].to_numpy(dtype=np.float64)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+
+def score_components(matrix: np.ndarray, weights: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted risk scores and band codes (indices into RISK_BANDS) for a component
+    matrix, as one matrix-vector product plus a binary search over cut-points.
+    Bands are right-closed: a score equal to ``low_band_max`` is still Low.
+    """
+    w = np.array([weights[k] for k in WEIGHT_KEYS], dtype=np.float64)
+    edges = np.array([weights["low_band_max"], weights["medium_band_max"]], dtype=np.float64)
+    scores = matrix @ w
+    codes = np.searchsorted(edges, scores, side="left").astype(np.int8)
+    return scores, codes
+
+
+@dataclass(frozen=True)
+class ScoreCalibration:
+    """
+    Population statistics used to normalize risk components. Fitted on a full
+    run and reused when scoring a subset so subset scores stay comparable.
+    """
+
+    rule_count_min: float
+    rule_count_max: float
+    anomaly_min: float
+    anomaly_max: float
+    high_risk_clusters: Tuple[int, ...]
+
+
+@dataclass
+class CalibrationSketch:
+    """
+    Mergeable statistics behind a ScoreCalibration: running min/max of rule
+    counts and anomaly scores, and per-cluster amount sums and counts. Build one
+    per chunk or shard of customers (each customer's rule hits in a single
+    chunk), merge them, then ``finalize``. All statistics are exact.
+    """
+
+    rule_counts: MinMax = field(default_factory=MinMax)
+    anomaly: MinMax = field(default_factory=MinMax)
+    cluster_amount: Dict[int, float] = field(default_factory=dict)
+    cluster_size: Dict[int, int] = field(default_factory=dict)
+
+    def update(
+        self,
+        rules_df: pd.DataFrame,
+        anomaly_scores: pd.Series,
+        cluster_df: pd.DataFrame,
+    ) -> "CalibrationSketch":
+        if not rules_df.empty:
+            rule_counts = rules_df.groupby("customer_id", observed=True)["rule_id"].nunique()
+            self.rule_counts.update(rule_counts.to_numpy(dtype=float))
+        self.anomaly.update(anomaly_scores.to_numpy(dtype=float))
+        if not cluster_df.empty:
+            stats = cluster_df.groupby("cluster")["total_amount"].agg(["sum", "count"])
+            for cluster, (total, size) in stats.iterrows():
+                self.cluster_amount[int(cluster)] = self.cluster_amount.get(int(cluster), 0.0) + float(total)
+                self.cluster_size[int(cluster)] = self.cluster_size.get(int(cluster), 0) + int(size)
+        return self
+
+    def merge(self, other: "CalibrationSketch") -> "CalibrationSketch":
+        self.rule_counts.merge(other.rule_counts)
+        self.anomaly.merge(other.anomaly)
+        for cluster, total in other.cluster_amount.items():
+            self.cluster_amount[cluster] = self.cluster_amount.get(cluster, 0.0) + total
+            self.cluster_size[cluster] = self.cluster_size.get(cluster, 0) + other.cluster_size[cluster]
+        return self
+
+    def finalize(self) -> ScoreCalibration:
+        rule_min, rule_max = self.rule_counts.bounds()
+        a_min, a_max = self.anomaly.bounds()
+        # Cluster component: mark clusters that appear high-risk (simple heuristic)
+        clusters = sorted(self.cluster_amount)
+        means = pd.Series(
+            [self.cluster_amount[c] for c in clusters], index=clusters, dtype=float
+        ) / pd.Series([self.cluster_size[c] for c in clusters], index=clusters, dtype=float)
+        high_risk_clusters = means.sort_values(ascending=False).head(2).index
+        return ScoreCalibration(rule_min, rule_max, a_min, a_max, tuple(int(c) for c in high_risk_clusters))
+
+
+def fit_score_calibration(
+    rules_df: pd.DataFrame,
+    anomaly_scores: pd.Series,
+    cluster_df: pd.DataFrame,
+) -> ScoreCalibration:
+    """
+    Derive normalization bounds and high-risk clusters from a full population.
+    """
+    return CalibrationSketch().update(rules_df, anomaly_scores, cluster_df).finalize()
 
 
 def compute_risk_scores(
@@ -40,39 +182,42 @@ def compute_risk_scores(
     anomaly_scores: pd.Series,
     cluster_df: pd.DataFrame,
     typologies: List[Dict[str, str]],
+    calibration: Optional[ScoreCalibration] = None,
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Combine rule triggers, anomaly scores, clusters, and typologies into risk scores.
+    Without ``calibration`` the normalization is fitted on the given inputs;
+    with one (e.g. from a previous full run) components are clipped to [0, 1].
     Returns:
       - customer-level risk scores DataFrame
       - typology mapping DataFrame
     """
     weights = load_score_weights()
+    fitted = calibration is None
+    if calibration is None:
+        calibration = fit_score_calibration(rules_df, anomaly_scores, cluster_df)
 
     df = features[["customer_id"]].copy()
     df = df.drop_duplicates(subset=["customer_id"])
 
     # Rule component: count of triggered rules per customer, min-max normalized
     if not rules_df.empty:
-        rule_counts = rules_df.groupby("customer_id")["rule_id"].nunique()
-        rule_scores = (rule_counts - rule_counts.min()) / (rule_counts.max() - rule_counts.min() or 1.0)
+        rule_counts = rules_df.groupby("customer_id", observed=True)["rule_id"].nunique()
+        rule_scores = (rule_counts - calibration.rule_count_min) / (
+            calibration.rule_count_max - calibration.rule_count_min or 1.0
+        )
     else:
         rule_scores = pd.Series(0.0, index=df["customer_id"])
 
     # Anomaly component: already a score; min-max normalize
     if not anomaly_scores.empty:
-        a_min = anomaly_scores.min()
-        a_max = anomaly_scores.max()
-        anomaly_norm = (anomaly_scores - a_min) / (a_max - a_min or 1.0)
+        anomaly_norm = (anomaly_scores - calibration.anomaly_min) / (
+            calibration.anomaly_max - calibration.anomaly_min or 1.0
+        )
     else:
         anomaly_norm = pd.Series(0.0, index=df.index)
 
-    # Cluster component: mark clusters that appear high-risk (simple heuristic)
-    high_risk_clusters = (
-        cluster_df.groupby("cluster")["total_amount"].mean().sort_values(ascending=False).head(2).index
-        if not cluster_df.empty
-        else []
-    )
+    high_risk_clusters = set(calibration.high_risk_clusters)
     cluster_scores = cluster_df.set_index("customer_id")["cluster"].map(
         lambda c: 1.0 if c in high_risk_clusters else 0.0
     )
@@ -81,36 +226,48 @@ def compute_risk_scores(
     df["rule_score"] = rule_scores.reindex(df.index).fillna(0.0)
     df["anomaly_score"] = anomaly_norm.reindex(df.index).fillna(0.0)
     df["cluster_score"] = cluster_scores.reindex(df.index).fillna(0.0)
+    if not fitted:
+        df[COMPONENT_COLUMNS] = df[COMPONENT_COLUMNS].clip(0.0, 1.0)
 
-    df["risk_score"] = (
-        weights["rule_weight"] * df["rule_score"]
-        + weights["anomaly_weight"] * df["anomaly_score"]
-        + weights["cluster_weight"] * df["cluster_score"]
-    )
-
-    df["risk_band"] = pd.cut(
-        df["risk_score"],
-        bins=[-0.01, 0.3, 0.6, 1.0],
-        labels=["Low", "Medium", "High"],
-    )
+    scores, codes = score_components(df[COMPONENT_COLUMNS].to_numpy(dtype=np.float64), weights)
+    df["risk_score"] = scores
+    df["risk_band"] = pd.Categorical.from_codes(codes, categories=RISK_BANDS, ordered=True)
 
-    # Typologies
+    # Typologies (a handful of labels repeated per customer, so categorical)
     typology_df = pd.DataFrame(typologies) if typologies else pd.DataFrame(columns=["customer_id", "typology"])
+    typology_df = typology_df.astype({"customer_id": "category", "typology": "category"})
 
     df = df.reset_index()
     return df, typology_df
 
 
-def save_risk_scores(df: pd.DataFrame, path: Path | None = None) -> Path:
+def save_risk_scores(df: pd.DataFrame, path: Path | None = None, run_id: str | None = None) -> Path:
     """
-    Persist risk scores to data/processed.
+    Persist risk scores to data/processed/risk_scores as a Parquet artifact for
+    ``run_id``; the ordered ``risk_band`` categorical is preserved.
+    A ``path`` ending in ``.csv`` writes a plain CSV file instead.
     """
-    cfg = load_config()
-    out_path = path or (cfg.data.processed_dir / "risk_scores.csv")
-    ensure_dir(out_path.parent)
-    df.to_csv(out_path, index=False)
-    return out_path
+    cfg = get_config()
+    out_path = path or (cfg.data.processed_dir / "risk_scores")
+    if out_path.suffix == ".csv":
+        ensure_dir(out_path.parent)
+        df.to_csv(out_path, index=False)
+        return out_path
+    return write_artifact(df, out_path, run_id or new_run_id())
 
 
-__all__ = ["load_score_weights", "compute_risk_scores", "save_risk_scores"]
+__all__ = [
+    "COMPONENT_COLUMNS",
+    "WEIGHT_KEYS",
+    "RISK_BANDS",
+    "RiskComponents",
+    "ScoreCalibration",
+    "CalibrationSketch",
+    "fit_score_calibration",
+    "load_score_weights",
+    "validate_score_weights",
+    "score_components",
+    "compute_risk_scores",
+    "save_risk_scores",
+]
 
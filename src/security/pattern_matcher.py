@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    pattern: str
+    start: int
+    end: int
+
+
+def _fold(text: str) -> str:
+    """
+    Case-fold text while keeping a 1:1 character mapping so spans stay valid
+    against the original string.
+    """
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    # A few characters (e.g. "İ") expand when lowercased; keep those as-is.
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class PatternMatcher:
+    """
+    Case-insensitive Aho-Corasick automaton over a fixed set of literal patterns.
+
+    The automaton is compiled once; scanning is a single linear pass over the
+    text regardless of how many patterns are loaded.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(p for p in patterns if p))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._lengths: List[int] = []
+
+        for idx, pattern in enumerate(self.patterns):
+            key = _fold(pattern)
+            self._lengths.append(len(key))
+            node = 0
+            for ch in key:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (idx,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, text: str, state: int, offset: int) -> Tuple[List[PatternMatch], int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        matches: List[PatternMatch] = []
+        for i, ch in enumerate(_fold(text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = offset + i + 1
+                for idx in out[state]:
+                    matches.append(PatternMatch(self.patterns[idx], end - self._lengths[idx], end))
+        return matches, state
+
+    def find_all(self, text: str) -> List[PatternMatch]:
+        """
+        Return every (possibly overlapping) pattern occurrence with its span.
+        """
+        matches, _ = self._scan(text, 0, 0)
+        return matches
+
+    def contains_any(self, text: str) -> bool:
+        """
+        Return True as soon as any pattern is found.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in _fold(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+    def stream(self) -> "StreamingMatcher":
+        """
+        Start an incremental scan over chunked input (e.g. streamed LLM output).
+        """
+        return StreamingMatcher(self)
+
+
+class StreamingMatcher:
+    """
+    Incremental scanner that carries automaton state across chunks, so matches
+    that straddle a chunk boundary are still reported (with absolute offsets).
+    """
+
+    def __init__(self, matcher: PatternMatcher) -> None:
+        self._matcher = matcher
+        self._state = 0
+        self.offset = 0
+        self.matches: List[PatternMatch] = []
+
+    def feed(self, chunk: str) -> List[PatternMatch]:
+        """
+        Scan the next chunk and return matches that completed inside it.
+        """
+        found, self._state = self._matcher._scan(chunk, self._state, self.offset)
+        self.offset += len(chunk)
+        self.matches.extend(found)
+        return found
+
+    def reset(self) -> None:
+        self._state = 0
+        self.offset = 0
+        self.matches = []
+
+
+__all__ = ["PatternMatch", "PatternMatcher", "StreamingMatcher"]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List
 import hashlib
 
 
@@ -26,5 +26,12 @@ def mask_pii_fields(record: Dict[str, Any]) -> Dict[str, Any]:
     return masked
 
 
-__all__ = ["PII_FIELDS", "mask_pii_fields"]
+def tokenize_values(values: Iterable[Any]) -> List[Any]:
+    """
+    Tokenize a column of values the same way as ``mask_pii_fields``; None stays None.
+    """
+    return [None if v is None else _tokenize(str(v)) for v in values]
+
+
+__all__ = ["PII_FIELDS", "mask_pii_fields", "tokenize_values"]
 
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from src.security.pattern_matcher import PatternMatch, PatternMatcher, StreamingMatcher
 
 
 INJECTION_KEYWORDS = [
@@ -14,16 +16,43 @@ DISALLOWED_OUTPUT_SNIPPETS = [
     "race-based",
 ]
 
+# Compiled once at import; call ``reload_guard_patterns`` after editing the lists.
+_injection_matcher = PatternMatcher(INJECTION_KEYWORDS)
+_output_matcher = PatternMatcher(DISALLOWED_OUTPUT_SNIPPETS)
+
+
+def reload_guard_patterns() -> None:
+    """
+    Recompile the injection and output matchers from the current pattern lists.
+    """
+    global _injection_matcher, _output_matcher
+    _injection_matcher = PatternMatcher(INJECTION_KEYWORDS)
+    _output_matcher = PatternMatcher(DISALLOWED_OUTPUT_SNIPPETS)
+
+
+def find_injection_patterns(user_text: str) -> List[PatternMatch]:
+    """
+    Return every known injection phrase found in the text, with spans.
+    """
+    return _injection_matcher.find_all(user_text)
+
 
 def sanitize_user_input(user_text: str) -> str:
     """
-    Very small prompt-injection guard: strips known injection patterns.
+    Very small prompt-injection guard: strips known injection patterns while
+    keeping the original casing of the remaining text.
     """
-    lowered = user_text.lower()
-    for kw in INJECTION_KEYWORDS:
-        if kw in lowered:
-            lowered = lowered.replace(kw, "")
-    return lowered
+    matches = _injection_matcher.find_all(user_text)
+    if not matches:
+        return user_text
+    parts: List[str] = []
+    cursor = 0
+    for m in sorted(matches, key=lambda m: m.start):
+        if m.start > cursor:
+            parts.append(user_text[cursor : m.start])
+        cursor = max(cursor, m.end)
+    parts.append(user_text[cursor:])
+    return "".join(parts)
 
 
 def build_guarded_prompt(system_prompt: str, evidence: Dict[str, Any], user_text: str | None = None) -> str:
@@ -39,16 +68,37 @@ def build_guarded_prompt(system_prompt: str, evidence: Dict[str, Any], user_text
     )
 
 
+def find_output_violations(text: str) -> List[PatternMatch]:
+    """
+    Return every disallowed snippet found in an LLM output, with spans.
+    """
+    return _output_matcher.find_all(text)
+
+
 def is_output_policy_compliant(text: str) -> bool:
     """
     Basic content filter for LLM outputs.
     """
-    lowered = text.lower()
-    for snippet in DISALLOWED_OUTPUT_SNIPPETS:
-        if snippet in lowered:
-            return False
-    return True
+    return not _output_matcher.contains_any(text)
 
 
-__all__ = ["sanitize_user_input", "build_guarded_prompt", "is_output_policy_compliant"]
+def output_stream_checker() -> StreamingMatcher:
+    """
+    Return an incremental checker for streamed LLM output. Feed chunks as they
+    arrive; a non-empty result from ``feed`` means the output is non-compliant,
+    including when the offending snippet spans two chunks.
+    """
+    return _output_matcher.stream()
 
+
+__all__ = [
+    "INJECTION_KEYWORDS",
+    "DISALLOWED_OUTPUT_SNIPPETS",
+    "reload_guard_patterns",
+    "find_injection_patterns",
+    "sanitize_user_input",
+    "build_guarded_prompt",
+    "find_output_violations",
+    "is_output_policy_compliant",
+    "output_stream_checker",
+]
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+
+from src.risk_scoring.risk_calculator import COMPONENT_COLUMNS, RISK_BANDS
+
+
+CURRENT_FILE = "CURRENT"
+# Older snapshot files kept for workers still serving them; on POSIX a worker
+# that has a file mapped keeps reading it even after it is removed.
+KEEP_SNAPSHOTS = 3
+
+_STRING_LIST = pa.list_(pa.string())
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("customer_id", pa.string()),
+        ("risk_score", pa.float64()),
+        ("band_code", pa.int8()),
+        *[(column, pa.float64()) for column in COMPONENT_COLUMNS],
+        ("typologies", _STRING_LIST),
+        ("triggered_rules", _STRING_LIST),
+        ("evidence_transaction_ids", _STRING_LIST),
+        ("shap_values", pa.map_(pa.string(), pa.float64())),
+    ]
+)
+
+
+class SnapshotUnavailableError(RuntimeError):
+    """
+    Raised by an attached worker before the builder has published a snapshot.
+    """
+
+
+def snapshot_table(
+    cases: Sequence[Any],
+    scores: np.ndarray,
+    band_codes: np.ndarray,
+    components: np.ndarray,
+) -> pa.Table:
+    """
+    One row per case, in case row order, as a single-chunk table so readers
+    get contiguous, zero-copy numpy views of the numeric columns.
+    """
+    data: Dict[str, Any] = {
+        "id": [c.id for c in cases],
+        "customer_id": [c.customer_id for c in cases],
+        "risk_score": np.asarray(scores, dtype=np.float64),
+        "band_code": np.asarray(band_codes, dtype=np.int8),
+    }
+    for pos, column in enumerate(COMPONENT_COLUMNS):
+        data[column] = np.ascontiguousarray(components[:, pos], dtype=np.float64)
+    data["typologies"] = [c.typologies for c in cases]
+    data["triggered_rules"] = [c.triggered_rules for c in cases]
+    data["evidence_transaction_ids"] = [c.evidence_transaction_ids for c in cases]
+    data["shap_values"] = [list(c.shap_values.items()) for c in cases]
+    return pa.Table.from_pydict(data, schema=SNAPSHOT_SCHEMA)
+
+
+def _read_current(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads((directory / CURRENT_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def publish_snapshot(table: pa.Table, directory: Path, run_id: str) -> int:
+    """
+    Write ``table`` as an Arrow IPC file and make it the current snapshot.
+
+    The file is written under a temporary name and renamed, then the
+    ``CURRENT`` pointer (version, run id, file name) is replaced atomically, so
+    readers only ever see complete snapshots. Versions increase by one per
+    publish. Only one process should publish to a directory.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    current = _read_current(directory)
+    version = (current["version"] if current else 0) + 1
+    name = f"snapshot-{version:08d}.arrow"
+    tmp = directory / f".{name}.tmp"
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, SNAPSHOT_SCHEMA) as writer:
+        writer.write_table(table.combine_chunks())
+    os.replace(tmp, directory / name)
+
+    pointer = directory / f".{CURRENT_FILE}.tmp"
+    pointer.write_text(json.dumps({"version": version, "run_id": run_id, "file": name}), encoding="utf-8")
+    os.replace(pointer, directory / CURRENT_FILE)
+
+    for old in sorted(directory.glob("snapshot-*.arrow"))[:-KEEP_SNAPSHOTS]:
+        old.unlink(missing_ok=True)
+    return version
+
+
+@dataclass(frozen=True)
+class CaseSnapshot:
+    """
+    A published snapshot mapped read-only into this process. Columns are
+    views over the mapped file; only the case-id index is built per process.
+    """
+
+    version: int
+    run_id: str
+    table: pa.Table
+    index: Dict[str, int]
+    scores: np.ndarray
+    band_codes: np.ndarray
+
+    @classmethod
+    def open(cls, path: Path, version: int, run_id: str) -> "CaseSnapshot":
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        ids = table.column("id").to_pylist()
+        return cls(
+            version=version,
+            run_id=run_id,
+            table=table,
+            index={case_id: row for row, case_id in enumerate(ids)},
+            scores=table.column("risk_score").to_numpy(),
+            band_codes=table.column("band_code").to_numpy(),
+        )
+
+    @property
+    def tag(self) -> str:
+        return f"{self.run_id}.{self.version}"
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def _rows(self, rows: np.ndarray, columns: Sequence[str]) -> Dict[str, List[Any]]:
+        data = self.table.select(list(columns)).take(pa.array(rows, type=pa.int64())).to_pydict()
+        data["risk_band"] = [RISK_BANDS[code] for code in data.pop("band_code")]
+        return data
+
+    def get_case(self, case_id: str) -> Optional[Dict[str, Any]]:
+        row = self.index.get(case_id)
+        if row is None:
+            return None
+        record = self.table.slice(row, 1).to_pylist()[0]
+        return {
+            "id": record["id"],
+            "customer_id": record["customer_id"],
+            "risk_score": record["risk_score"],
+            "risk_band": RISK_BANDS[record["band_code"]],
+            "typologies": record["typologies"],
+            "triggered_rules": record["triggered_rules"],
+            "shap_values": dict(record["shap_values"]),
+            "evidence_transaction_ids": record["evidence_transaction_ids"],
+        }
+
+    def summaries(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        take = pa.array(rows, type=pa.int64())
+        ids = self.table.column("id").take(take).to_pylist()
+        customers = self.table.column("customer_id").take(take).to_pylist()
+        return [
+            {"id": i, "customer_id": c, "risk_score": float(self.scores[r]), "risk_band": RISK_BANDS[self.band_codes[r]]}
+            for i, c, r in zip(ids, customers, rows.tolist())
+        ]
+
+    def batches(
+        self,
+        rows: np.ndarray,
+        typology: Optional[str],
+        rule: Optional[str],
+        batch_size: int,
+    ) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Export batches in the same column layout as ``SecureSarService.export_cases``.
+        """
+        columns = [name for name in self.table.column_names if name != "shap_values"]
+        typologies = self.table.column("typologies")
+        rules = self.table.column("triggered_rules")
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start : start + batch_size]
+            if typology is not None or rule is not None:
+                take = pa.array(chunk, type=pa.int64())
+                keep = [
+                    (typology is None or typology in t) and (rule is None or rule in r)
+                    for t, r in zip(typologies.take(take).to_pylist(), rules.take(take).to_pylist())
+                ]
+                chunk = chunk[np.asarray(keep, dtype=bool)]
+                if not len(chunk):
+                    continue
+            yield self._rows(chunk, columns)
+
+
+class CaseSnapshotReader:
+    """
+    Attaches to the snapshots published in ``directory``. ``current`` checks
+    the ``CURRENT`` pointer (one stat, rate-limited to every ``poll_interval``
+    seconds) and maps the new file when the builder has published a newer
+    version; callers holding the previous snapshot keep a consistent view.
+    """
+
+    def __init__(self, directory: Path, poll_interval: float = 1.0) -> None:
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[CaseSnapshot] = None
+        self._stamp: Optional[int] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> CaseSnapshot:
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked >= self.poll_interval:
+            with self._lock:
+                self._checked = now
+                self._refresh()
+        if self._snapshot is None:
+            raise SnapshotUnavailableError(f"no case snapshot published in {self.directory} yet")
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        try:
+            stamp = os.stat(self.directory / CURRENT_FILE).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if stamp == self._stamp:
+            return
+        pointer = _read_current(self.directory)
+        if pointer is None:
+            return
+        if self._snapshot is None or pointer["version"] != self._snapshot.version:
+            self._snapshot = CaseSnapshot.open(self.directory / pointer["file"], pointer["version"], pointer["run_id"])
+        self._stamp = stamp
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build case snapshots for attached API workers.")
+    parser.add_argument("--resume", action="store_true", help="publish the latest saved run instead of rerunning")
+    parser.add_argument("--interval", type=float, help="rerun incrementally every N seconds (default: once)")
+    args = parser.parse_args(argv)
+
+    from src.services.securesar_service import SecureSarService
+    from src.utils.config import get_config
+
+    if get_config().pipeline.snapshot_dir is None:
+        parser.error("set SECURESAR_SNAPSHOT_DIR to the directory the API workers attach to")
+    service = SecureSarService(snapshot_mode="publish")
+    if not (args.resume and service.load_run() is not None):
+        service.run_pipeline()
+    print(f"published {service.snapshot_version}")
+    while args.interval:
+        time.sleep(args.interval)
+        service.run_incremental()
+        print(f"published {service.snapshot_version}")
+    return 0
+
+
+__all__ = [
+    "SNAPSHOT_SCHEMA",
+    "CaseSnapshot",
+    "CaseSnapshotReader",
+    "SnapshotUnavailableError",
+    "publish_snapshot",
+    "snapshot_table",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
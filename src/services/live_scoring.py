@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.graph_features import INFLOW_DIRECTIONS
+from src.data_engineering.peer_baselines import PEER_FEATURES, PEER_Z_COLUMNS, PeerBaselines
+from src.detection.forest_inference import flat_forest
+from src.detection.rule_engine import load_rule_thresholds
+from src.risk_scoring.risk_calculator import COMPONENT_COLUMNS, RISK_BANDS, ScoreCalibration, score_components
+
+
+# Columns the rules read; kept in the live state even if the model does not use them.
+RULE_COLUMNS = ["total_amount", "deviation_score", "pass_through_ratio", "structuring_hits"]
+AGGREGATE_COLUMNS = [
+    "total_amount", "tx_count", "avg_amount", *PEER_Z_COLUMNS, "deviation_score", "structuring_amount",
+]
+# Recently applied transaction ids, so a retried request is scored without being counted twice.
+MAX_SEEN_TRANSACTIONS = 100_000
+
+
+@dataclass
+class _Recent:
+    """
+    One transaction in a customer's velocity window.
+    """
+
+    ts: int  # ns since epoch
+    amount: float
+    candidate: bool  # inbound and just under the structuring threshold
+    evidence: bool = False  # already counted in structuring_amount
+
+
+@dataclass(frozen=True)
+class LiveScore:
+    customer_id: str
+    risk_score: float
+    risk_band: str
+    triggered_rules: List[str]
+    components: Dict[str, float]
+    tx_count: int
+    total_amount: float
+    velocity_count: int
+    velocity_amount: float
+    duplicate: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "customer_id": self.customer_id,
+            "risk_score": self.risk_score,
+            "risk_band": self.risk_band,
+            "triggered_rules": self.triggered_rules,
+            "components": self.components,
+            "tx_count": self.tx_count,
+            "total_amount": self.total_amount,
+            "velocity_count": self.velocity_count,
+            "velocity_amount": self.velocity_amount,
+            "duplicate": self.duplicate,
+        }
+
+
+class LiveScorer:
+    """
+    Per-customer feature state from the last full run, updated one transaction
+    at a time and scored for that customer only.
+
+    Features live in one float64 matrix (a row per customer) so a score is a
+    row update, the four rules on scalars, a single-row FlatForest walk and the
+    component weighting; nothing is rebuilt per request. The aggregates
+    (total, count, average) are updated exactly as ``engineer_features`` would
+    compute them with the new transaction added, and the peer z-scores and
+    deviation against the run's cached peer baselines.
+    Structuring hits are counted incrementally from a per-customer window of
+    recent transactions (the velocity state), which starts empty at each run.
+    Counterparty-graph features and clusters keep their last-run values until
+    the next batch run, which also reseeds everything from the raw data.
+    """
+
+    def __init__(
+        self,
+        features: pd.DataFrame,
+        model: Any,
+        deviation_threshold: float,
+        calibration: ScoreCalibration,
+        clusters: pd.Series,
+        peers: PeerBaselines,
+    ) -> None:
+        self._forest = flat_forest(model)
+        self._peers = peers
+        self._deviation_threshold = float(deviation_threshold)
+        self._calibration = calibration
+        model_columns = list(model.feature_names_in_)
+        extra = [c for c in [*RULE_COLUMNS, *AGGREGATE_COLUMNS] if c in features.columns and c not in model_columns]
+        self.columns: List[str] = model_columns + extra
+        self._col = {name: pos for pos, name in enumerate(self.columns)}
+        self._model_cols = np.arange(len(model_columns))
+
+        unique = features.drop_duplicates(subset=["customer_id"])
+        ids = unique["customer_id"].astype(str).tolist()
+        self._row: Dict[str, int] = {cust: pos for pos, cust in enumerate(ids)}
+        self._values = np.ascontiguousarray(unique[self.columns].to_numpy(dtype=np.float64))
+        self._peer_center, self._peer_scale = peers.parameters(unique)
+        self._peer_cols = [self._col[name] for name in PEER_FEATURES]
+        self._z_cols = [self._col[name] for name in PEER_Z_COLUMNS]
+        high = set(calibration.high_risk_clusters)
+        cluster = pd.Series(ids).map(clusters).fillna(-1).astype(int)
+        self._cluster_score = cluster.isin(high).to_numpy(dtype=np.float64)
+        self._recent: Dict[str, Deque[_Recent]] = {}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def __contains__(self, customer_id: str) -> bool:
+        return customer_id in self._row
+
+    def refresh(self, features: pd.DataFrame, clusters: pd.Series) -> None:
+        """
+        Replace the state of the customers in ``features`` (e.g. after an
+        incremental run). Customers not seen at the last full run are skipped.
+        """
+        unique = features.drop_duplicates(subset=["customer_id"])
+        ids = unique["customer_id"].astype(str)
+        known = ids.isin(self._row).to_numpy()
+        ids = ids[known].tolist()
+        rows = [self._row[cust] for cust in ids]
+        values = unique.loc[known, self.columns].to_numpy(dtype=np.float64)
+        center, scale = self._peers.parameters(unique.loc[known])
+        high = set(self._calibration.high_risk_clusters)
+        cluster_score = pd.Series(ids).map(clusters).fillna(-1).astype(int).isin(high).to_numpy(dtype=np.float64)
+        with self._lock:
+            self._values[rows] = values
+            self._peer_center[rows] = center
+            self._peer_scale[rows] = scale
+            self._cluster_score[rows] = cluster_score
+            for cust in ids:
+                self._recent.pop(cust, None)
+
+    def score_transaction(
+        self,
+        transaction_id: str,
+        customer_id: str,
+        amount: float,
+        timestamp: pd.Timestamp,
+        direction: Optional[str],
+        weights: Dict[str, float],
+    ) -> Optional[LiveScore]:
+        """
+        Apply one transaction to its customer's state and score that customer.
+        Returns None for customers unknown to the last run. A transaction id
+        already applied is scored again without changing the state.
+        """
+        if not (math.isfinite(amount) and amount > 0):
+            raise ValueError("amount must be a positive number")
+        pos = self._row.get(customer_id)
+        if pos is None:
+            return None
+        thresholds = load_rule_thresholds()
+        ts = pd.Timestamp(timestamp).value
+        with self._lock:
+            duplicate = transaction_id in self._seen
+            if not duplicate:
+                self._seen[transaction_id] = None
+                if len(self._seen) > MAX_SEEN_TRANSACTIONS:
+                    self._seen.popitem(last=False)
+                self._apply(pos, customer_id, amount, ts, direction, thresholds)
+            row = self._values[pos].copy()
+            recent = self._recent.get(customer_id, ())
+            velocity_count = len(recent)
+            velocity_amount = float(sum(r.amount for r in recent))
+        return self._score(customer_id, pos, row, thresholds, weights, velocity_count, velocity_amount, duplicate)
+
+    def _apply(
+        self,
+        pos: int,
+        customer_id: str,
+        amount: float,
+        ts: int,
+        direction: Optional[str],
+        thresholds: Dict[str, float],
+    ) -> None:
+        values, col = self._values[pos], self._col
+        total = values[col["total_amount"]] + amount
+        count = values[col["tx_count"]] + 1
+        values[col["total_amount"]] = total
+        values[col["tx_count"]] = count
+        values[col["avg_amount"]] = total / count
+        z = (np.log1p(values[self._peer_cols]) - self._peer_center[pos]) / self._peer_scale[pos]
+        values[self._z_cols] = z
+        values[col["deviation_score"]] = z.max()
+
+        # Same candidate rule and window as detect_structuring, with the new
+        # transaction as the end of the window.
+        limit = thresholds["structuring_threshold"]
+        inbound = direction is None or str(direction).lower() in INFLOW_DIRECTIONS
+        candidate = inbound and thresholds["structuring_near_ratio"] * limit <= amount < limit
+        window = int(thresholds["structuring_window_hours"] * 3_600 * 1_000_000_000)
+        recent = self._recent.setdefault(customer_id, deque())
+        while recent and recent[0].ts < ts - window:
+            recent.popleft()
+        entry = _Recent(ts=ts, amount=amount, candidate=candidate)
+        recent.append(entry)
+        if not candidate:
+            return
+        in_window = [r for r in recent if r.candidate and r.ts >= ts - window]
+        if (
+            sum(r.amount for r in in_window) >= limit
+            and len(in_window) >= thresholds["structuring_min_transactions"]
+        ):
+            values[col["structuring_hits"]] += 1
+            for r in in_window:
+                if not r.evidence:
+                    values[col["structuring_amount"]] += r.amount
+                    r.evidence = True
+
+    def _score(
+        self,
+        customer_id: str,
+        pos: int,
+        row: np.ndarray,
+        thresholds: Dict[str, float],
+        weights: Dict[str, float],
+        velocity_count: int,
+        velocity_amount: float,
+        duplicate: bool,
+    ) -> LiveScore:
+        col = self._col
+        rules: List[str] = []
+        if row[col["total_amount"]] > thresholds["high_total_threshold"]:
+            rules.append("R1_HIGH_VOLUME")
+        if row[col["deviation_score"]] > self._deviation_threshold:
+            rules.append("R2_BEHAVIOR_DEVIATION")
+        if "pass_through_ratio" in col and row[col["pass_through_ratio"]] >= thresholds["rapid_movement_ratio"]:
+            rules.append("R3_RAPID_MOVEMENT")
+        if "structuring_hits" in col and row[col["structuring_hits"]] > 0:
+            rules.append("R4_STRUCTURING")
+
+        # Normalized and clipped like compute_risk_scores with the run's calibration.
+        cal = self._calibration
+        rule_score = (
+            (len(rules) - cal.rule_count_min) / (cal.rule_count_max - cal.rule_count_min or 1.0) if rules else 0.0
+        )
+        anomaly = -float(self._forest.decision_function(row[None, self._model_cols])[0])
+        anomaly_score = (anomaly - cal.anomaly_min) / (cal.anomaly_max - cal.anomaly_min or 1.0)
+        matrix = np.clip(np.array([[rule_score, anomaly_score, self._cluster_score[pos]]]), 0.0, 1.0)
+        scores, codes = score_components(matrix, weights)
+        return LiveScore(
+            customer_id=customer_id,
+            risk_score=float(scores[0]),
+            risk_band=RISK_BANDS[codes[0]],
+            triggered_rules=rules,
+            components={name: float(v) for name, v in zip(COMPONENT_COLUMNS, matrix[0])},
+            tx_count=int(row[col["tx_count"]]),
+            total_amount=float(row[col["total_amount"]]),
+            velocity_count=velocity_count,
+            velocity_amount=velocity_amount,
+            duplicate=duplicate,
+        )
+
+
+__all__ = ["LiveScore", "LiveScorer", "MAX_SEEN_TRANSACTIONS"]
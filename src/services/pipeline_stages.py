@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.feature_engineering import engineer_features
+from src.data_engineering.interning import category_values
+from src.detection.anomaly_detection import score_anomalies
+from src.detection.rule_engine import RuleResult, apply_rules
+from src.detection.structuring import (
+    STRUCTURING_COLUMNS,
+    detect_structuring_from_config,
+    structuring_evidence,
+)
+from src.utils.config import AppConfig, get_config, reload_config
+from src.utils.mmap_frame import FrameSpec, read_frame, write_frame
+
+
+def build_customer_features(
+    customers: pd.DataFrame,
+    transactions: pd.DataFrame,
+    graph_features: pd.DataFrame,
+) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """
+    Behavioural, counterparty-graph and structuring features, plus the
+    structuring evidence transaction ids per customer.
+    """
+    features = engineer_features(customers, transactions)
+    features = features.merge(graph_features, on="customer_id", how="left")
+    structuring = detect_structuring_from_config(transactions)
+    features = features.merge(structuring[["customer_id", *STRUCTURING_COLUMNS]], on="customer_id", how="left")
+    features[STRUCTURING_COLUMNS] = features[STRUCTURING_COLUMNS].astype(float).fillna(0.0)
+    return features, structuring_evidence(structuring)
+
+
+def score_customers(
+    features: pd.DataFrame,
+    model: Any,
+    high_deviation_threshold: float,
+) -> Tuple[pd.Series, List[RuleResult]]:
+    """
+    Anomaly scores (indexed by customer_id) and rule results for ``features``,
+    using population-level model and threshold.
+    """
+    anomaly_scores = score_anomalies(model, features).set_axis(features["customer_id"])
+    return anomaly_scores, apply_rules(features, high_deviation_threshold)
+
+
+def shard_assignments(customer_ids: pd.Series, n_shards: int) -> np.ndarray:
+    """
+    Shard number per row from a stable 64-bit hash of customer_id, so the same
+    customer lands in the same shard in every process and every run.
+    """
+    codes, uniques = category_values(customer_ids)
+    hashes = pd.util.hash_array(np.asarray([str(u) for u in uniques], dtype=object))
+    shards = (hashes % np.uint64(n_shards)).astype(np.int32)
+    # Missing ids (code -1) go to shard 0.
+    return np.append(shards, 0)[codes]
+
+
+class LocalStages:
+    """
+    Runs the per-customer stages in the calling process.
+    """
+
+    def __enter__(self) -> "LocalStages":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def build_features(
+        self,
+        customers: pd.DataFrame,
+        transactions: pd.DataFrame,
+        graph_features: pd.DataFrame,
+    ) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+        return build_customer_features(customers, transactions, graph_features)
+
+    def score(
+        self,
+        features: pd.DataFrame,
+        model: Any,
+        high_deviation_threshold: float,
+    ) -> Tuple[pd.Series, List[RuleResult]]:
+        return score_customers(features, model, high_deviation_threshold)
+
+
+def _init_worker(cfg: AppConfig) -> None:
+    # Workers start from a fresh interpreter; give them the parent's configuration.
+    reload_config({f.name: getattr(cfg, f.name) for f in fields(cfg)})
+
+
+def _read_shard(spec: FrameSpec, shards_path: Path, shard: int) -> pd.DataFrame:
+    shards = np.load(shards_path, mmap_mode="r")
+    return read_frame(spec, np.flatnonzero(shards == shard))
+
+
+def _features_task(
+    shard: int,
+    inputs: Dict[str, Tuple[FrameSpec, Path]],
+    out_dir: Path,
+) -> Tuple[FrameSpec, Dict[str, List[str]]]:
+    customers, transactions, graph_features = (
+        _read_shard(*inputs[name], shard) for name in ("customers", "transactions", "graph_features")
+    )
+    features, evidence = build_customer_features(customers, transactions, graph_features)
+    return write_frame(features, out_dir / f"features-{shard}"), evidence
+
+
+def _score_task(
+    shard: int,
+    features: Tuple[FrameSpec, Path],
+    model: Any,
+    high_deviation_threshold: float,
+    out_dir: Path,
+) -> Tuple[FrameSpec, List[RuleResult]]:
+    shard_features = _read_shard(*features, shard)
+    anomaly_scores, results = score_customers(shard_features, model, high_deviation_threshold)
+    frame = pd.DataFrame({"anomaly_score": anomaly_scores.to_numpy()})
+    return write_frame(frame, out_dir / f"anomaly-{shard}"), results
+
+
+class ShardedStages:
+    """
+    Runs the per-customer stages (feature engineering, model scoring and rule
+    evaluation) on customer shards in a process pool.
+
+    Customers are partitioned by a hash of customer_id and each transaction
+    follows its customer. Inputs and outputs travel as memory-mapped column
+    files in a scratch directory; only small specs, the fitted model and rule
+    hits are pickled. Shard outputs are put back into input order before they
+    are returned, so results are identical to ``LocalStages``. Population-level
+    steps (model fit, clustering, quantile thresholds) stay with the caller.
+    """
+
+    def __init__(self, n_shards: int, max_workers: Optional[int] = None) -> None:
+        if n_shards < 2:
+            raise ValueError("ShardedStages needs at least two shards")
+        self.n_shards = n_shards
+        self.max_workers = max_workers or min(n_shards, os.cpu_count() or 1)
+        self._scratch: Optional[tempfile.TemporaryDirectory] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ShardedStages":
+        self._scratch = tempfile.TemporaryDirectory(prefix="securesar-shards-")
+        # Spawned workers avoid inheriting locks or OpenMP state from a forked parent.
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(get_config(),),
+        )
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._scratch is not None:
+            self._scratch.cleanup()
+            self._scratch = None
+
+    @property
+    def _dir(self) -> Path:
+        if self._scratch is None:
+            raise RuntimeError("ShardedStages must be used as a context manager")
+        return Path(self._scratch.name)
+
+    def _share(self, name: str, df: pd.DataFrame) -> Tuple[Tuple[FrameSpec, Path], np.ndarray]:
+        shards = shard_assignments(df["customer_id"], self.n_shards)
+        shards_path = self._dir / f"{name}.shards.npy"
+        np.save(shards_path, shards, allow_pickle=False)
+        return (write_frame(df, self._dir / name), shards_path), shards
+
+    def _gather(self, parts: List[pd.DataFrame], shards: np.ndarray, used: List[int]) -> pd.DataFrame:
+        # Rows come back grouped by shard; a stable sort on shard number gives the
+        # original position of each of them.
+        positions = np.concatenate([np.flatnonzero(shards == s) for s in used]) if used else np.empty(0, int)
+        merged = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        return merged.iloc[np.argsort(positions, kind="stable")].reset_index(drop=True)
+
+    def build_features(
+        self,
+        customers: pd.DataFrame,
+        transactions: pd.DataFrame,
+        graph_features: pd.DataFrame,
+    ) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+        assert self._pool is not None
+        customer_input, customer_shards = self._share("customers", customers)
+        inputs = {
+            "customers": customer_input,
+            "transactions": self._share("transactions", transactions)[0],
+            "graph_features": self._share("graph_features", graph_features)[0],
+        }
+        used = [s for s in range(self.n_shards) if (customer_shards == s).any()]
+        if not used:
+            return build_customer_features(customers, transactions, graph_features)
+        futures = [self._pool.submit(_features_task, s, inputs, self._dir) for s in used]
+
+        parts: List[pd.DataFrame] = []
+        evidence: Dict[str, List[str]] = {}
+        for future in futures:
+            spec, shard_evidence = future.result()
+            parts.append(read_frame(spec))
+            evidence.update(shard_evidence)
+        return self._gather(parts, customer_shards, used), evidence
+
+    def score(
+        self,
+        features: pd.DataFrame,
+        model: Any,
+        high_deviation_threshold: float,
+    ) -> Tuple[pd.Series, List[RuleResult]]:
+        assert self._pool is not None
+        feature_input, shards = self._share("features", features)
+        used = [s for s in range(self.n_shards) if (shards == s).any()]
+        if not used:
+            return score_customers(features, model, high_deviation_threshold)
+        futures = [
+            self._pool.submit(_score_task, s, feature_input, model, high_deviation_threshold, self._dir)
+            for s in used
+        ]
+
+        parts: List[pd.DataFrame] = []
+        shard_results: List[List[RuleResult]] = []
+        for future in futures:
+            spec, results = future.result()
+            parts.append(read_frame(spec))
+            shard_results.append(results)
+
+        scores = self._gather(parts, shards, used)["anomaly_score"].to_numpy()
+        anomaly_scores = pd.Series(scores, index=features["customer_id"], name="anomaly_score")
+
+        # Every shard evaluates the same rules in the same order; put each rule's
+        # hits back into feature order.
+        position = pd.Index(features["customer_id"])
+        results: List[RuleResult] = []
+        for per_rule in zip(*shard_results):
+            hits = [c for r in per_rule for c in r.triggered_customers]
+            order = np.argsort(position.get_indexer(hits), kind="stable")
+            results.append(
+                RuleResult(
+                    rule_id=per_rule[0].rule_id,
+                    description=per_rule[0].description,
+                    triggered_customers=[hits[i] for i in order],
+                )
+            )
+        return anomaly_scores, results
+
+
+def pipeline_stages(n_shards: Optional[int] = None) -> LocalStages | ShardedStages:
+    """
+    Stage runner for ``n_shards`` (default: ``pipeline.n_shards`` from config).
+    """
+    cfg = get_config().pipeline
+    n_shards = cfg.n_shards if n_shards is None else n_shards
+    if n_shards <= 1:
+        return LocalStages()
+    return ShardedStages(n_shards, cfg.max_workers)
+
+
+__all__ = [
+    "build_customer_features",
+    "score_customers",
+    "shard_assignments",
+    "LocalStages",
+    "ShardedStages",
+    "pipeline_stages",
+]
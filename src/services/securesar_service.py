@@ -1,35 +1,149 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Any
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional, Sequence, Set, Tuple
+import time
 
+import numpy as np
 import pandas as pd
 
+from src.data_engineering.alert_index import AlertIndex
+from src.data_engineering.feature_engineering import save_features
 from src.data_engineering.ingestion import load_raw_data
+from src.data_engineering.interning import CustomerDictionary, category_values, intern_transactions
 from src.data_engineering.validation import (
+    RejectionReport,
     validate_customers,
     validate_transactions,
     validate_alerts,
 )
-from src.data_engineering.feature_engineering import engineer_features
-from src.detection.rule_engine import apply_rules, rules_to_frame
-from src.detection.anomaly_detection import fit_isolation_forest
+from src.data_engineering.graph_features import compute_graph_features
+from src.data_engineering.peer_baselines import PeerBaselines, fit_peer_baselines
+from src.detection.rule_engine import deviation_threshold, rules_to_frame
+from src.detection.anomaly_detection import fit_anomaly_model
 from src.detection.clustering import embed_and_cluster
-from src.detection.typology_mapping import map_to_typologies
-from src.risk_scoring.risk_calculator import compute_risk_scores
+from src.detection.drift import Histogram, compare, histograms_from_frame, histograms_to_frame, run_histograms
+from src.detection.typology_mapping import high_anomaly_threshold, map_to_typologies
+from src.risk_scoring.backtest import outcome_labels, run_backtest
+from src.risk_scoring.risk_calculator import (
+    COMPONENT_COLUMNS,
+    RISK_BANDS,
+    RiskComponents,
+    ScoreCalibration,
+    compute_risk_scores,
+    fit_score_calibration,
+    load_score_weights,
+    save_risk_scores,
+    score_components,
+    validate_score_weights,
+)
 from src.explainability.audit_logger import AuditLogger, AuditEvent
+from src.services.case_snapshot import (
+    CaseSnapshot,
+    CaseSnapshotReader,
+    SnapshotUnavailableError,
+    publish_snapshot,
+    snapshot_table,
+)
+from src.services.live_scoring import LiveScore, LiveScorer
+from src.services.pipeline_stages import build_customer_features, pipeline_stages, score_customers
+from src.utils.artifacts import latest_run, list_runs, new_run_id, read_artifact, write_artifact
+from src.utils.config import get_config
+from src.utils.memory import MemoryReport
+from src.utils.metrics import PipelineProfile
 from src.llm.narrative_generator import NarrativeGenerator
+from src.llm.narrative_scheduler import NarrativeScheduler
 
 
 @dataclass
 class Case:
     id: str
     customer_id: str
-    risk_score: float
-    risk_band: str
+    row: int  # position in the service's component/score arrays
     typologies: List[str]
     triggered_rules: List[str]
     shap_values: Dict[str, float]
+    evidence_transaction_ids: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ScoreState:
+    """
+    Current risk scores and band codes for every case, aligned with RiskComponents.
+    Replaced as a whole on rescore so readers never see a half-updated state.
+    """
+
+    scores: np.ndarray
+    band_codes: np.ndarray
+    weights: Dict[str, float]
+
+
+@dataclass(frozen=True)
+class ScoringContext:
+    """
+    Population-level state from the last full run, reused by incremental runs so
+    that a subset of customers is scored consistently with everyone else.
+    """
+
+    anomaly_model: Any
+    deviation_threshold: float
+    anomaly_threshold: float
+    calibration: ScoreCalibration
+    clusters: pd.Series  # customer_id -> cluster label
+    alert_index: AlertIndex
+    graph_features: pd.DataFrame
+    peer_baselines: PeerBaselines
+
+
+def _lists_by_customer(df: pd.DataFrame, column: str) -> Dict[str, List[str]]:
+    """
+    customer_id -> values of ``column`` in row order, from one stable sort on
+    the customer codes instead of a Python-level groupby.
+    """
+    codes, customer_ids = category_values(df["customer_id"])
+    value_codes, values = category_values(df[column])
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else order
+    labels = values[value_codes[order]].tolist()
+    keys = [str(k) for k in customer_ids[sorted_codes[starts]].tolist()]
+    bounds = np.append(starts, len(order)).tolist()
+    return {key: labels[start:end] for key, start, end in zip(keys, bounds[:-1], bounds[1:])}
+
+
+def _narrative_evidence(case: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "case_id": case["id"],
+        "customer_id": case["customer_id"],
+        "risk_score": case["risk_score"],
+        "risk_band": case["risk_band"],
+        "typologies": case["typologies"],
+        "triggered_rules": case["triggered_rules"],
+        "evidence_transaction_ids": case["evidence_transaction_ids"],
+    }
+
+
+def _high_risk_rows(scores: np.ndarray, band_codes: np.ndarray, min_risk: float) -> np.ndarray:
+    return np.flatnonzero((scores >= min_risk) | (band_codes == RISK_BANDS.index("High")))
+
+
+def _filter_rows(
+    scores: np.ndarray,
+    band_codes: np.ndarray,
+    min_score: Optional[float],
+    max_score: Optional[float],
+    bands: Optional[Sequence[str]],
+) -> np.ndarray:
+    keep = np.ones(len(scores), dtype=bool)
+    if min_score is not None:
+        keep &= scores >= min_score
+    if max_score is not None:
+        keep &= scores <= max_score
+    if bands:
+        keep &= np.isin(band_codes, [RISK_BANDS.index(b) for b in bands])
+    return np.flatnonzero(keep)
 
 
 class SecureSarService:
@@ -38,137 +152,812 @@ class SecureSarService:
     and exposes case-centric helper methods for the FastAPI layer.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, snapshot_mode: Optional[str] = None) -> None:
         self._cases: Dict[str, Case] = {}
+        self._case_list: List[Case] = []
+        self._components: Optional[RiskComponents] = None
+        self._scoring: Optional[ScoreState] = None
+        self._alerts = pd.DataFrame(columns=["alert_id", "transaction_id", "customer_id"])
+        self._context: Optional[ScoringContext] = None
+        self._live: Optional[LiveScorer] = None
+        # (run_id, histograms) of the last and the first full run in this process.
+        self._histograms: Optional[Tuple[str, Dict[str, Histogram]]] = None
+        self._baseline_histograms: Optional[Tuple[str, Dict[str, Histogram]]] = None
+        self._drift: Optional[Dict[str, Any]] = None
         self._audit = AuditLogger()
         self._narrative = NarrativeGenerator()
+        llm = get_config().llm
+        self._drafts = NarrativeScheduler(
+            self._narrative,
+            self._draft_evidence,
+            rate_per_s=llm.bedrock_rate_per_s,
+            burst=llm.bedrock_burst,
+            max_concurrency=llm.bedrock_max_concurrency,
+            max_retries=llm.bedrock_max_retries,
+            backoff_s=llm.bedrock_backoff_s,
+        )
+        self._memory = MemoryReport()
+        self._profile = PipelineProfile()
+        self._run_id: Optional[str] = None
+        self._snapshot_seq = 0
+        # None: follow pipeline.snapshot_mode (only used when snapshot_dir is set).
+        self._snapshot_mode = snapshot_mode
+        self._reader: Optional[CaseSnapshotReader] = None
         self._pipeline_ran = False
 
-    def run_pipeline(self) -> None:
-        """
-        Run the full pipeline on the current raw data and cache case results.
-        """
+    def _load_inputs(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, CustomerDictionary]:
         customers, transactions, alerts = load_raw_data()
         customers = validate_customers(customers)
-        transactions = validate_transactions(transactions)
+        report = RejectionReport()
+        transactions = validate_transactions(transactions, report)
         alerts = validate_alerts(alerts)
+        report.write(get_config().data.processed_dir / "transaction_rejections.json")
+        dictionary = CustomerDictionary.build(customers["customer_id"], transactions["customer_id"])
+        return customers, intern_transactions(transactions, dictionary), alerts, dictionary
 
-        features = engineer_features(customers, transactions)
-        features_clustered, _ = embed_and_cluster(features)
-        _, anomaly_scores = fit_isolation_forest(features)
+    def run_pipeline(self, n_shards: Optional[int] = None) -> None:
+        """
+        Run the full pipeline on the current raw data and cache case results.
 
-        rule_results = apply_rules(features)
-        rules_df = rules_to_frame(rule_results)
+        With more than one shard (``n_shards`` or ``pipeline.n_shards`` in the
+        config) feature engineering, model scoring and rule evaluation run per
+        customer shard in a process pool; the results are identical.
+        """
+        run_id = new_run_id()
+        profile = PipelineProfile()
+        with profile.stage("load_inputs") as stage:
+            customers, transactions, alerts, dictionary = self._load_inputs()
+            stage.rows_out = len(transactions)
+        pipeline_cfg = get_config().pipeline
+        n_shards = pipeline_cfg.n_shards if n_shards is None else n_shards
+        memory = MemoryReport()
+        memory.record("transactions", transactions)
 
-        typology_records = map_to_typologies(rules_df, anomaly_scores)
-        risk_df, typology_df = compute_risk_scores(
-            features_clustered, rules_df, anomaly_scores, features_clustered, typology_records
+        with profile.stage("graph_features", rows_in=len(transactions)) as stage:
+            graph_features = compute_graph_features(customers, transactions, alerts["customer_id"])
+            stage.rows_out = len(graph_features)
+        with pipeline_stages(n_shards) as stages:
+            with profile.stage("build_features", rows_in=len(transactions)) as stage:
+                features, evidence = stages.build_features(customers, transactions, graph_features)
+                stage.rows_out = len(features)
+            with profile.stage("peer_baselines", rows_in=len(features)) as stage:
+                # Segment statistics need the whole population, so they are
+                # fitted here rather than per shard.
+                peer_baselines = fit_peer_baselines(features)
+                features = peer_baselines.apply(features)
+                stage.rows_out = len(peer_baselines.stats)
+            with profile.stage("embed_and_cluster", rows_in=len(features)) as stage:
+                features_clustered, _ = embed_and_cluster(features)
+                stage.rows_out = len(features_clustered)
+            with profile.stage("fit_anomaly_model", rows_in=len(features)):
+                model = fit_anomaly_model(features)
+                dev_threshold = deviation_threshold(features)
+            with profile.stage("score_and_rules", rows_in=len(features)) as stage:
+                anomaly_scores, rule_results = stages.score(features, model, dev_threshold)
+                rules_df = rules_to_frame(rule_results, dictionary)
+                stage.rows_out = len(rules_df)
+        memory.record("features", features_clustered)
+        memory.record("rules", rules_df)
+
+        with profile.stage("risk_scores", rows_in=len(features_clustered)) as stage:
+            anomaly_threshold = high_anomaly_threshold(anomaly_scores)
+            typology_records = map_to_typologies(rules_df, anomaly_scores, anomaly_threshold)
+            calibration = fit_score_calibration(rules_df, anomaly_scores, features_clustered)
+            risk_df, typology_df = compute_risk_scores(
+                features_clustered, rules_df, anomaly_scores, features_clustered, typology_records, calibration
+            )
+            stage.rows_out = len(risk_df)
+        memory.record("typologies", typology_df)
+        memory.record("risk_scores", risk_df)
+
+        with profile.stage("drift", rows_in=len(features)):
+            self._drift_stage(
+                run_id, features, anomaly_scores, features_clustered, pipeline_cfg.save_artifacts
+            )
+
+        with profile.stage("assemble_cases", rows_in=len(risk_df)) as stage:
+            cases = self._assemble_cases(risk_df, rules_df, typology_df, evidence, range(len(risk_df)))
+            stage.rows_out = len(cases)
+        if pipeline_cfg.save_artifacts:
+            with profile.stage("save_artifacts", rows_in=len(risk_df)):
+                self._save_run(run_id, features_clustered, risk_df, rules_df, typology_df, evidence, peer_baselines)
+
+        self._cases = cases
+        self._case_list = list(cases.values())
+        self._components = RiskComponents.from_frame(risk_df)
+        self._alerts = alerts
+        self._scoring = ScoreState(
+            scores=risk_df["risk_score"].to_numpy(dtype=np.float64),
+            band_codes=risk_df["risk_band"].cat.codes.to_numpy(dtype=np.int8),
+            weights=load_score_weights(),
         )
+        self._context = ScoringContext(
+            anomaly_model=model,
+            deviation_threshold=dev_threshold,
+            anomaly_threshold=anomaly_threshold,
+            calibration=calibration,
+            clusters=features_clustered.set_index(features_clustered["customer_id"].astype(str))["cluster"],
+            alert_index=AlertIndex(alerts),
+            graph_features=graph_features,
+            peer_baselines=peer_baselines,
+        )
+        self._live = LiveScorer(features, model, dev_threshold, calibration, self._context.clusters, peer_baselines)
+        self._memory = memory
+        self._profile = profile
+        self._run_id = run_id
+        self._snapshot_changed()
+        self._pipeline_ran = True
+        self._audit.log(
+            AuditEvent(
+                event_type="PIPELINE_RUN",
+                actor="system",
+                details={
+                    "run_id": run_id,
+                    "cases": len(cases),
+                    "shards": n_shards,
+                    "wall_s": round(profile.wall_s, 4),
+                    "stages": profile.to_dict(),
+                    "memory": memory.to_dict(),
+                },
+            )
+        )
+
+    @staticmethod
+    def _save_run(
+        run_id: str,
+        features: pd.DataFrame,
+        risk_df: pd.DataFrame,
+        rules_df: pd.DataFrame,
+        typology_df: pd.DataFrame,
+        evidence: Dict[str, List[str]],
+        peer_baselines: PeerBaselines,
+    ) -> None:
+        """
+        Persist a run's outputs as Parquet artifacts tagged with ``run_id``. Risk
+        scores are written last: ``load_run`` starts from them, so a run only
+        becomes the latest once everything it needs is on disk.
+        """
+        processed = get_config().data.processed_dir
+        evidence_df = pd.DataFrame(
+            {
+                "customer_id": [cust for cust, ids in evidence.items() for _ in ids],
+                "transaction_id": [tx for ids in evidence.values() for tx in ids],
+            },
+            dtype=object,
+        )
+        save_features(features, run_id=run_id)
+        write_artifact(rules_df, processed / "rules", run_id)
+        write_artifact(typology_df, processed / "typologies", run_id)
+        write_artifact(evidence_df, processed / "evidence", run_id)
+        write_artifact(peer_baselines.to_frame(), processed / "peer_baselines", run_id)
+        save_risk_scores(risk_df, run_id=run_id)
+
+    def load_run(self, run_id: Optional[str] = None) -> Optional[str]:
+        """
+        Serve the cases of a saved run (the latest by default) without rerunning
+        the pipeline. Returns the loaded run id, or None when there is no saved
+        run. Incremental runs start with a full run afterwards, since the fitted
+        models are not part of the artifacts.
+        """
+        processed = get_config().data.processed_dir
+        run_id = run_id or latest_run(processed / "risk_scores")
+        if run_id is None:
+            return None
+        risk_df = read_artifact(processed / "risk_scores", run_id)
+        rules_df = read_artifact(processed / "rules", run_id, columns=["customer_id", "rule_id"])
+        typology_df = read_artifact(processed / "typologies", run_id)
+        evidence_df = read_artifact(processed / "evidence", run_id)
+        evidence = {str(k): list(v) for k, v in evidence_df.groupby("customer_id", sort=False)["transaction_id"]}
+
+        cases = self._assemble_cases(risk_df, rules_df, typology_df, evidence, range(len(risk_df)))
+        self._cases = cases
+        self._case_list = list(cases.values())
+        self._components = RiskComponents.from_frame(risk_df)
+        self._scoring = ScoreState(
+            scores=risk_df["risk_score"].to_numpy(dtype=np.float64),
+            band_codes=risk_df["risk_band"].cat.codes.to_numpy(dtype=np.int8),
+            weights=load_score_weights(),
+        )
+        self._context = None
+        self._live = None
+        self._run_id = run_id
+        self._snapshot_changed()
+        self._pipeline_ran = True
+        self._audit.log(
+            AuditEvent(event_type="PIPELINE_RESUME", actor="system", details={"run_id": run_id, "cases": len(cases)})
+        )
+        return run_id
+
+    def _drift_stage(
+        self,
+        run_id: str,
+        features: pd.DataFrame,
+        anomaly_scores: pd.Series,
+        features_clustered: pd.DataFrame,
+        save: bool,
+    ) -> Dict[str, Any]:
+        """
+        Histogram this run's features, anomaly scores and cluster membership
+        and compare them with the previous run and the baseline run, using
+        only their stored histograms. The first run becomes the baseline.
+        Histograms past a PSI or KS threshold are audited as ``DRIFT_ALERT``.
+        """
+        cfg = get_config()
+        directory = cfg.data.processed_dir / "drift_histograms"
+        previous = self._histograms
+        if previous is None:
+            previous_id = latest_run(directory)
+            previous = self._stored_histograms(directory, previous_id)
+        baseline_id = cfg.drift.baseline_run or next(iter(list_runs(directory)), None)
+        baseline = self._stored_histograms(directory, baseline_id) or self._baseline_histograms
+
+        reference = (baseline or previous or (None, None))[1]
+        histograms = run_histograms(features, anomaly_scores, features_clustered, cfg.drift.histogram_bins, reference)
+        rows = compare(
+            histograms,
+            previous[1] if previous else None,
+            baseline[1] if baseline else None,
+            cfg.drift.psi_threshold,
+            cfg.drift.ks_threshold,
+        )
+        report = {
+            "run_id": run_id,
+            "previous_run_id": previous[0] if previous else None,
+            "baseline_run_id": baseline[0] if baseline else None,
+            "psi_threshold": cfg.drift.psi_threshold,
+            "ks_threshold": cfg.drift.ks_threshold,
+            "drifted": [row["name"] for row in rows if row["drifted"]],
+            "histograms": rows,
+        }
+        if save:
+            write_artifact(histograms_to_frame(histograms), directory, run_id)
+            write_artifact(self._drift_frame(report), cfg.data.processed_dir / "drift", run_id)
+        self._histograms = (run_id, histograms)
+        if self._baseline_histograms is None:
+            self._baseline_histograms = baseline or (run_id, histograms)
+        self._drift = report
+        if report["drifted"]:
+            self._audit.log(
+                AuditEvent(
+                    event_type="DRIFT_ALERT",
+                    actor="system",
+                    details={
+                        "run_id": run_id,
+                        "previous_run_id": report["previous_run_id"],
+                        "baseline_run_id": report["baseline_run_id"],
+                        "drifted": [row for row in rows if row["drifted"]],
+                    },
+                )
+            )
+        return report
+
+    @staticmethod
+    def _stored_histograms(directory: Path, run_id: Optional[str]) -> Optional[Tuple[str, Dict[str, Histogram]]]:
+        if run_id is None:
+            return None
+        try:
+            return run_id, histograms_from_frame(read_artifact(directory, run_id))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _drift_frame(report: Dict[str, Any]) -> pd.DataFrame:
+        rows = pd.DataFrame(report["histograms"])
+        for key in ("previous_run_id", "baseline_run_id", "psi_threshold", "ks_threshold"):
+            rows[key] = report[key]
+        return rows
+
+    def drift_report(self, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        PSI/KS drift of a full run (the latest by default) against the previous
+        run and the baseline, or None when no drift report exists for it.
+        """
+        drift = self._drift
+        if drift is not None and run_id in (None, drift["run_id"]):
+            return drift
+        directory = get_config().data.processed_dir / "drift"
+        try:
+            df = read_artifact(directory, run_id)
+        except FileNotFoundError:
+            return None
+        df = df.astype(object).where(df.notna(), None)
+        first = df.iloc[0] if len(df) else {}
+        rows = df[["name", "psi_previous", "ks_previous", "psi_baseline", "ks_baseline", "drifted"]]
+        histograms = [{**row, "drifted": bool(row["drifted"])} for row in rows.to_dict(orient="records")]
+        return {
+            "run_id": run_id or latest_run(directory),
+            "previous_run_id": first.get("previous_run_id"),
+            "baseline_run_id": first.get("baseline_run_id"),
+            "psi_threshold": first.get("psi_threshold", get_config().drift.psi_threshold),
+            "ks_threshold": first.get("ks_threshold", get_config().drift.ks_threshold),
+            "drifted": [h["name"] for h in histograms if h["drifted"]],
+            "histograms": histograms,
+        }
+
+    @staticmethod
+    def _assemble_cases(
+        risk_df: pd.DataFrame,
+        rules_df: pd.DataFrame,
+        typology_df: pd.DataFrame,
+        evidence: Dict[str, List[str]],
+        rows: Sequence[int],
+    ) -> Dict[str, Case]:
+        """
+        Build cases keyed by a simple case id (here we use customer_id); ``rows``
+        gives each case's position in the component/score arrays.
+        """
+        rules_by_customer = _lists_by_customer(rules_df, "rule_id")
+        typologies_by_customer = _lists_by_customer(typology_df, "typology")
 
-        # Build cases keyed by a simple case id (here we use customer_id).
         cases: Dict[str, Case] = {}
-        for _, row in risk_df.iterrows():
-            cust_id = str(row["customer_id"])
+        for pos, row in zip(rows, risk_df.itertuples(index=False)):
+            cust_id = str(row.customer_id)
             case_id = cust_id  # one case per customer for demo
 
-            cust_typologies = typology_df[typology_df["customer_id"] == cust_id]["typology"].tolist()
-            cust_rules = rules_df[rules_df["customer_id"] == cust_id]["rule_id"].tolist()
-
             # Simple "SHAP-like" contributions: treat components as feature attributions
             shap_values = {
-                "rule_component": float(row.get("rule_score", 0.0)),
-                "anomaly_component": float(row.get("anomaly_score", 0.0)),
-                "cluster_component": float(row.get("cluster_score", 0.0)),
+                "rule_component": float(row.rule_score),
+                "anomaly_component": float(row.anomaly_score),
+                "cluster_component": float(row.cluster_score),
             }
 
             cases[case_id] = Case(
                 id=case_id,
                 customer_id=cust_id,
-                risk_score=float(row["risk_score"]),
-                risk_band=str(row["risk_band"]),
-                typologies=cust_typologies,
-                triggered_rules=cust_rules,
+                row=pos,
+                typologies=typologies_by_customer.get(cust_id, []),
+                triggered_rules=rules_by_customer.get(cust_id, []),
                 shap_values=shap_values,
+                evidence_transaction_ids=evidence.get(cust_id, []),
             )
+        return cases
 
-        self._cases = cases
-        self._pipeline_ran = True
+    def run_incremental(self) -> Dict[str, Any]:
+        """
+        Alert-driven refresh: rerun features, rules, model scoring and case
+        assembly only for customers whose alerts are new, changed or removed
+        since the last run, and merge them into the current case snapshot.
+        Falls back to a full run when there is no previous run to build on.
+        """
+        self._require_own_run("run_incremental")
+        context = self._context
+        if not self._pipeline_ran or context is None:
+            self.run_pipeline()
+            return {"mode": "full", "alerts_changed": len(self._alerts), "customers_rescored": len(self._cases)}
+
+        customers, transactions, alerts, dictionary = self._load_inputs()
+        alert_index = AlertIndex(alerts)
+        delta = alert_index.diff(context.alert_index)
+
+        affected = set(delta.customer_ids)
+        if delta.transaction_ids:
+            tx_ids = transactions["transaction_id"].astype(str)
+            affected.update(transactions.loc[tx_ids.isin(delta.transaction_ids), "customer_id"].astype(str))
+        graph_features = context.graph_features
+        if affected:
+            # Network exposure depends on the whole graph, so it is rebuilt in full
+            # (sparse and linear in edges); customers whose exposure moved because a
+            # neighbour gained or lost an alert are rescored too.
+            graph_features = compute_graph_features(customers, transactions, alerts["customer_id"])
+            affected |= self._changed_customers(context.graph_features, graph_features)
+
+        sub_customers = customers[customers["customer_id"].astype(str).isin(affected)]
+        if not sub_customers.empty:
+            sub_transactions = transactions[transactions["customer_id"].astype(str).isin(affected)]
+            features, evidence = build_customer_features(sub_customers, sub_transactions, graph_features)
+            # Peers are compared with the last full run's segment baselines.
+            features = context.peer_baselines.apply(features)
+            self._merge_subset(features, evidence, context, dictionary)
+
+        self._context = replace(context, alert_index=alert_index, graph_features=graph_features)
+        self._alerts = alerts
+        summary = {
+            "mode": "incremental",
+            "alerts_changed": len(delta.alert_ids),
+            "customers_rescored": len(sub_customers),
+        }
         self._audit.log(
             AuditEvent(
                 event_type="PIPELINE_RUN",
                 actor="system",
-                details={"cases": len(cases)},
+                details={**summary, "cases": len(self._cases)},
             )
         )
+        return summary
 
-    def _ensure_pipeline(self) -> None:
+    @staticmethod
+    def _changed_customers(before: pd.DataFrame, after: pd.DataFrame) -> Set[str]:
+        merged = after.merge(before, on="customer_id", how="left", suffixes=("", "_prev"), indicator=True)
+        changed = (merged["_merge"] == "left_only").to_numpy()
+        for col in after.columns.drop("customer_id"):
+            changed |= ~np.isclose(merged[col].to_numpy(dtype=float), merged[f"{col}_prev"].to_numpy(dtype=float))
+        return set(merged.loc[changed, "customer_id"].astype(str))
+
+    def _merge_subset(
+        self,
+        features: pd.DataFrame,
+        evidence: Dict[str, List[str]],
+        context: ScoringContext,
+        dictionary: CustomerDictionary,
+    ) -> None:
+        anomaly_scores, rule_results = score_customers(features, context.anomaly_model, context.deviation_threshold)
+        rules_df = rules_to_frame(rule_results, dictionary)
+        typology_records = map_to_typologies(rules_df, anomaly_scores, context.anomaly_threshold)
+        # t-SNE cannot place new points, so keep each customer's last cluster;
+        # customers first seen here get no cluster component until the next full run.
+        cluster_df = features.assign(
+            cluster=features["customer_id"].astype(str).map(context.clusters).fillna(-1).astype(int)
+        )
+        risk_df, typology_df = compute_risk_scores(
+            features, rules_df, anomaly_scores, cluster_df, typology_records, context.calibration
+        )
+
+        components = self._components
+        state = self._scoring
+        assert components is not None and state is not None
+        rows: List[int] = []
+        new_ids: List[str] = []
+        for cust_id in risk_df["customer_id"].astype(str):
+            case = self._cases.get(cust_id)
+            if case is not None:
+                rows.append(case.row)
+            else:
+                rows.append(len(components) + len(new_ids))
+                new_ids.append(cust_id)
+
+        matrix = np.empty((len(components) + len(new_ids), len(COMPONENT_COLUMNS)), dtype=np.float64)
+        matrix[: len(components)] = components.matrix
+        matrix[rows] = risk_df[COMPONENT_COLUMNS].to_numpy(dtype=np.float64)
+        merged = RiskComponents(
+            customer_ids=np.concatenate([components.customer_ids, np.array(new_ids, dtype=object)]),
+            matrix=matrix,
+        )
+
+        updated = self._assemble_cases(risk_df, rules_df, typology_df, evidence, rows)
+        cases = {**self._cases, **updated}
+        case_list = list(self._case_list)
+        for case in sorted(updated.values(), key=lambda c: c.row):
+            if case.row < len(case_list):
+                case_list[case.row] = case
+            else:
+                case_list.append(case)
+        # Only the merged rows are scored; untouched cases keep their exact scores.
+        scores = np.empty(len(merged), dtype=np.float64)
+        codes = np.empty(len(merged), dtype=np.int8)
+        scores[: len(components)] = state.scores
+        codes[: len(components)] = state.band_codes
+        scores[rows], codes[rows] = score_components(matrix[rows], state.weights)
+
+        self._cases = cases
+        self._case_list = case_list
+        self._components = merged
+        self._scoring = ScoreState(scores=scores, band_codes=codes, weights=state.weights)
+        if self._live is not None:
+            self._live.refresh(features, context.clusters)
+        self._snapshot_changed()
+
+    def _snapshot_settings(self) -> Tuple[Optional[Path], str]:
+        cfg = get_config().pipeline
+        return cfg.snapshot_dir, self._snapshot_mode or cfg.snapshot_mode
+
+    def _attached(self) -> Optional[CaseSnapshot]:
+        """
+        The shared snapshot this worker serves from, or None when it serves its
+        own run. Raises SnapshotUnavailableError until the builder has published.
+        """
+        directory, mode = self._snapshot_settings()
+        if directory is None or mode != "attach":
+            return None
+        if self._reader is None or self._reader.directory != directory:
+            self._reader = CaseSnapshotReader(directory)
+        return self._reader.current()
+
+    def _require_own_run(self, action: str) -> None:
+        directory, mode = self._snapshot_settings()
+        if directory is not None and mode == "attach":
+            raise ValueError(f"{action} runs in the snapshot builder; this worker serves a shared snapshot")
+
+    def _snapshot_changed(self) -> None:
+        """
+        Record that cases or scores changed; a publishing builder writes the new
+        snapshot for attached workers and adopts its version number.
+        """
+        directory, mode = self._snapshot_settings()
+        if directory is None or mode != "publish":
+            self._snapshot_seq += 1
+        else:
+            state, components = self._scoring, self._components
+            assert state is not None and components is not None and self._run_id is not None
+            table = snapshot_table(self._case_list, state.scores, state.band_codes, components.matrix)
+            self._snapshot_seq = publish_snapshot(table, directory, self._run_id)
+        self._schedule_drafts()
+
+    def _schedule_drafts(self) -> None:
+        """
+        Queue narrative drafts for every case, highest risk score first. Cases
+        whose stored draft still matches their evidence are skipped by the workers.
+        A publishing builder does not draft: attached workers cannot read its drafts.
+        """
+        state = self._scoring
+        if state is None or not get_config().llm.pregenerate_narratives:
+            return
+        directory, mode = self._snapshot_settings()
+        if directory is not None and mode == "publish":
+            return
+        order = np.argsort(-state.scores, kind="stable")
+        self._drafts.schedule([self._case_list[pos].id for pos in order.tolist()])
+
+    def narrative_version(self, case_id: str) -> int:
+        """
+        Changes whenever a narrative draft is stored for ``case_id``.
+        """
+        return self._drafts.draft_version(case_id)
+
+    @property
+    def snapshot_version(self) -> Optional[str]:
+        """
+        Identifier of the case data currently served, or None before the first
+        run. It changes whenever cases or scores change (pipeline run, resume,
+        incremental merge, rescore), so the API uses it as the ETag. Attached
+        workers report the shared snapshot's version, so they all agree.
+        """
+        try:
+            snapshot = self._attached()
+        except SnapshotUnavailableError:
+            return None
+        if snapshot is not None:
+            return snapshot.tag
         if not self._pipeline_ran:
-            self.run_pipeline()
+            return None
+        return f"{self._run_id}.{self._snapshot_seq}"
+
+    def _ensure_pipeline(self) -> None:
+        if self._pipeline_ran or self._attached() is not None:
+            return
+        if get_config().pipeline.resume_from_artifacts and self.load_run() is not None:
+            return
+        self.run_pipeline()
+
+    def _score_of(self, case: Case) -> Tuple[float, str]:
+        state = self._scoring
+        assert state is not None
+        return float(state.scores[case.row]), RISK_BANDS[state.band_codes[case.row]]
 
     def list_high_risk_cases(self, min_risk: float = 0.8) -> List[Dict[str, Any]]:
         """
         Return a list of high-risk cases for the UI.
         """
+        snapshot = self._attached()
+        if snapshot is not None:
+            return snapshot.summaries(_high_risk_rows(snapshot.scores, snapshot.band_codes, min_risk))
         self._ensure_pipeline()
+        state = self._scoring
+        assert state is not None
+        rows = _high_risk_rows(state.scores, state.band_codes, min_risk)
         out: List[Dict[str, Any]] = []
-        for case in self._cases.values():
-            if case.risk_score >= min_risk or case.risk_band == "High":
-                out.append(
-                    {
-                        "id": case.id,
-                        "customer_id": case.customer_id,
-                        "risk_score": case.risk_score,
-                        "risk_band": case.risk_band,
-                    }
-                )
+        for pos in rows:
+            case = self._case_list[pos]
+            out.append(
+                {
+                    "id": case.id,
+                    "customer_id": case.customer_id,
+                    "risk_score": float(state.scores[pos]),
+                    "risk_band": RISK_BANDS[state.band_codes[pos]],
+                }
+            )
         return out
 
     def get_case(self, case_id: str) -> Dict[str, Any] | None:
         """
         Retrieve a single case with risk explanation.
         """
+        snapshot = self._attached()
+        if snapshot is not None:
+            return snapshot.get_case(case_id)
         self._ensure_pipeline()
         case = self._cases.get(case_id)
         if not case:
             return None
+        record = self._case_record(case)
+        if get_config().llm.pregenerate_narratives:
+            # Not drafted yet: the case moves to the front of the draft queue.
+            record["narrative"] = self._drafts.draft(case.id, _narrative_evidence(record))
+        return record
+
+    def _case_record(self, case: Case) -> Dict[str, Any]:
+        risk_score, risk_band = self._score_of(case)
         return {
             "id": case.id,
             "customer_id": case.customer_id,
-            "risk_score": case.risk_score,
-            "risk_band": case.risk_band,
+            "risk_score": risk_score,
+            "risk_band": risk_band,
             "typologies": case.typologies,
             "triggered_rules": case.triggered_rules,
             "shap_values": case.shap_values,
+            "evidence_transaction_ids": case.evidence_transaction_ids,
         }
 
+    def _draft_evidence(self, case_id: str) -> Optional[Dict[str, Any]]:
+        case = self._cases.get(case_id)
+        return _narrative_evidence(self._case_record(case)) if case is not None else None
+
+    def export_cases(
+        self,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        bands: Optional[Sequence[str]] = None,
+        typology: Optional[str] = None,
+        rule: Optional[str] = None,
+        batch_size: int = 5_000,
+        actor: str = "system",
+    ) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Every case matching the filters with its scores, risk components, rules
+        and typologies, as column-oriented batches of at most ``batch_size``
+        cases. Score and band filters are applied to the score arrays up front;
+        typology/rule filters per batch. The snapshot is taken when this is
+        called, so a concurrent rescore or run does not mix into the export.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        unknown = sorted(set(bands or ()) - set(RISK_BANDS))
+        if unknown:
+            raise ValueError(f"unknown risk bands {unknown}; expected {RISK_BANDS}")
+        snapshot = self._attached()
+        if snapshot is not None:
+            rows = _filter_rows(snapshot.scores, snapshot.band_codes, min_score, max_score, bands)
+        else:
+            self._ensure_pipeline()
+            state, case_list, components = self._scoring, self._case_list, self._components
+            assert state is not None and components is not None
+            rows = _filter_rows(state.scores, state.band_codes, min_score, max_score, bands)
+        filters = {
+            "min_score": min_score,
+            "max_score": max_score,
+            "bands": list(bands or []),
+            "typology": typology,
+            "rule": rule,
+        }
+        self._audit.log(
+            AuditEvent(event_type="CASE_EXPORT", actor=actor, details={"filters": filters, "candidates": len(rows)})
+        )
+        if snapshot is not None:
+            return snapshot.batches(rows, typology, rule, batch_size)
+        return self._export_batches(state, case_list, components, rows, typology, rule, batch_size)
+
+    @staticmethod
+    def _export_batches(
+        state: ScoreState,
+        case_list: List[Case],
+        components: RiskComponents,
+        rows: np.ndarray,
+        typology: Optional[str],
+        rule: Optional[str],
+        batch_size: int,
+    ) -> Iterator[Dict[str, List[Any]]]:
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start : start + batch_size]
+            if typology is not None or rule is not None:
+                chunk = np.array(
+                    [
+                        pos
+                        for pos in chunk.tolist()
+                        if (typology is None or typology in case_list[pos].typologies)
+                        and (rule is None or rule in case_list[pos].triggered_rules)
+                    ],
+                    dtype=np.int64,
+                )
+                if not len(chunk):
+                    continue
+            cases = [case_list[pos] for pos in chunk.tolist()]
+            batch: Dict[str, List[Any]] = {
+                "id": [c.id for c in cases],
+                "customer_id": [c.customer_id for c in cases],
+                "risk_score": state.scores[chunk].tolist(),
+                "risk_band": [RISK_BANDS[code] for code in state.band_codes[chunk].tolist()],
+            }
+            matrix = components.matrix[chunk]
+            for pos, column in enumerate(COMPONENT_COLUMNS):
+                batch[column] = matrix[:, pos].tolist()
+            batch["typologies"] = [c.typologies for c in cases]
+            batch["triggered_rules"] = [c.triggered_rules for c in cases]
+            batch["evidence_transaction_ids"] = [c.evidence_transaction_ids for c in cases]
+            yield batch
+
     def generate_narrative(self, case_id: str, actor: str) -> str | None:
         """
         Generate a SAR narrative for the given case, log the action, and return the text.
+        A stored draft (or one being written) is reused rather than generated again.
         """
-        self._ensure_pipeline()
-        case = self._cases.get(case_id)
-        if not case:
-            return None
-
-        evidence = {
-            "case_id": case.id,
-            "customer_id": case.customer_id,
-            "risk_score": case.risk_score,
-            "risk_band": case.risk_band,
-            "typologies": case.typologies,
-            "triggered_rules": case.triggered_rules,
-        }
-        narrative = self._narrative.generate(evidence)
+        snapshot = self._attached()
+        if snapshot is not None:
+            record = snapshot.get_case(case_id)
+            if not record:
+                return None
+            narrative, drafted = self._narrative.generate(_narrative_evidence(record)), False
+        else:
+            self._ensure_pipeline()
+            case = self._cases.get(case_id)
+            if not case:
+                return None
+            narrative, drafted = self._drafts.narrative(case.id, _narrative_evidence(self._case_record(case)))
 
         self._audit.log(
             AuditEvent(
                 event_type="GENERATE_NARRATIVE",
                 actor=actor,
-                details={"case_id": case.id},
+                details={"case_id": case_id, "drafted": drafted},
             )
         )
         return narrative
 
+    def rescore(self, overrides: Optional[Dict[str, float]] = None, actor: str = "system") -> Dict[str, Any]:
+        """
+        Re-apply risk weights and band cut-points to the cached component matrix
+        without rerunning detection. Weights not given in ``overrides`` are taken
+        from the current score_weights.yaml.
+        """
+        self._require_own_run("rescore")
+        self._ensure_pipeline()
+        components = self._components
+        assert components is not None
+
+        weights = load_score_weights()
+        weights.update({k: float(v) for k, v in (overrides or {}).items() if v is not None})
+        validate_score_weights(weights)
+
+        started = time.perf_counter()
+        scores, codes = score_components(components.matrix, weights)
+        self._scoring = ScoreState(scores=scores, band_codes=codes, weights=weights)
+        self._snapshot_changed()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        band_counts = np.bincount(codes, minlength=len(RISK_BANDS))
+        summary = {
+            "cases": len(components),
+            "weights": weights,
+            "band_counts": {band: int(n) for band, n in zip(RISK_BANDS, band_counts)},
+            "elapsed_ms": elapsed_ms,
+        }
+        self._audit.log(AuditEvent(event_type="RISK_RESCORE", actor=actor, details=summary))
+        return summary
+
+    def score_transaction(
+        self,
+        transaction_id: str,
+        customer_id: str,
+        amount: float,
+        timestamp: Optional[pd.Timestamp] = None,
+        direction: Optional[str] = None,
+    ) -> Optional[LiveScore]:
+        """
+        Score one incoming transaction in real time: update its customer's live
+        aggregates and velocity window, evaluate the rules for that customer and
+        combine the components with the current weights. Cases are not changed;
+        the next batch run picks the transaction up from the raw data. Returns
+        None for customers not in the last run.
+        """
+        self._require_own_run("score_transaction")
+        self._ensure_pipeline()
+        live, state = self._live, self._scoring
+        if live is None:
+            raise ValueError("live scoring needs the models of a full pipeline run; this run was resumed from artifacts")
+        assert state is not None
+        when = pd.Timestamp.now() if timestamp is None else pd.Timestamp(timestamp)
+        return live.score_transaction(transaction_id, customer_id, float(amount), when, direction, state.weights)
+
+    def backtest(self, configs: pd.DataFrame, outcome_column: str | None = None) -> pd.DataFrame:
+        """
+        Evaluate candidate weight/cut-point configurations against the cached
+        component matrix, using the last run's alerts as labelled outcomes.
+        """
+        self._require_own_run("backtest")
+        self._ensure_pipeline()
+        components = self._components
+        assert components is not None
+        labels = outcome_labels(components.customer_ids, self._alerts, outcome_column)
+        return run_backtest(components, configs, labels)
+
     def get_audit_log_for_case(self, case_id: str) -> List[Dict[str, Any]]:
         """
         Return audit events for a specific case by filtering the JSONL log.
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.helpers import ensure_dir
+
+
+# Schema metadata key holding the run id, creation time and categorical dtypes.
+METADATA_KEY = b"securesar"
+LATEST_FILE = "_LATEST"  # names starting with "_" are skipped by dataset discovery
+ROWS_PER_GROUP = 65_536
+# Categories are restored from metadata only for low-cardinality columns (risk
+# bands, rule ids); id columns come back with the categories present in the data.
+MAX_STORED_CATEGORIES = 1_024
+
+
+def new_run_id() -> str:
+    """
+    Identifier for one pipeline run, sortable by creation time.
+    """
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def _run_dir(directory: Path, run_id: str) -> Path:
+    return directory / f"run_id={run_id}"
+
+
+def write_artifact(
+    df: pd.DataFrame,
+    directory: Path,
+    run_id: str,
+) -> Path:
+    """
+    Write ``df`` as Parquet under ``directory/run_id=<run_id>/`` (one
+    hive-style partition per run) and mark the run as the latest.
+
+    Rows keep their order. Every file carries schema metadata with the run id
+    and the categorical dtypes (categories and order) so readers get the same
+    dtypes back. Row groups are bounded so filters can skip them by their
+    column statistics.
+    """
+    categories = {
+        str(col): {"categories": df[col].cat.categories.tolist(), "ordered": bool(df[col].cat.ordered)}
+        for col in df.columns
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and len(df[col].cat.categories) <= MAX_STORED_CATEGORIES
+    }
+    info = {
+        "run_id": run_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "rows": len(df),
+        "columns": [str(c) for c in df.columns],
+        "categories": categories,
+    }
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(info)})
+
+    out_dir = _run_dir(directory, run_id)
+    ensure_dir(out_dir)
+    pq.write_table(table, out_dir / "part-0.parquet", row_group_size=ROWS_PER_GROUP)
+    # Publish the run only once all of its files exist.
+    tmp = directory / f"{LATEST_FILE}.{uuid.uuid4().hex}"
+    tmp.write_text(run_id, encoding="utf-8")
+    os.replace(tmp, directory / LATEST_FILE)
+    return out_dir
+
+
+def list_runs(directory: Path) -> List[str]:
+    """
+    Run ids with an artifact under ``directory``, oldest first.
+    """
+    if not directory.exists():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in directory.glob("run_id=*") if p.is_dir())
+
+
+def latest_run(directory: Path) -> Optional[str]:
+    latest = directory / LATEST_FILE
+    if latest.exists():
+        return latest.read_text(encoding="utf-8").strip()
+    runs = list_runs(directory)
+    return runs[-1] if runs else None
+
+
+def _resolve(directory: Path, run_id: Optional[str]) -> Path:
+    run_id = run_id or latest_run(directory)
+    if run_id is None or not _run_dir(directory, run_id).exists():
+        raise FileNotFoundError(f"no artifact run {run_id or '(latest)'} under {directory}")
+    return _run_dir(directory, run_id)
+
+
+def _first_file(run_dir: Path) -> Path:
+    return next(iter(sorted(run_dir.glob("*.parquet"))))
+
+
+def artifact_metadata(directory: Path, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Metadata stored with an artifact (run id, creation time, row count, ...),
+    read from a file footer without loading any data.
+    """
+    schema = pq.read_schema(_first_file(_resolve(directory, run_id)))
+    return json.loads((schema.metadata or {}).get(METADATA_KEY, b"{}"))
+
+
+def read_artifact(
+    directory: Path,
+    run_id: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[List[tuple]] = None,
+) -> pd.DataFrame:
+    """
+    Load an artifact written by ``write_artifact`` (the latest run by default).
+
+    Files are memory-mapped, only ``columns`` are decoded, and ``filters``
+    (pyarrow DNF, e.g. ``[("risk_score", ">=", 0.8)]``) are applied while
+    scanning, skipping row groups whose statistics rule them out, so narrow
+    reads stay cheap.
+    """
+    run_dir = _resolve(directory, run_id)
+    info = artifact_metadata(directory, run_dir.name.split("=", 1)[1])
+    table = pq.read_table(
+        run_dir,
+        columns=list(columns) if columns is not None else None,
+        filters=filters,
+        memory_map=True,
+    )
+    df = table.to_pandas()
+    for col, spec in info.get("categories", {}).items():
+        if col in df.columns:
+            dtype = pd.CategoricalDtype(spec["categories"], ordered=spec["ordered"])
+            df[col] = df[col].astype(object).astype(dtype)
+    return df
+
+
+__all__ = [
+    "METADATA_KEY",
+    "new_run_id",
+    "write_artifact",
+    "read_artifact",
+    "artifact_metadata",
+    "list_runs",
+    "latest_run",
+]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+import threading
+import time
+
+from src.utils.config import bump_config_version
+from src.utils.helpers import logger
+
+
+T = TypeVar("T")
+
+Signature = Optional[Tuple[int, int]]
+
+
+def _file_signature(path: Path) -> Signature:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class WatchedFile(Generic[T]):
+    """
+    Parsed view of a config file that is reloaded when the file changes on disk.
+
+    ``get`` is cheap: it returns the cached value and only stats the file once
+    per ``poll_interval``. A reload that fails to parse keeps the previous value.
+    """
+
+    def __init__(self, path: Path, loader: Callable[[Path], T], poll_interval: float = 1.0) -> None:
+        self.path = path
+        self._loader = loader
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._signature = _file_signature(path)
+        self._value: T = loader(path)
+        self._checked_at = time.monotonic()
+
+    def get(self) -> T:
+        if time.monotonic() - self._checked_at >= self.poll_interval:
+            self.refresh()
+        return self._value
+
+    def refresh(self) -> bool:
+        """
+        Reload the file if its mtime/size changed. Returns True when a new value was swapped in.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = _file_signature(self.path)
+            if signature == self._signature:
+                return False
+            try:
+                value = self._loader(self.path)
+            except Exception:
+                logger.exception("Failed to reload %s; keeping previous values", self.path)
+                return False
+            self._value = value
+            self._signature = signature
+        bump_config_version()
+        logger.info("Reloaded config file %s", self.path)
+        return True
+
+
+_registry: Dict[Tuple[Path, Callable[[Path], object]], WatchedFile] = {}
+_registry_lock = threading.Lock()
+
+
+def watch_file(path: Path, loader: Callable[[Path], T]) -> WatchedFile[T]:
+    """
+    Return the shared WatchedFile for ``path`` parsed with ``loader``, creating it on first use.
+    """
+    key = (Path(path).resolve(), loader)
+    watched = _registry.get(key)
+    if watched is None:
+        with _registry_lock:
+            watched = _registry.get(key)
+            if watched is None:
+                watched = WatchedFile(key[0], loader)
+                _registry[key] = watched
+    return watched
+
+
+def refresh_watched_files() -> int:
+    """
+    Check every watched file once. Returns the number of files reloaded.
+    """
+    return sum(w.refresh() for w in list(_registry.values()))
+
+
+__all__ = ["WatchedFile", "watch_file", "refresh_watched_files"]
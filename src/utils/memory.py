@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+import resource
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """
+    Deep memory footprint of a frame, including Python string objects.
+    """
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def uninterned_nbytes(df: pd.DataFrame) -> int:
+    """
+    Estimated footprint of the same frame with categoricals stored as object
+    columns (a pointer plus one string per row) and float32 as float64, i.e.
+    what it would cost without interning and downcasting.
+    """
+    total = int(df.index.memory_usage(deep=True))
+    for name in df.columns:
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            sizes = np.array([sys.getsizeof(c) for c in col.cat.categories], dtype=np.int64)
+            codes = col.cat.codes.to_numpy()
+            per_category = np.bincount(codes[codes >= 0], minlength=len(sizes))
+            total += 8 * len(col) + int(per_category @ sizes) + 16 * int((codes < 0).sum())
+        elif col.dtype == np.float32:
+            total += 8 * len(col)
+        else:
+            total += int(col.memory_usage(deep=True, index=False))
+    return total
+
+
+_STATUS = Path("/proc/self/status")
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process: since the last ``reset_peak_rss``
+    on Linux (VmHWM), since start elsewhere (ru_maxrss, KiB on Linux, bytes on
+    macOS).
+    """
+    try:
+        for line in _STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the kernel's RSS high-water mark to the current RSS so the next
+    ``peak_rss_bytes`` covers only what happens from here (Linux only).
+    Returns False where that is not supported.
+    """
+    try:
+        _CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    rows: int
+    nbytes: int
+    uninterned_nbytes: int
+    peak_rss_bytes: int
+
+    @property
+    def reduction(self) -> float:
+        """
+        How many times smaller the stage output is than without interning.
+        """
+        return self.uninterned_nbytes / self.nbytes if self.nbytes else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "bytes": self.nbytes,
+            "uninterned_bytes": self.uninterned_nbytes,
+            "reduction": round(self.reduction, 2),
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
+
+
+@dataclass
+class MemoryReport:
+    """
+    Per-stage output footprint against its uninterned equivalent, plus the
+    peak RSS reading when the stage finished.
+    """
+
+    stages: List[StageMemory] = field(default_factory=list)
+
+    def record(self, stage: str, df: pd.DataFrame) -> StageMemory:
+        entry = StageMemory(
+            stage=stage,
+            rows=len(df),
+            nbytes=frame_nbytes(df),
+            uninterned_nbytes=uninterned_nbytes(df),
+            peak_rss_bytes=peak_rss_bytes(),
+        )
+        self.stages.append(entry)
+        return entry
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {s.stage: s.to_dict() for s in self.stages}
+
+
+__all__ = [
+    "frame_nbytes",
+    "uninterned_nbytes",
+    "peak_rss_bytes",
+    "reset_peak_rss",
+    "StageMemory",
+    "MemoryReport",
+]
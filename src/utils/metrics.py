@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+from src.utils.memory import peak_rss_bytes, reset_peak_rss
+
+
+# Seconds; covers sub-millisecond API routes up to multi-minute pipeline stages.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {sorted(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Gauge(_Metric):
+    """
+    Last value per label set.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: Any) -> Optional[float]:
+        return self._values.get(self._key(labels))
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram per label set. ``observe`` is one bisect and a
+    few integer updates under a lock, so it is cheap enough for every request.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last slot is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[slot] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), t[0])) for k, (c, t) in self._series.items())
+        lines: List[str] = []
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                running += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"metric {metric.name} already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "securesar_http_request_duration_seconds", "API request latency by route.", ["method", "route", "status"]
+)
+NARRATIVE_SECONDS = REGISTRY.histogram(
+    "securesar_narrative_duration_seconds", "SAR narrative generation latency.", ["provider", "outcome"]
+)
+NARRATIVE_QUEUE_DEPTH = REGISTRY.gauge(
+    "securesar_narrative_queue_depth", "Cases waiting for a pre-generated narrative draft."
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "securesar_pipeline_stage_duration_seconds", "Pipeline stage wall time.", ["stage"]
+)
+STAGE_CPU_SECONDS = REGISTRY.gauge(
+    "securesar_pipeline_stage_cpu_seconds", "CPU time of the stage in the last pipeline run.", ["stage"]
+)
+STAGE_PEAK_RSS = REGISTRY.gauge(
+    "securesar_pipeline_stage_peak_rss_bytes", "Peak resident memory during the stage in the last run.", ["stage"]
+)
+STAGE_ROWS = REGISTRY.gauge(
+    "securesar_pipeline_stage_rows", "Rows into and out of the stage in the last run.", ["stage", "direction"]
+)
+
+
+@dataclass
+class StageStats:
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_rss_bytes: int = 0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+        }
+
+
+@dataclass
+class PipelineProfile:
+    """
+    Wall time, CPU time, peak RSS and row counts per pipeline stage.
+
+    Each stage costs a few clock reads, a reset and a read of the kernel's RSS
+    high-water mark, so it is meant to stay on. CPU time is this process only: work done in shard worker
+    processes shows up as wall time. Finished stages are also published to
+    the ``REGISTRY`` metrics.
+    """
+
+    stages: List[StageStats] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageStats]:
+        stats = StageStats(stage=name, rows_in=rows_in)
+        reset_peak_rss()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_s = time.perf_counter() - wall
+            stats.cpu_s = time.process_time() - cpu
+            # Where the high-water mark cannot be reset this is the process peak so far.
+            stats.peak_rss_bytes = peak_rss_bytes()
+            self.stages.append(stats)
+            _publish(stats)
+
+    @property
+    def wall_s(self) -> float:
+        return sum(s.wall_s for s in self.stages)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {s.stage: s.to_dict() for s in self.stages}
+
+
+def _publish(stats: StageStats) -> None:
+    STAGE_SECONDS.observe(stats.wall_s, stage=stats.stage)
+    STAGE_CPU_SECONDS.set(stats.cpu_s, stage=stats.stage)
+    STAGE_PEAK_RSS.set(stats.peak_rss_bytes, stage=stats.stage)
+    for direction, rows in (("in", stats.rows_in), ("out", stats.rows_out)):
+        if rows is not None:
+            STAGE_ROWS.set(rows, stage=stats.stage, direction=direction)
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "REGISTRY",
+    "PROMETHEUS_CONTENT_TYPE",
+    "HTTP_REQUEST_SECONDS",
+    "NARRATIVE_SECONDS",
+    "NARRATIVE_QUEUE_DEPTH",
+    "StageStats",
+    "PipelineProfile",
+]
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FrameSpec:
+    """
+    On-disk layout of a DataFrame written by ``write_frame``: one ``.npy`` file
+    per column (object and categorical columns as int32 codes plus a
+    categories file). Small and cheap to pickle, so it can be handed to another
+    process in place of the frame itself.
+    """
+
+    directory: Path
+    columns: Tuple[str, ...]
+    kinds: Tuple[str, ...]  # "array", "object" or "category" per column
+    n_rows: int
+
+
+def _column_paths(directory: Path, position: int) -> Tuple[Path, Path]:
+    return directory / f"col{position}.npy", directory / f"col{position}.categories.npy"
+
+
+def write_frame(df: pd.DataFrame, directory: Path) -> FrameSpec:
+    """
+    Write ``df`` column by column as ``.npy`` files under ``directory``.
+
+    Numeric, boolean and datetime columns are stored as-is; object and
+    categorical columns are factorized so that readers get fixed-width buffers
+    they can memory-map, with missing values kept as code -1.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    kinds: List[str] = []
+    for pos, name in enumerate(df.columns):
+        col = df[name]
+        values_path, categories_path = _column_paths(directory, pos)
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            codes = col.cat.codes.to_numpy(dtype=np.int32)
+            categories = col.cat.categories.to_numpy()
+            kinds.append("category")
+        elif col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            codes, categories = pd.factorize(col)
+            codes = codes.astype(np.int32)
+            kinds.append("object")
+        else:
+            np.save(values_path, col.to_numpy(), allow_pickle=False)
+            kinds.append("array")
+            continue
+        np.save(values_path, codes, allow_pickle=False)
+        np.save(categories_path, np.asarray(categories).astype(str), allow_pickle=False)
+    return FrameSpec(directory=directory, columns=tuple(map(str, df.columns)), kinds=tuple(kinds), n_rows=len(df))
+
+
+def read_frame(spec: FrameSpec, rows: np.ndarray | None = None) -> pd.DataFrame:
+    """
+    Rebuild a frame from ``spec``, memory-mapping every column and copying
+    only the selected ``rows`` (all rows when None).
+    """
+    data: Dict[str, object] = {}
+    for pos, (name, kind) in enumerate(zip(spec.columns, spec.kinds)):
+        values_path, categories_path = _column_paths(spec.directory, pos)
+        values = np.load(values_path, mmap_mode="r")
+        values = np.array(values if rows is None else values[rows])
+        if kind == "array":
+            data[name] = values
+            continue
+        categories = np.load(categories_path).astype(object)
+        if kind == "category":
+            data[name] = pd.Categorical.from_codes(values, categories=categories)
+        else:
+            decoded = np.empty(len(values), dtype=object)
+            decoded[:] = None
+            valid = values >= 0
+            decoded[valid] = categories[values[valid]]
+            decoded[~valid] = np.nan
+            data[name] = decoded
+    return pd.DataFrame(data, columns=list(spec.columns))
+
+
+def read_column(spec: FrameSpec, name: str) -> np.ndarray:
+    """
+    Memory-mapped view of one plain (numeric/datetime/bool) column.
+    """
+    pos = spec.columns.index(name)
+    if spec.kinds[pos] != "array":
+        raise ValueError(f"column {name!r} is stored as codes; use read_frame")
+    return np.load(_column_paths(spec.directory, pos)[0], mmap_mode="r")
+
+
+__all__ = ["FrameSpec", "write_frame", "read_frame", "read_column"]
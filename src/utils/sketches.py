@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+import math
+
+import numpy as np
+
+
+def _finite(values: Iterable[float] | np.ndarray) -> np.ndarray:
+    arr = np.asarray(values, dtype=np.float64).ravel()
+    return arr[~np.isnan(arr)]
+
+
+@dataclass
+class MinMax:
+    """
+    Running count/min/max. Exact and mergeable in any order.
+    """
+
+    count: int = 0
+    min: float = math.inf
+    max: float = -math.inf
+
+    @classmethod
+    def from_values(cls, values: Iterable[float] | np.ndarray) -> "MinMax":
+        out = cls()
+        out.update(values)
+        return out
+
+    def update(self, values: Iterable[float] | np.ndarray) -> "MinMax":
+        arr = _finite(values)
+        if len(arr):
+            self.count += len(arr)
+            self.min = min(self.min, float(arr.min()))
+            self.max = max(self.max, float(arr.max()))
+        return self
+
+    def merge(self, other: "MinMax") -> "MinMax":
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def bounds(self, default: float = 0.0) -> tuple[float, float]:
+        """
+        (min, max), or (default, default) when nothing has been seen.
+        """
+        return (self.min, self.max) if self.count else (default, default)
+
+
+@dataclass
+class QuantileSketch:
+    """
+    Mergeable quantile summary: exact while small, a KLL sketch once large.
+
+    Up to ``exact_limit`` values are kept as-is and ``quantile`` matches
+    ``pandas.Series.quantile`` (linear interpolation) exactly. Past that the
+    values are compacted into a KLL sketch with parameter ``k``: each level holds
+    items of weight 2**level, and a full level is sorted and every other item
+    (random offset) is promoted to the next level. Memory stays at roughly
+    ``3 * k`` floats regardless of how many values were added.
+
+    Error bound (KLL mode): the returned value's rank differs from the requested
+    rank ``q * count`` by at most about ``2.5 / k * count`` with 99% probability,
+    e.g. +/-0.125% of the population for the default ``k=2000``, independent of
+    the order in which chunks were added or sketches merged. ``rank_error()``
+    reports the bound that applies to the current state (0 while exact).
+    NaNs are ignored, as in pandas.
+    """
+
+    k: int = 2_000
+    exact_limit: int = 1_000_000
+    seed: int = 0
+    count: int = 0
+    _levels: List[np.ndarray] = field(default_factory=list, repr=False)
+    _exact: bool = True
+    _rng: Optional[np.random.Generator] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.k < 8:
+            raise ValueError("QuantileSketch k must be at least 8")
+        if not self._levels:
+            self._levels = [np.empty(0, dtype=np.float64)]
+        if self._rng is None:
+            self._rng = np.random.default_rng(self.seed)
+
+    @classmethod
+    def from_values(cls, values: Iterable[float] | np.ndarray, **kwargs: int) -> "QuantileSketch":
+        return cls(**kwargs).update(values)
+
+    @property
+    def exact(self) -> bool:
+        return self._exact
+
+    def update(self, values: Iterable[float] | np.ndarray) -> "QuantileSketch":
+        arr = _finite(values)
+        if not len(arr):
+            return self
+        self.count += len(arr)
+        self._levels[0] = np.concatenate([self._levels[0], arr])
+        self._settle()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.k != self.k:
+            raise ValueError("cannot merge QuantileSketch objects with different k")
+        self.count += other.count
+        self._exact = self._exact and other._exact
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self._settle()
+        return self
+
+    def _settle(self) -> None:
+        if self._exact and self.count <= self.exact_limit:
+            return
+        self._exact = False
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd item out stays at this level so total weight is preserved.
+                keep, items = items[: len(items) % 2], items[len(items) % 2 :]
+                offset = int(self._rng.integers(2))  # type: ignore[union-attr]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], items[offset::2]])
+            level += 1
+
+    def _capacity(self, level: int) -> int:
+        # Top level holds k items, lower levels geometrically fewer (factor 2/3).
+        depth = len(self._levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def rank_error(self) -> float:
+        """
+        Normalized rank error bound (fraction of count) for the current state.
+        """
+        return 0.0 if self._exact else 2.5 / self.k
+
+    def quantile(self, q: float) -> float:
+        """
+        Value at quantile ``q`` in [0, 1]; NaN when the sketch is empty.
+        """
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("quantile must be in [0, 1]")
+        if self.count == 0:
+            return float("nan")
+        if self._exact:
+            # Same computation as pandas' Series.quantile (linear interpolation).
+            return float(np.percentile(self._levels[0], q * 100))
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(lv), 2**i, dtype=np.float64) for i, lv in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        pos = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(items[order][min(pos, len(items) - 1)])
+
+    def __len__(self) -> int:
+        return self.count
+
+
+__all__ = ["MinMax", "QuantileSketch"]
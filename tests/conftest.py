@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_engineering.graph_features import compute_graph_features
+from src.risk_scoring.risk_calculator import RiskComponents
+from src.services.securesar_service import Case, ScoreState, SecureSarService
+from src.utils.config import reload_config
+
+
+@pytest.fixture
+def configure():
+    # Apply config section overrides for one test; the environment config is restored afterwards.
+    def apply(**sections):
+        return reload_config(sections)
+
+    yield apply
+    reload_config()
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    # Services auditing to tmp_path. With n, the service serves n scored cases
+    # (ids C0..C{n-1}, keyed by customer id as in a real run) without running the pipeline.
+    def make(n=None):
+        svc = SecureSarService()
+        svc._audit.path = tmp_path / "audit.jsonl"
+        if n is None:
+            return svc
+        svc._case_list = [
+            Case(
+                id=f"C{i}",
+                customer_id=f"C{i}",
+                row=i,
+                typologies=["Structuring"] if i % 2 else [],
+                triggered_rules=["R1"] if i % 3 == 0 else [],
+                shap_values={},
+            )
+            for i in range(n)
+        ]
+        svc._cases = {c.id: c for c in svc._case_list}
+        scores = np.linspace(0.0, 0.9, n)
+        svc._components = RiskComponents(np.array([c.customer_id for c in svc._case_list]), np.tile(scores[:, None], 3))
+        svc._scoring = ScoreState(
+            scores=scores, band_codes=np.searchsorted([0.3, 0.6], scores).astype(np.int8), weights={}
+        )
+        svc._pipeline_ran = True
+        return svc
+
+    return make
+
+
+@pytest.fixture
+def make_inputs():
+    # (customers, transactions, graph features) for a small seeded population.
+    def make(n_customers=40, n_tx=600, seed=0):
+        rng = np.random.default_rng(seed)
+        customers = pd.DataFrame(
+            {
+                "customer_id": [f"C{i}" for i in range(n_customers)],
+                "segment": rng.choice(["retail", "sme", "private"], n_customers),
+            }
+        )
+        transactions = pd.DataFrame(
+            {
+                "transaction_id": [f"T{i}" for i in range(n_tx)],
+                "customer_id": rng.choice(customers["customer_id"], n_tx),
+                "counterparty_id": rng.choice([f"P{i}" for i in range(30)], n_tx),
+                "direction": rng.choice(["in", "out"], n_tx),
+                "amount": rng.choice([9_500.0, 120.5, 40_000.0], n_tx),
+                "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 20 * 24, n_tx), unit="h"),
+            }
+        )
+        return customers, transactions, compute_graph_features(customers, transactions, ["C1"])
+
+    return make
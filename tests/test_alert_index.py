@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.synthetic_generator import generate_dataset
+from src.data_engineering.alert_index import AlertIndex
+from src.utils.config import DataConfig, LLMConfig, PipelineConfig
+
+
+def _alerts(rows):
+    return pd.DataFrame(rows, columns=["alert_id", "transaction_id", "customer_id"])
+
+
+def test_alert_index_diff_reports_new_changed_and_removed():
+    before = AlertIndex(_alerts([("A1", "T1", "C1"), ("A2", "T2", "C2"), ("A3", "T3", "C3")]))
+    after = AlertIndex(_alerts([("A1", "T1", "C1"), ("A2", "T9", "C2"), ("A4", "T4", "C4")]))
+
+    delta = after.diff(before)
+    assert delta.alert_ids == {"A2", "A3", "A4"}
+    assert delta.customer_ids == {"C2", "C3", "C4"}
+    assert delta.transaction_ids == {"T2", "T9", "T3", "T4"}
+    assert not after.diff(after)
+    assert after.for_customer("C4")["alert_id"].tolist() == ["A4"]
+
+
+@pytest.fixture
+def raw_dir(tmp_path, configure):
+    raw = tmp_path / "raw"
+    generate_dataset(200, 3_000, seed=5).write(raw)
+    configure(
+        data=DataConfig(raw_dir=raw, processed_dir=tmp_path / "processed"),
+        pipeline=PipelineConfig(save_artifacts=False),
+        llm=LLMConfig(pregenerate_narratives=False),
+    )
+    return raw
+
+
+def test_incremental_run_rescores_only_affected_customers(make_service, raw_dir):
+    svc = make_service()
+    svc.run_pipeline()
+    scores_before, bands_before = svc._scoring.scores.copy(), svc._scoring.band_codes.copy()
+    cases_before = dict(svc._cases)
+    n_before = len(svc._case_list)
+
+    customers = pd.read_csv(raw_dir / "customers.csv")
+    transactions = pd.read_csv(raw_dir / "transactions.csv")
+    alerts = pd.read_csv(raw_dir / "alerts.csv")
+    # A new customer with transactions and an alert, and one existing alert removed.
+    new_customer = customers.iloc[[0]].assign(customer_id="C_NEW")
+    new_tx = transactions.iloc[:5].assign(customer_id="C_NEW", transaction_id=[f"T_NEW{i}" for i in range(5)])
+    removed = alerts.iloc[0]
+    new_alert = alerts.iloc[[0]].assign(alert_id="A_NEW", transaction_id="T_NEW0", customer_id="C_NEW")
+    alerts = pd.concat([alerts.iloc[1:], new_alert])
+    pd.concat([customers, new_customer]).to_csv(raw_dir / "customers.csv", index=False)
+    pd.concat([transactions, new_tx]).to_csv(raw_dir / "transactions.csv", index=False)
+    alerts.to_csv(raw_dir / "alerts.csv", index=False)
+
+    summary = svc.run_incremental()
+    rescored = {case_id for case_id, case in svc._cases.items() if cases_before.get(case_id) is not case}
+    assert summary["mode"] == "incremental" and summary["alerts_changed"] == 2
+    assert summary["customers_rescored"] == len(rescored) < n_before // 2
+    assert {"C_NEW", str(removed["customer_id"])} <= rescored
+
+    assert len(svc._case_list) == n_before + 1 and svc._case_list[-1].id == "C_NEW"
+    assert svc._components.customer_ids[-1] == "C_NEW" and len(svc._components) == n_before + 1
+    untouched = [case.row for case_id, case in cases_before.items() if case_id not in rescored]
+    assert len(untouched) == n_before - len(rescored) + 1
+    np.testing.assert_array_equal(svc._scoring.scores[untouched], scores_before[untouched])
+    np.testing.assert_array_equal(svc._scoring.band_codes[untouched], bands_before[untouched])
+    assert svc.get_case("C_NEW")["customer_id"] == "C_NEW"
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from src.risk_scoring.risk_calculator import RISK_BANDS, save_risk_scores
+from src.utils.artifacts import artifact_metadata, latest_run, list_runs, read_artifact, write_artifact
+
+
+def _risk_frame(n=10):
+    return pd.DataFrame(
+        {
+            "customer_id": [f"C{i}" for i in range(n)],
+            "risk_score": np.linspace(0.0, 1.0, n),
+            "risk_band": pd.Categorical((["Low", "Medium"] * n)[:n], categories=RISK_BANDS, ordered=True),
+        }
+    )
+
+
+def test_artifact_round_trip_keeps_order_dtypes_and_run_id(tmp_path):
+    df = _risk_frame()
+    path = save_risk_scores(df, tmp_path / "risk_scores", run_id="run-1")
+
+    assert path == tmp_path / "risk_scores" / "run_id=run-1"
+    out = read_artifact(tmp_path / "risk_scores")
+    pd.testing.assert_frame_equal(out, df)
+    assert list(out["risk_band"].cat.categories) == RISK_BANDS and out["risk_band"].cat.ordered
+    meta = artifact_metadata(tmp_path / "risk_scores")
+    assert meta["run_id"] == "run-1" and meta["rows"] == len(df)
+
+
+def test_read_artifact_pushes_down_columns_and_filters(tmp_path):
+    write_artifact(_risk_frame(), tmp_path, "run-1")
+    out = read_artifact(tmp_path, columns=["customer_id"], filters=[("risk_score", ">=", 0.8)])
+    assert list(out.columns) == ["customer_id"]
+    assert out["customer_id"].tolist() == ["C8", "C9"]
+
+
+def test_latest_run_and_explicit_run_selection(tmp_path):
+    write_artifact(_risk_frame(4), tmp_path, "run-1")
+    write_artifact(_risk_frame(6), tmp_path, "run-0")
+
+    assert list_runs(tmp_path) == ["run-0", "run-1"]
+    assert latest_run(tmp_path) == "run-0"  # last written, not last by name
+    assert len(read_artifact(tmp_path)) == 6
+    assert len(read_artifact(tmp_path, run_id="run-1")) == 4
+
+
+def test_empty_frame_keeps_schema(tmp_path):
+    write_artifact(_risk_frame(0), tmp_path, "run-1")
+    out = read_artifact(tmp_path)
+    assert out.empty and list(out.columns) == ["customer_id", "risk_score", "risk_band"]
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from src.risk_scoring.backtest import outcome_labels, pareto_front, run_backtest, weight_grid
+from src.risk_scoring.risk_calculator import RiskComponents, score_components
+
+
+def test_run_backtest_matches_single_config_scoring():
+    rng = np.random.default_rng(0)
+    components = RiskComponents(
+        customer_ids=np.array([f"C{i}" for i in range(200)]),
+        matrix=rng.random((200, 3)),
+    )
+    alerts = pd.DataFrame({"alert_id": ["A1", "A2"], "transaction_id": ["T1", "T2"], "customer_id": ["C3", "C7"]})
+    labels = outcome_labels(components.customer_ids, alerts)
+    configs = weight_grid(steps=5, band_edges=[(0.3, 0.6), (0.2, 0.5)])
+
+    result = run_backtest(components, configs, labels, block_size=7)
+    assert len(result) == len(configs)
+    assert result["pareto"].any()
+
+    row = result.iloc[3]
+    _, codes = score_components(components.matrix, row.to_dict())
+    assert row["alerts_high"] == (codes == 2).sum()
+    assert row["band_low"] == (codes == 0).sum()
+    assert row["hits"] == labels[codes == 2].sum()
+
+
+def test_pareto_front_drops_dominated_configs():
+    mask = pareto_front(np.array([10, 20, 20, 5]), np.array([0.5, 0.4, 0.9, 0.5]))
+    assert mask.tolist() == [False, False, True, True]
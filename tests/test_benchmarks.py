@@ -0,0 +1,69 @@
+import pytest
+
+from benchmarks.fake_bedrock import FakeBedrockProfile, FakeBedrockServer
+from benchmarks.narrative_load import narrative_counts, summarize
+from benchmarks.pipeline_benchmark import compare
+from benchmarks.startup_benchmark import compare as startup_compare, run_probe
+from src.llm.narrative_generator import NarrativeGenerator, error_code
+from src.utils.config import LLMConfig, reload_config
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    def result(wall, peak):
+        return {"scales": {"small": {"stages": {"apply_rules": {"wall_s": wall, "peak_mb": peak, "rows": 1}}}}}
+
+    baseline = result(1.0, 100.0)
+    assert compare(result(1.2, 110.0), baseline, tolerance=0.25) == []
+    assert len(compare(result(1.5, 100.0), baseline, tolerance=0.25)) == 1
+    assert len(compare(result(1.0, 200.0), baseline, memory_tolerance=0.25)) == 1
+    # Tiny absolute differences are noise, and unknown scales are skipped.
+    assert compare(result(0.004, 1.0), result(0.001, 0.1)) == []
+    assert compare({"scales": {"large": result(9.0, 9.0)["scales"]["small"]}}, baseline) == []
+
+
+def test_fake_bedrock_outcomes_reach_the_generator(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "fake")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "fake")
+    evidence = {"customer_id": "C1", "risk_score": 0.9}
+
+    def generator(server):
+        llm = LLMConfig(use_real_llm=True, bedrock_endpoint_url=server.endpoint_url, bedrock_max_attempts=1)
+        reload_config({"llm": llm})
+        return NarrativeGenerator()
+
+    try:
+        with FakeBedrockServer(FakeBedrockProfile(latency_ms=1, latency_sigma=0)) as server:
+            assert "Fake narrative" in generator(server).generate(evidence)
+        with FakeBedrockServer(FakeBedrockProfile(latency_ms=1, throttle_rate=1.0)) as server:
+            gen = generator(server)
+            with pytest.raises(Exception) as excinfo:
+                gen.generate(evidence, raise_throttling=True)
+            assert error_code(excinfo.value) == "ThrottlingException"
+        with FakeBedrockServer(FakeBedrockProfile(latency_ms=1, error_rate=1.0)) as server:
+            assert generator(server).generate(evidence).startswith("Summary of suspicious activity")
+            assert server.model.stats()["errors"] == 1
+    finally:
+        reload_config()
+
+
+def test_narrative_load_summary_reports_fallback_rate():
+    before = narrative_counts('securesar_narrative_duration_seconds_count{provider="bedrock",outcome="ok"} 5')
+    after = narrative_counts(
+        "# TYPE securesar_narrative_duration_seconds histogram\n"
+        'securesar_narrative_duration_seconds_count{provider="bedrock",outcome="ok"} 11\n'
+        'securesar_narrative_duration_seconds_count{provider="bedrock",outcome="fallback"} 2\n'
+        'securesar_narrative_duration_seconds_sum{provider="bedrock",outcome="ok"} 3.5'
+    )
+    result = summarize([0.1] * 7 + [0.5], [200] * 7 + [500], 2.0, before, after)
+    assert result["narratives"] == {"bedrock/fallback": 2, "bedrock/ok": 6}
+    assert result["fallback_rate"] == 0.25
+    assert (result["ok"], result["errors"], result["throughput_rps"]) == (7, 1, 3.5)
+    assert result["latency_ms"]["p50"] == 100.0 and result["latency_ms"]["max"] == 500.0
+
+
+def test_api_starts_without_loading_ml_aws_or_search_libraries():
+    result = run_probe()
+    assert result["health_status"] == 200
+    assert result["heavy_modules"] == []
+    assert startup_compare({**result}, {"import_s": result["import_s"]}) == []
+    assert startup_compare({**result, "heavy_modules": ["sklearn"]}, {}) == ["loaded at startup: sklearn"]
@@ -0,0 +1,67 @@
+import gzip
+import json
+
+from starlette.requests import Request
+
+from src.api.caching import SnapshotResponseCache, etag_for, etag_matches, negotiate_encoding, snapshot_response
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/api/cases/high-risk", "headers": raw})
+
+
+def test_snapshot_response_serves_304_and_reuses_bodies_until_version_changes():
+    cache = SnapshotResponseCache()
+    version = {"current": "run-a.1"}
+    builds = []
+
+    def build():
+        builds.append(1)
+        return json.dumps([{"id": f"CASE_{i}", "risk_score": 0.9} for i in range(100)]).encode()
+
+    def respond(**headers):
+        return snapshot_response(_request(**headers), cache, lambda: version["current"], ("high-risk",), build)
+
+    first = respond(accept_encoding="gzip, deflate")
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == etag_for("run-a.1", "gzip")
+    assert len(json.loads(gzip.decompress(first.body))) == 100
+
+    plain = respond()
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == '"run-a.1"'
+    assert len(builds) == 1
+
+    # A conditional request with either representation's tag is not rebuilt,
+    # and the 304 names the representation the client negotiated.
+    not_modified = respond(if_none_match=plain.headers["etag"], accept_encoding="gzip")
+    assert not_modified.status_code == 304 and not_modified.headers["etag"] == first.headers["etag"]
+    assert respond(if_none_match=first.headers["etag"]).headers["etag"] == plain.headers["etag"]
+    assert len(builds) == 1
+
+    version["current"] = "run-a.2"
+    assert respond(if_none_match=plain.headers["etag"]).status_code == 200
+    assert len(builds) == 2 and len(cache) == 1
+
+
+def test_missing_resources_and_small_bodies():
+    cache = SnapshotResponseCache(max_entries=1)
+    assert snapshot_response(_request(), cache, lambda: "v1", ("case", "x"), lambda: None) is None
+    # A current ETag does not turn a missing case into a 304.
+    assert snapshot_response(_request(if_none_match='"v1"'), cache, lambda: "v1", ("case", "x"), lambda: None) is None
+    assert len(cache) == 0
+
+    small = snapshot_response(_request(accept_encoding="gzip"), cache, lambda: "v1", ("case", "a"), lambda: b"{}")
+    assert small.body == b"{}" and "content-encoding" not in small.headers
+    snapshot_response(_request(), cache, lambda: "v1", ("case", "b"), lambda: b"[]")
+    assert len(cache) == 1
+
+
+def test_encoding_negotiation_and_etag_matching():
+    assert negotiate_encoding("gzip;q=0, identity", 10_000) is None
+    assert negotiate_encoding("*", 10_000) in {"gzip", "br"}
+    assert negotiate_encoding("gzip", 10) is None
+    assert etag_matches('W/"other", "v1-gz"', "v1")
+    assert etag_matches("*", "v1")
+    assert not etag_matches('"v0"', "v1")
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.services.case_snapshot import CaseSnapshotReader, SnapshotUnavailableError
+from src.utils.config import LLMConfig, PipelineConfig
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, configure):
+    # Narrative drafts stay in the builder process; compare case data only.
+    configure(
+        pipeline=PipelineConfig(snapshot_dir=tmp_path / "snapshots"),
+        llm=LLMConfig(pregenerate_narratives=False),
+    )
+    return tmp_path / "snapshots"
+
+
+def test_attached_worker_serves_published_snapshot_without_copying(make_service, snapshot_dir):
+    builder = make_service(10)
+    builder._snapshot_mode = "publish"
+    builder._run_id = "run-a"
+
+    worker = make_service()
+    with pytest.raises(SnapshotUnavailableError):
+        worker.list_high_risk_cases()
+    assert worker.snapshot_version is None
+
+    builder._snapshot_changed()
+    assert builder.snapshot_version == worker.snapshot_version == "run-a.1"
+    assert worker.list_high_risk_cases() == builder.list_high_risk_cases()
+    for case_id in ("C3", "C9", "missing"):
+        assert worker.get_case(case_id) == builder.get_case(case_id)
+    exported = list(worker.export_cases(min_score=0.2, typology="Structuring", batch_size=3))
+    assert exported == list(builder.export_cases(min_score=0.2, typology="Structuring", batch_size=3))
+    assert not worker._attached().scores.flags.owndata
+    with pytest.raises(ValueError):
+        worker.rescore()
+
+    # A rescore in the builder publishes version 2; the worker remaps on its next poll.
+    builder.rescore({"rule_weight": 1.0, "anomaly_weight": 0.0, "cluster_weight": 0.0})
+    worker._reader.poll_interval = 0.0
+    assert worker.snapshot_version == "run-a.2"
+    np.testing.assert_allclose(worker._attached().scores, builder._scoring.scores)
+
+
+def test_reader_picks_up_only_complete_snapshots(make_service, snapshot_dir):
+    reader = CaseSnapshotReader(snapshot_dir, poll_interval=0.0)
+    with pytest.raises(SnapshotUnavailableError):
+        reader.current()
+    builder = make_service(4)
+    builder._snapshot_mode = "publish"
+    builder._run_id = "run-b"
+    for _ in range(5):
+        builder._snapshot_changed()
+    assert reader.current().version == 5 and len(reader.current()) == 4
+    assert len(list(snapshot_dir.glob("snapshot-*.arrow"))) == 3
@@ -0,0 +1,23 @@
+from src.risk_scoring.risk_calculator import load_score_weights
+from src.utils.config import config_version, get_config, reload_config
+from src.utils.file_watch import refresh_watched_files
+
+
+def test_get_config_is_cached_until_reload():
+    cfg = get_config()
+    assert get_config() is cfg
+    version = config_version()
+    assert reload_config() is not cfg
+    assert config_version() > version
+
+
+def test_score_weights_hot_reload_bumps_version(tmp_path):
+    path = tmp_path / "score_weights.yaml"
+    path.write_text("rule_weight: 0.5\n", encoding="utf-8")
+    assert load_score_weights(path)["rule_weight"] == 0.5
+
+    version = config_version()
+    path.write_text("rule_weight: 0.75\n", encoding="utf-8")
+    assert refresh_watched_files() >= 1
+    assert load_score_weights(path)["rule_weight"] == 0.75
+    assert config_version() > version
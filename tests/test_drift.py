@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.detection.drift import (
+    CLUSTER_HISTOGRAM,
+    compare,
+    histograms_from_frame,
+    histograms_to_frame,
+    ks_statistic,
+    psi,
+    run_histograms,
+)
+from src.services.securesar_service import SecureSarService
+from src.utils.config import DataConfig
+
+
+def _run(seed, shift=0.0, n=2_000):
+    rng = np.random.default_rng(seed)
+    features = pd.DataFrame(
+        {
+            "customer_id": [f"C{i}" for i in range(n)],
+            "total_amount": rng.lognormal(8 + shift, 1.0, n),
+            "tx_count": rng.poisson(20, n),
+        }
+    )
+    anomaly = pd.Series(rng.normal(0, 0.05, n), index=features["customer_id"])
+    clustered = features.assign(cluster=rng.integers(0, 4, n))
+    return features, anomaly, clustered
+
+
+def test_psi_and_ks_flag_shifted_features_only():
+    base = run_histograms(*_run(0), bins=10)
+    same = run_histograms(*_run(1), bins=10, reference=base)
+    shifted = run_histograms(*_run(2, shift=1.0), bins=10, reference=base)
+
+    assert psi(base["tx_count"], same["tx_count"]) < 0.05
+    assert psi(base["total_amount"], shifted["total_amount"]) > 0.2
+    assert ks_statistic(base["total_amount"], shifted["total_amount"]) > 0.3
+    rows = {r["name"]: r for r in compare(shifted, same, base, psi_threshold=0.2, ks_threshold=0.1)}
+    assert rows["total_amount"]["drifted"] and not rows["tx_count"]["drifted"]
+    assert rows["anomaly_score"]["psi_previous"] is not None
+
+    restored = histograms_from_frame(histograms_to_frame(shifted))
+    assert restored.keys() == shifted.keys()
+    np.testing.assert_array_equal(restored["total_amount"].edges, shifted["total_amount"].edges)
+    np.testing.assert_array_equal(restored[CLUSTER_HISTOGRAM].counts, shifted[CLUSTER_HISTOGRAM].counts)
+
+
+def test_cluster_histogram_ignores_label_permutations():
+    features, anomaly, clustered = _run(0)
+    relabelled = clustered.assign(cluster=clustered["cluster"].map({0: 3, 1: 0, 2: 1, 3: 2}))
+    a = run_histograms(features, anomaly, clustered, bins=10)
+    b = run_histograms(features, anomaly, relabelled, bins=10, reference=a)
+    np.testing.assert_array_equal(a[CLUSTER_HISTOGRAM].counts, b[CLUSTER_HISTOGRAM].counts)
+
+
+@pytest.fixture
+def processed(tmp_path, configure):
+    configure(data=DataConfig(processed_dir=tmp_path / "processed"))
+    return tmp_path / "processed"
+
+
+def test_drift_stage_compares_with_stored_histograms_and_audits(make_service, processed):
+    svc = make_service()
+    first = svc._drift_stage("run-1", *_run(0), save=True)
+    assert first["previous_run_id"] is None and first["drifted"] == []
+
+    # A fresh process finds the previous run and the baseline on disk only.
+    svc = make_service()
+    report = svc._drift_stage("run-2", *_run(1, shift=1.0), save=True)
+    assert report["previous_run_id"] == report["baseline_run_id"] == "run-1"
+    assert "total_amount" in report["drifted"]
+    assert svc._audit.path.read_text(encoding="utf-8").count("DRIFT_ALERT") == 1
+
+    stored = SecureSarService().drift_report("run-2")
+    assert stored["drifted"] == report["drifted"] and stored["baseline_run_id"] == "run-1"
+    assert SecureSarService().drift_report()["run_id"] == "run-2"
+    assert SecureSarService().drift_report("missing") is None
@@ -0,0 +1,44 @@
+import io
+import json
+
+import pyarrow as pa
+import pytest
+
+from src.api.export import EXPORT_SCHEMA, arrow_ipc_chunks, ndjson_chunks
+from src.governance.data_masking import mask_batch_for_role
+
+
+def test_export_filters_in_batches_and_masks_per_role(make_service):
+    svc = make_service(10)
+    batches = list(svc.export_cases(min_score=0.2, typology="Structuring", batch_size=3))
+    ids = [i for b in batches for i in b["id"]]
+    assert ids == ["C3", "C5", "C7", "C9"]
+    assert all(len(b["id"]) <= 3 for b in batches)
+
+    high = list(svc.export_cases(bands=["High"], rule="R1"))
+    assert [i for b in high for i in b["id"]] == ["C6", "C9"]
+    with pytest.raises(ValueError):
+        svc.export_cases(bands=["Critical"])
+
+    batch = batches[0]
+    assert mask_batch_for_role(batch, "Admin") is batch
+    masked = mask_batch_for_role(batch, "Analyst")
+    raw_ids = {f"C{i}" for i in range(10)}
+    for column in ("id", "customer_id"):
+        assert all(v.startswith("TOK_") and v not in raw_ids for v in masked[column])
+    assert masked["id"] == masked["customer_id"]
+    assert "CASE_EXPORT" in svc._audit.path.read_text(encoding="utf-8")
+
+
+def test_ndjson_and_arrow_streams_round_trip(make_service):
+    svc = make_service(10)
+    rows = [json.loads(line) for chunk in ndjson_chunks(svc.export_cases(batch_size=4)) for line in chunk.splitlines()]
+    assert len(rows) == 10 and rows[9]["typologies"] == ["Structuring"] and rows[0]["risk_band"] == "Low"
+
+    chunks = list(arrow_ipc_chunks(svc.export_cases(batch_size=4)))
+    table = pa.ipc.open_stream(io.BytesIO(b"".join(chunks))).read_all()
+    assert table.schema == EXPORT_SCHEMA and table.num_rows == 10
+    assert table.column("id").to_pylist() == [f"C{i}" for i in range(10)]
+
+    empty = pa.ipc.open_stream(io.BytesIO(b"".join(arrow_ipc_chunks(iter(()))))).read_all()
+    assert empty.num_rows == 0
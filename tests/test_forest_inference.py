@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+from src.detection.forest_inference import SMALL_BATCH_ROWS, FlatForest, flat_forest
+
+
+def _data(n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.lognormal(size=(n, 6)), columns=[f"f{i}" for i in range(6)])
+
+
+def test_flat_forest_matches_sklearn_on_small_and_large_batches():
+    X = _data()
+    model = IsolationForest(contamination=0.02, random_state=42).fit(X)
+    forest = FlatForest.from_isolation_forest(model)
+    values = X.to_numpy()
+    for n in (1, 7, SMALL_BATCH_ROWS, SMALL_BATCH_ROWS + 1, len(X)):
+        np.testing.assert_array_equal(forest.decision_function(values[:n]), model.decision_function(X.iloc[:n]))
+    np.testing.assert_array_equal(forest.score_samples(values[:50]), model.score_samples(X.iloc[:50]))
+    assert flat_forest(model) is flat_forest(model)
+
+
+def test_flat_forest_handles_feature_subsets_and_missing_values():
+    X = _data(seed=1)
+    model = IsolationForest(max_features=0.5, n_estimators=40, random_state=3).fit(X)
+    forest = FlatForest.from_isolation_forest(model)
+    values = X.to_numpy().copy()
+    values[::5, 2] = np.nan
+    for n in (20, len(X)):
+        expected = model.decision_function(pd.DataFrame(values[:n], columns=X.columns))
+        np.testing.assert_array_equal(forest.decision_function(values[:n]), expected)
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from src.data_engineering.graph_features import compute_graph_features
+
+
+def test_graph_features_fan_pass_through_and_exposure():
+    customers = pd.DataFrame({"customer_id": ["C1", "C2", "C3", "C4"]})
+    transactions = pd.DataFrame(
+        {
+            "customer_id": ["C1", "C1", "C2", "C2", "C3", "C4", "C1"],
+            "counterparty_id": ["P1", "P2", "P1", "C3", "P9", "P8", "P1"],
+            "direction": ["in", "out", "out", "out", "in", "in", "out"],
+            "amount": [100.0, 90.0, 5.0, 5.0, 1.0, 1.0, 20.0],
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 00:00", "2024-01-01 05:00", "2024-01-01 00:00", "2024-01-02 00:00",
+                 "2024-01-01 00:00", "2024-01-01 00:00", "2024-01-10 00:00"]
+            ),
+        }
+    )
+    out = compute_graph_features(customers, transactions, flagged_customers=["C3"]).set_index("customer_id")
+
+    assert out.loc["C1", "fan_in"] == 1 and out.loc["C1", "fan_out"] == 2
+    assert out.loc["C1", "distinct_counterparties"] == 2
+    # 90 of 100 inbound leaves within 48h; the later 20 outflow does not count.
+    assert out.loc["C1", "pass_through_ratio"] == 0.9
+    # C2 pays C3 directly; C1 shares counterparty P1 with C2.
+    assert out["hops_to_flagged"].to_dict() == {"C1": 2, "C2": 1, "C3": 0, "C4": 3}
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.ingestion import read_transactions
+from src.data_engineering.interning import CustomerDictionary, intern_transactions
+from src.detection.rule_engine import RuleResult, rules_to_frame
+from src.utils.memory import MemoryReport
+
+
+def test_customer_dictionary_codes_and_shared_dtype():
+    dictionary = CustomerDictionary.build(pd.Series(["C1", "C2"]), pd.Series(["C3", "C1"], dtype="category"))
+    assert list(dictionary.ids) == ["C1", "C2", "C3"]
+    assert dictionary.encode(["C3", "C9", "C1"]).tolist() == [2, -1, 0]
+    assert dictionary.encode(["C2"]).dtype == np.int32
+    assert dictionary.decode(np.array([1, 0])).tolist() == ["C2", "C1"]
+
+    tx = intern_transactions(pd.DataFrame({"customer_id": ["C3", "C1"], "direction": ["in", "out"]}), dictionary)
+    rules = rules_to_frame([RuleResult("R1", "desc", ["C1", "C2"]), RuleResult("R2", "other", ["C1"])], dictionary)
+    assert tx["customer_id"].dtype == rules["customer_id"].dtype == dictionary.dtype
+    assert rules["rule_id"].tolist() == ["R1", "R1", "R2"]
+    assert list(rules["description"].cat.categories) == ["desc", "other"]
+
+
+def test_read_transactions_in_chunks_matches_plain_read(tmp_path):
+    path = tmp_path / "transactions.csv"
+    pd.DataFrame(
+        {
+            "transaction_id": [f"T{i}" for i in range(7)],
+            "customer_id": ["C2", "C1", "C2", "C3", "C1", "C4", "C2"],
+            "amount": [1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0],
+            "timestamp": pd.date_range("2024-01-01", periods=7, freq="h"),
+            "direction": ["in", "out", "in", "in", "out", "in", "out"],
+        }
+    ).to_csv(path, index=False)
+
+    chunked = read_transactions(path, chunksize=3)
+    plain = pd.read_csv(path, parse_dates=["timestamp"])
+    assert isinstance(chunked["customer_id"].dtype, pd.CategoricalDtype)
+    for col in plain.columns:
+        assert chunked[col].astype(object).tolist() == plain[col].astype(object).tolist()
+
+    report = MemoryReport()
+    entry = report.record("transactions", chunked)
+    assert entry.rows == 7 and entry.uninterned_nbytes > entry.nbytes
+    assert set(report.to_dict()["transactions"]) >= {"bytes", "reduction", "peak_rss_bytes"}
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_engineering.peer_baselines import fit_peer_baselines
+from src.detection.anomaly_detection import fit_anomaly_model
+from src.detection.rule_engine import deviation_threshold, rules_to_frame
+from src.risk_scoring.risk_calculator import compute_risk_scores, fit_score_calibration, load_score_weights
+from src.services.live_scoring import LiveScorer
+from src.services.pipeline_stages import build_customer_features, score_customers
+
+
+def _batch(customers, transactions, graph, model=None, threshold=None, calibration=None, peers=None):
+    features, _ = build_customer_features(customers, transactions, graph)
+    peers = peers or fit_peer_baselines(features)
+    features = peers.apply(features)
+    model = model or fit_anomaly_model(features)
+    threshold = deviation_threshold(features) if threshold is None else threshold
+    anomaly, rules = score_customers(features, model, threshold)
+    rules_df = rules_to_frame(rules)
+    cluster_df = features.assign(cluster=np.arange(len(features)) % 3)
+    calibration = calibration or fit_score_calibration(rules_df, anomaly, cluster_df)
+    risk_df, _ = compute_risk_scores(features, rules_df, anomaly, cluster_df, [], calibration)
+    return features, model, threshold, calibration, cluster_df, risk_df, rules_df, peers
+
+
+def test_live_score_matches_batch_run_with_the_transaction_added(make_inputs):
+    customers, transactions, graph = make_inputs()
+    features, model, threshold, calibration, cluster_df, _, _, peers = _batch(customers, transactions, graph)
+    live = LiveScorer(features, model, threshold, calibration, cluster_df.set_index("customer_id")["cluster"], peers)
+
+    new = {"transaction_id": "T_NEW", "customer_id": "C5", "counterparty_id": "P1", "direction": "out",
+           "amount": 75_000.0, "timestamp": pd.Timestamp("2024-03-01")}
+    result = live.score_transaction("T_NEW", "C5", 75_000.0, new["timestamp"], "out", load_score_weights())
+
+    # Graph features are held at their last-run values by the live state.
+    _, _, _, _, _, risk_df, rules_df, _ = _batch(
+        customers, pd.concat([transactions, pd.DataFrame([new])], ignore_index=True), graph,
+        model, threshold, calibration, peers,
+    )
+    expected = risk_df.set_index("customer_id").loc["C5"]
+    assert result.risk_score == pytest.approx(expected["risk_score"])
+    assert result.risk_band == expected["risk_band"]
+    assert result.triggered_rules == rules_df.loc[rules_df["customer_id"] == "C5", "rule_id"].astype(str).tolist()
+    assert result.tx_count == int((transactions["customer_id"] == "C5").sum()) + 1
+
+
+def test_live_state_counts_structuring_and_ignores_retries(make_inputs):
+    customers, transactions, graph = make_inputs()
+    features, model, threshold, calibration, cluster_df, _, _, peers = _batch(customers, transactions, graph)
+    live = LiveScorer(features, model, threshold, calibration, cluster_df.set_index("customer_id")["cluster"], peers)
+    start = pd.Timestamp("2024-03-01")
+    weights = load_score_weights()
+
+    first = live.score_transaction("L1", "C7", 9_000.0, start, "in", weights)
+    retry = live.score_transaction("L1", "C7", 9_000.0, start, "in", weights)
+    assert retry.duplicate and retry.tx_count == first.tx_count and retry.velocity_count == 1
+    second = live.score_transaction("L2", "C7", 9_100.0, start + pd.Timedelta(hours=30), "in", weights)
+    assert "R4_STRUCTURING" in second.triggered_rules
+    assert second.velocity_count == 2 and second.velocity_amount == 18_100.0
+    later = live.score_transaction("L3", "C7", 50.0, start + pd.Timedelta(days=10), "out", weights)
+    assert later.velocity_count == 1 and "R4_STRUCTURING" in later.triggered_rules
+
+    assert live.score_transaction("L4", "unknown", 10.0, start, None, weights) is None
+    with pytest.raises(ValueError):
+        live.score_transaction("L5", "C7", 0.0, start, None, weights)
@@ -0,0 +1,41 @@
+import pytest
+
+from src.utils.metrics import MetricsRegistry, PipelineProfile, STAGE_SECONDS
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("req_seconds", "Request latency.", ["route"], buckets=[0.1, 1.0])
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, route="/api/cases/{case_id}")
+
+    text = registry.render()
+    assert "# TYPE req_seconds histogram" in text
+    assert 'req_seconds_bucket{route="/api/cases/{case_id}",le="0.1"} 1' in text
+    assert 'req_seconds_bucket{route="/api/cases/{case_id}",le="1"} 3' in text
+    assert 'req_seconds_bucket{route="/api/cases/{case_id}",le="+Inf"} 4' in text
+    assert 'req_seconds_count{route="/api/cases/{case_id}"} 4' in text
+    assert 'req_seconds_sum{route="/api/cases/{case_id}"} 4.05' in text
+
+    with pytest.raises(ValueError):
+        hist.observe(1.0, path="/x")
+    assert registry.histogram("req_seconds", "Request latency.", ["route"]) is hist
+    with pytest.raises(ValueError):
+        registry.gauge("req_seconds", "clash", ["route"])
+
+
+def test_pipeline_profile_records_stages_and_publishes_metrics():
+    profile = PipelineProfile()
+    before = STAGE_SECONDS.count(stage="test_stage")
+    with profile.stage("test_stage", rows_in=10) as stage:
+        sum(range(10_000))
+        stage.rows_out = 3
+    with pytest.raises(RuntimeError):
+        with profile.stage("failing_stage"):
+            raise RuntimeError("boom")
+
+    stats = profile.to_dict()
+    assert list(stats) == ["test_stage", "failing_stage"]
+    assert stats["test_stage"]["rows_in"] == 10 and stats["test_stage"]["rows_out"] == 3
+    assert stats["test_stage"]["wall_s"] >= 0 and stats["test_stage"]["peak_rss_bytes"] > 0
+    assert STAGE_SECONDS.count(stage="test_stage") == before + 1
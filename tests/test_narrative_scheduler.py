@@ -0,0 +1,73 @@
+import threading
+import time
+
+from src.llm.narrative_scheduler import NarrativeScheduler, TokenBucket
+
+
+class Throttled(Exception):
+    response = {"Error": {"Code": "ThrottlingException"}}
+
+
+class FakeBedrock:
+    uses_bedrock = True
+
+    def __init__(self, throttle_first=2):
+        self.calls = []
+        self.release = threading.Event()
+        self.throttle_first = throttle_first
+
+    def generate(self, evidence, raise_throttling=False):
+        case_id = evidence["case_id"]
+        self.calls.append(case_id)
+        self.release.wait(5.0)
+        if self.calls.count(case_id) <= self.throttle_first:
+            raise Throttled()
+        return f"narrative for {case_id} v{evidence['version']}"
+
+
+def test_token_bucket_limits_rate_after_burst():
+    bucket = TokenBucket(rate=50.0, capacity=2)
+    started = time.monotonic()
+    for _ in range(7):
+        assert bucket.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_opened_case_jumps_queue_and_throttling_is_retried():
+    versions = {case_id: 1 for case_id in "ABCZ"}
+    generator = FakeBedrock()
+    scheduler = NarrativeScheduler(
+        generator,
+        lambda case_id: {"case_id": case_id, "version": versions[case_id]},
+        rate_per_s=1_000.0,
+        burst=10,
+        max_concurrency=1,
+        backoff_s=0.001,
+    )
+    try:
+        scheduler.schedule(["A", "B", "C"])
+        while not generator.calls:
+            time.sleep(0.001)
+        # A is being drafted; an analyst opens Z, which goes ahead of B and C.
+        assert scheduler.draft("Z", {"case_id": "Z", "version": 1}) is None
+        generator.release.set()
+        assert scheduler.wait_idle(timeout=5.0)
+    finally:
+        scheduler.close()
+
+    order = [c for i, c in enumerate(generator.calls) if i == 0 or generator.calls[i - 1] != c]
+    assert order == ["A", "Z", "B", "C"]
+    assert generator.calls.count("A") == 3
+    assert scheduler.draft("A", {"case_id": "A", "version": 1}) == "narrative for A v1"
+    # A draft written from older evidence is not served.
+    assert scheduler.draft("A", {"case_id": "A", "version": 2}) is None
+
+
+def test_service_serves_background_drafts_in_get_case(make_service):
+    svc = make_service(4)
+    svc._snapshot_changed()
+    assert svc._drafts.wait_idle(timeout=5.0)
+    case = svc.get_case("C3")
+    assert case["narrative"].startswith("Summary of suspicious activity")
+    assert svc.generate_narrative("C3", actor="Analyst_1") == case["narrative"]
+    assert '"drafted":true' in svc._audit.path.read_text(encoding="utf-8")
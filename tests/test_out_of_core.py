@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_engineering.feature_engineering import engineer_features
+from src.data_engineering.ingestion import read_transactions
+from src.data_engineering.out_of_core import SpillStats, aggregate_out_of_core, engineer_features_out_of_core
+from src.data_engineering.validation import validate_transactions
+
+
+@pytest.fixture
+def transactions_csv(tmp_path, make_inputs):
+    n_tx = 3_000
+    customers, transactions, _ = make_inputs(60, n_tx, seed=3)
+    rng = np.random.default_rng(3)
+    # Non-round amounts and repeated timestamps, so summation order and sort stability both matter.
+    transactions["amount"] = rng.lognormal(6, 2, n_tx).round(2)
+    transactions["timestamp"] = transactions["timestamp"].dt.floor("D")
+    path = tmp_path / "transactions.csv"
+    transactions.to_csv(path, index=False)
+    return customers, path
+
+
+def test_out_of_core_features_match_in_memory(tmp_path, transactions_csv):
+    customers, path = transactions_csv
+    expected = engineer_features(customers, validate_transactions(read_transactions(path)))
+
+    in_memory = SpillStats()
+    out = engineer_features_out_of_core(customers, path, 64 * 1024 * 1024, tmp_path, n_workers=1, stats=in_memory)
+    pd.testing.assert_frame_equal(out, expected)
+    assert in_memory.spilled_rows == 0
+
+    spilled = SpillStats()
+    out = engineer_features_out_of_core(customers, path, 200_000, tmp_path, n_workers=1, stats=spilled)
+    pd.testing.assert_frame_equal(out, expected)
+    assert spilled.spilled_rows == spilled.rows == 3_000
+    assert spilled.partitions > 1
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_oversized_partitions_are_split_again(tmp_path, transactions_csv):
+    customers, path = transactions_csv
+    transactions = validate_transactions(read_transactions(path))
+    expected = engineer_features(customers, transactions)
+
+    stats = SpillStats()
+    chunks = (transactions.iloc[i : i + 500] for i in range(0, len(transactions), 500))
+    agg = aggregate_out_of_core(chunks, 100_000, tmp_path, n_partitions=2, stats=stats)
+    assert stats.max_depth >= 1
+    features = customers.merge(agg, on="customer_id", how="left").fillna(0)
+    pd.testing.assert_frame_equal(features, expected)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_engineering.peer_baselines import POPULATION, fit_peer_baselines, peer_segments
+
+
+def _features():
+    return pd.DataFrame(
+        {
+            "customer_id": [f"C{i}" for i in range(9)],
+            "segment": ["retail"] * 5 + ["sme"] * 3 + [None],
+            "age": [25, 28, 22, 35, 29, 40, 41, 55, 33],
+            "total_amount": [100.0, 200.0, 300.0, 400.0, 10_000.0, 50.0, 60.0, 70.0, 5.0],
+            "tx_count": [1, 2, 3, 4, 5, 1, 1, 1, 1],
+            "avg_amount": [100.0, 100.0, 100.0, 100.0, 2_000.0, 50.0, 60.0, 70.0, 5.0],
+        }
+    )
+
+
+def test_segments_combine_attributes_and_age_bands():
+    labels = peer_segments(_features(), ["segment"], [30.0])
+    assert labels[0] == "segment=retail|age=-30"
+    assert labels[3] == "segment=retail|age=30-"
+    assert labels[8] == POPULATION
+    assert (peer_segments(_features(), ["missing_column"], []) == POPULATION).all()
+
+
+def test_robust_stats_and_small_segment_fallback():
+    features = _features()
+    peers = fit_peer_baselines(features, ["segment"], [], min_segment_size=4)
+    retail = peers.stats.loc["segment=retail"]
+    log_totals = np.log1p(features["total_amount"].to_numpy()[:5])
+    assert retail["count"] == 5
+    assert retail["total_amount_median"] == pytest.approx(np.median(log_totals))
+    assert retail["total_amount_mad"] == pytest.approx(np.median(np.abs(log_totals - np.median(log_totals))))
+
+    out = peers.apply(features)
+    z = out[["peer_z_total_amount", "peer_z_tx_count", "peer_z_avg_amount"]].to_numpy()
+    np.testing.assert_allclose(out["deviation_score"], z.max(axis=1))
+    # The outlier stands out against its own segment.
+    assert out["deviation_score"].idxmax() == 4
+    # sme has 3 customers (< 4), so it is compared with the population, like the customer without a segment.
+    population_center, _ = peers.parameters(features.iloc[[8]])
+    sme_center, _ = peers.parameters(features.iloc[[5]])
+    np.testing.assert_allclose(sme_center, population_center)
+
+
+def test_cached_baselines_score_a_subset_like_the_full_population():
+    features = _features()
+    peers = fit_peer_baselines(features, ["segment"], [30.0], min_segment_size=1)
+    full = peers.apply(features).set_index("customer_id")
+    subset = peers.apply(features.iloc[[1, 4, 6]]).set_index("customer_id")
+    pd.testing.assert_frame_equal(subset, full.loc[subset.index])
+    # A segment never seen when the baselines were fitted falls back to the population.
+    new = peers.apply(features.iloc[[0]].assign(segment="private"))
+    assert np.isfinite(new["deviation_score"]).all()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from src.data_engineering.peer_baselines import fit_peer_baselines
+from src.detection.anomaly_detection import fit_anomaly_model
+from src.detection.rule_engine import deviation_threshold
+from src.services.pipeline_stages import LocalStages, ShardedStages
+from src.utils.mmap_frame import read_frame, write_frame
+
+
+def _run(stages, customers, transactions, graph):
+    with stages:
+        features, evidence = stages.build_features(customers, transactions, graph)
+        features = fit_peer_baselines(features).apply(features)
+        model = fit_anomaly_model(features)
+        scores, rules = stages.score(features, model, deviation_threshold(features))
+    return features, evidence, scores, rules
+
+
+def test_mmap_frame_round_trip_keeps_types_and_missing(tmp_path):
+    df = pd.DataFrame(
+        {
+            "id": ["a", np.nan, "c"],
+            "amount": [1.5, 2.0, np.nan],
+            "ts": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+            "band": pd.Categorical(["Low", "High", "Low"]),
+        }
+    )
+    out = read_frame(write_frame(df, tmp_path / "frame"))
+    pd.testing.assert_frame_equal(out, df)
+    assert read_frame(write_frame(df, tmp_path / "rows"), np.array([2]))["id"].tolist() == ["c"]
+
+
+def test_sharded_stages_match_local(make_inputs):
+    customers, transactions, graph = make_inputs()
+    local = _run(LocalStages(), customers, transactions, graph)
+    sharded = _run(ShardedStages(n_shards=3, max_workers=2), customers, transactions, graph)
+
+    pd.testing.assert_frame_equal(local[0], sharded[0])
+    assert local[1] == sharded[1]
+    pd.testing.assert_series_equal(local[2], sharded[2])
+    assert [(r.rule_id, r.triggered_customers) for r in local[3]] == [
+        (r.rule_id, r.triggered_customers) for r in sharded[3]
+    ]
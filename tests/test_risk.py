@@ -1,5 +1,13 @@
-from src.risk_scoring.risk_calculator import compute_risk_scores
+import asyncio
+
+import numpy as np
 import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from src.api.main import rescore
+from src.api.models import RescoreRequest
+from src.risk_scoring.risk_calculator import RISK_BANDS, compute_risk_scores, score_components
 
 
 def test_compute_risk_scores_shapes():
@@ -24,3 +32,22 @@ def test_compute_risk_scores_shapes():
     assert set(scores_df.columns) >= {"customer_id", "risk_score", "risk_band"}
     assert len(typ_df) == 1
 
+
+def test_score_components_matches_weighted_sum_and_bands():
+    matrix = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 1.0], [1.0, 1.0, 1.0], [0.6, 0.0, 0.0]])
+    weights = {
+        "rule_weight": 0.5,
+        "anomaly_weight": 0.3,
+        "cluster_weight": 0.2,
+        "low_band_max": 0.3,
+        "medium_band_max": 0.6,
+    }
+    scores, codes = score_components(matrix, weights)
+    assert np.allclose(scores, [0.5, 0.5, 1.0, 0.3])
+    assert [RISK_BANDS[c] for c in codes] == ["Medium", "Medium", "High", "Low"]
+
+
+def test_rescore_requires_configure_models():
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(rescore(RescoreRequest(rule_weight=1.0), role="Analyst"))
+    assert exc.value.status_code == 403
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.risk_scoring.risk_calculator import CalibrationSketch, fit_score_calibration
+from src.utils.sketches import MinMax, QuantileSketch
+
+
+def test_exact_mode_matches_pandas_quantile():
+    values = pd.Series(np.random.default_rng(0).normal(size=5_000))
+    values.iloc[::50] = np.nan
+    left = QuantileSketch.from_values(values.iloc[:2_000])
+    right = QuantileSketch.from_values(values.iloc[2_000:])
+    merged = left.merge(right)
+    assert merged.exact
+    assert merged.quantile(0.98) == values.quantile(0.98)
+
+
+def test_merged_kll_sketch_stays_within_rank_error():
+    values = np.random.default_rng(1).lognormal(size=400_000)
+    sketch = QuantileSketch(k=400, exact_limit=1_000)
+    for i, chunk in enumerate(np.array_split(values, 13)):
+        sketch.merge(QuantileSketch(k=400, exact_limit=1_000, seed=i).update(chunk))
+    assert not sketch.exact and len(sketch) == len(values)
+    ordered = np.sort(values)
+    for q in (0.05, 0.5, 0.98, 0.999):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) <= sketch.rank_error()
+
+
+def test_min_max_and_calibration_merge_like_full_fit():
+    assert MinMax.from_values([3.0, np.nan, -1.0]).merge(MinMax.from_values([7.0])).bounds() == (-1.0, 7.0)
+
+    rules = pd.DataFrame({"customer_id": ["C1", "C1", "C2", "C3"], "rule_id": ["R1", "R2", "R1", "R2"]})
+    anomaly = pd.Series([0.1, -0.3, 0.7, 0.2], index=["C1", "C2", "C3", "C4"])
+    clusters = pd.DataFrame(
+        {"customer_id": ["C1", "C2", "C3", "C4"], "cluster": [0, 1, 2, 1], "total_amount": [5.0, 9.0, 1.0, 8.0]}
+    )
+    first, second = ["C1", "C2"], ["C3", "C4"]
+    sketch = CalibrationSketch().update(
+        rules[rules["customer_id"].isin(first)], anomaly.loc[first], clusters[clusters["customer_id"].isin(first)]
+    )
+    sketch.merge(
+        CalibrationSketch().update(
+            rules[rules["customer_id"].isin(second)], anomaly.loc[second], clusters[clusters["customer_id"].isin(second)]
+        )
+    )
+    assert sketch.finalize() == fit_score_calibration(rules, anomaly, clusters)
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from src.detection.structuring import detect_structuring
+
+
+def test_detect_structuring_finds_sub_threshold_run():
+    transactions = pd.DataFrame(
+        {
+            "transaction_id": ["T1", "T2", "T3", "T4", "T5", "T6"],
+            "customer_id": ["C1", "C1", "C1", "C1", "C2", "C2"],
+            "amount": [9_000.0, 9_500.0, 9_900.0, 200.0, 9_000.0, 9_000.0],
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 09:00", "2024-01-02 10:00", "2024-01-09 10:00", "2024-01-02 11:00",
+                 "2024-01-01 09:00", "2024-01-10 09:00"]
+            ),
+        }
+    )
+    out = detect_structuring(transactions, threshold=10_000, window=pd.Timedelta(hours=72))
+    assert out["customer_id"].tolist() == ["C1"]
+    assert out.loc[0, "structuring_hits"] == 1
+    assert out.loc[0, "evidence_transaction_ids"] == ["T1", "T2"]
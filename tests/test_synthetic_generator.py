@@ -0,0 +1,25 @@
+import pandas as pd
+
+from data.synthetic_generator import PATTERNS, generate_dataset
+from src.detection.structuring import detect_structuring
+
+
+def test_generator_is_seeded_and_injects_every_pattern():
+    a = generate_dataset(400, 8_000, seed=7)
+    b = generate_dataset(400, 8_000, seed=7)
+    pd.testing.assert_frame_equal(a.transactions, b.transactions)
+    assert not a.transactions.equals(generate_dataset(400, 8_000, seed=8).transactions)
+
+    tx = a.transactions
+    assert abs(len(tx) - 8_000) < 400
+    assert tx["transaction_id"].is_unique and tx["timestamp"].is_monotonic_increasing
+    assert set(tx["customer_id"]) <= set(a.customers["customer_id"])
+    assert sorted(a.patterns["pattern"].unique()) == sorted(PATTERNS)
+    assert set(a.alerts["transaction_id"]) <= set(tx["transaction_id"])
+
+
+def test_injected_structuring_is_detected():
+    ds = generate_dataset(500, 10_000, seed=3)
+    flagged = set(detect_structuring(ds.transactions)["customer_id"])
+    expected = set(ds.patterns.loc[ds.patterns["pattern"] == "structuring", "customer_id"])
+    assert expected and expected <= flagged
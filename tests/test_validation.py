@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.data_engineering.validation import (
+    RejectionReport,
+    iter_validated_transactions,
+    validate_transactions,
+)
+
+
+def _transactions():
+    return pd.DataFrame(
+        {
+            "transaction_id": ["T1", "T2", "T2", "T3", None, "T4", "T1"],
+            "customer_id": ["C1", "C1", "C2", "C2", "C3", "C3", "C4"],
+            "amount": [10.0, 20.0, 30.0, -5.0, 1.0, "abc", 40.0],
+        }
+    )
+
+
+def test_validate_transactions_reports_rejections():
+    report = RejectionReport()
+    out = validate_transactions(_transactions(), report)
+    assert out["transaction_id"].tolist() == ["T1", "T2"]
+    assert report.counts == {
+        "missing_required": 1,
+        "invalid_amount": 1,
+        "non_positive_amount": 1,
+        "duplicate_transaction_id": 2,
+    }
+    assert report.rows_accepted == 2 and report.rows_read == 7
+
+
+def test_chunked_validation_matches_in_memory(tmp_path):
+    path = tmp_path / "transactions.csv"
+    _transactions().to_csv(path, index=False)
+    report = RejectionReport()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        chunks = list(iter_validated_transactions(path, chunksize=2, n_workers=2, report=report, executor=pool))
+    out = pd.concat(chunks)
+    assert out["transaction_id"].tolist() == ["T1", "T2"]
+    assert report.counts["duplicate_transaction_id"] == 2
+    assert sum(report.counts.values()) == 5